@@ -0,0 +1,231 @@
+# ======================================
+# IMPORTS
+# ======================================
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Imports from internal project modules
+from src.pipeline import run_pipeline
+from src.profiler import (
+    StageProfiler,
+    print_profile,
+    save_profiles_json,
+    save_chrome_trace,
+)
+from src.synthetic import generate_source_workbook
+import src.constants as C
+
+# ======================================
+# SCALING BENCHMARK
+#   Generates synthetic source workbooks (src/synthetic.py) at several sizes, runs the
+#   pipeline on each one in a fresh process, and reports the time of every stage and the
+#   peak memory, size by size. Generated workbooks are kept in the work folder and reused.
+# ======================================
+DEFAULT_SIZES = "1000,10000,100000"
+
+
+def synthetic_workbook(workdir, notes, assignees, seed, formulas=True):
+    """Path of the synthetic workbook for these arguments, generated on first use"""
+    name = f"synthetic_{notes}n_{assignees}a_s{seed}{'' if formulas else '_noformulas'}.xlsx"
+    path = os.path.join(workdir, name)
+    if not os.path.exists(path):
+        generate_source_workbook(
+            path, notes=notes, assignees=assignees, seed=seed, formulas=formulas
+        )
+    return path
+
+
+def _bench_one(source_file, label, recalc_engine, trace_memory, options):
+    """Worker process: one pipeline run, so the peak RSS belongs to this run only"""
+    C.RECALC_ENGINE = recalc_engine
+    profiler = StageProfiler(trace_memory=trace_memory, label=label)
+    run_pipeline(source_file, use_cache=False, profiler=profiler, **options)
+    return profiler.report()
+
+
+def run_benchmark(
+    sizes,
+    assignees=50,
+    seed=0,
+    repeat=1,
+    workdir=".bench",
+    formulas=True,
+    recalc_engine=C.RECALC_ENGINE,
+    trace_memory=False,
+    **options,
+) -> list:
+    """Run the pipeline on a synthetic workbook of each size (repeat times)
+
+    options are passed on to run_pipeline (table_mode, output_mode, parallel_read, ...)
+    Returns the profile of every run (see StageProfiler.report), with "notes" and "repeat" added
+    """
+    options.setdefault("parallel_read", False)
+    # Benchmark runs must not write snapshots into (or read previous values from) the report history
+    options.setdefault("use_snapshots", False)
+    output_dir = os.path.join(workdir, "out")
+    os.makedirs(output_dir, exist_ok=True)
+
+    profiles = []
+    for notes in sizes:
+        source_file = synthetic_workbook(workdir, notes, assignees, seed, formulas)
+        for i in range(repeat):
+            label = f"{notes} notes, {assignees} people (run {i + 1})"
+            print(f"\n🏁 {label}", flush=True)
+            # A new process per run, so memory from one size does not carry into the next
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                profile = pool.submit(
+                    _bench_one,
+                    source_file,
+                    label,
+                    recalc_engine,
+                    trace_memory,
+                    dict(options, output_dir=output_dir),
+                ).result()
+            profile.update({"notes": notes, "assignees": assignees, "repeat": i})
+            profiles.append(profile)
+
+    return profiles
+
+
+def scaling_rows(profiles) -> list:
+    """One row per size: the fastest run of each stage, total time and peak RSS"""
+    by_size = {}
+    for profile in profiles:
+        by_size.setdefault(profile["notes"], []).append(profile)
+
+    rows = []
+    for notes, runs in sorted(by_size.items()):
+        row = {"notes": notes}
+        for profile in runs:
+            for stage in profile["stages"]:
+                if stage["depth"] > 0:
+                    continue  # Nested stages are already inside their parent stage
+                best = row.get(stage["name"])
+                row[stage["name"]] = (
+                    min(best, stage["wall_s"]) if best is not None else stage["wall_s"]
+                )
+        row["total_s"] = min(p["total_s"] for p in runs)
+        peaks = [p["peak_rss_mb"] for p in runs if p["peak_rss_mb"] is not None]
+        row["peak_rss_mb"] = max(peaks) if peaks else None
+        rows.append(row)
+    return rows
+
+
+def print_scaling_table(rows):
+    """Stages down, sizes across - how each stage grows with the number of notes"""
+    stages = []
+    for row in rows:
+        stages += [k for k in row if k not in stages and k != "notes"]
+
+    print("\n📈 ====== SCALING (fastest run, seconds) ======")
+    print(f"  {'stage':<32}" + "".join(f"{row['notes']:>12,}" for row in rows))
+    for stage in stages:
+        cells = []
+        for row in rows:
+            value = row.get(stage)
+            cells.append(f"{value:>12.3f}" if value is not None else f"{'-':>12}")
+        print(f"  {stage:<32}" + "".join(cells))
+
+
+def save_scaling_csv(rows, path):
+    """Save the scaling table as CSV (one row per size), e.g. to plot the curves"""
+    fields = []
+    for row in rows:
+        fields += [k for k in row if k not in fields]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    print("\n✅ Scaling table saved to:", path)
+
+
+# ======================================
+# SCRIPT ENTRY POINT
+# ======================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time the report pipeline on synthetic workbooks of several sizes"
+    )
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        help=f"Comma separated ReviewNoteAging row counts (default: {DEFAULT_SIZES})",
+    )
+    parser.add_argument("--assignees", type=int, default=50, help="Distinct people")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per size")
+    parser.add_argument(
+        "--workdir",
+        default=".bench",
+        help="Folder for the synthetic workbooks and the outputs (default: .bench)",
+    )
+    parser.add_argument(
+        "--no-formulas",
+        action="store_true",
+        help="Leave out the VLOOKUP columns R-S of ReviewNoteAging",
+    )
+    parser.add_argument(
+        "--table-mode", choices=["computed", "formula"], default="computed"
+    )
+    parser.add_argument(
+        "--output-mode", choices=["workbook", "streamed"], default="workbook"
+    )
+    parser.add_argument(
+        "--recalc-engine", choices=["python", "excel"], default=C.RECALC_ENGINE
+    )
+    parser.add_argument(
+        "--parallel-read",
+        action="store_true",
+        help="Parse the source sheets in worker processes (their memory is not in the peak RSS)",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Also record Python allocations per stage with tracemalloc (slower)",
+    )
+    parser.add_argument(
+        "--generate-only",
+        action="store_true",
+        help="Only write the synthetic workbooks",
+    )
+    parser.add_argument("--profile", metavar="PATH", help="Save all runs as JSON")
+    parser.add_argument(
+        "--trace", metavar="PATH", help="Save all runs as a Chrome trace"
+    )
+    parser.add_argument("--csv", metavar="PATH", help="Save the scaling table as CSV")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    if args.generate_only:
+        for notes in sizes:
+            synthetic_workbook(
+                args.workdir, notes, args.assignees, args.seed, not args.no_formulas
+            )
+    else:
+        profiles = run_benchmark(
+            sizes,
+            assignees=args.assignees,
+            seed=args.seed,
+            repeat=args.repeat,
+            workdir=args.workdir,
+            formulas=not args.no_formulas,
+            recalc_engine=args.recalc_engine,
+            trace_memory=args.trace_memory,
+            table_mode=args.table_mode,
+            output_mode=args.output_mode,
+            parallel_read=args.parallel_read,
+        )
+        for profile in profiles:
+            print_profile(profile)
+
+        rows = scaling_rows(profiles)
+        print_scaling_table(rows)
+        if args.profile:
+            save_profiles_json(profiles, args.profile)
+        if args.trace:
+            save_chrome_trace(profiles, args.trace)
+        if args.csv:
+            save_scaling_csv(rows, args.csv)
@@ -1,151 +1,237 @@
 # ======================================
 # IMPORTS
 # ======================================
-from openpyxl import load_workbook
+import argparse
+import sys
 
 # Imports from internal project modules
-from src.excel_io import (
-    load_formula_workbook,
-    force_excel_recalc,
-    make_copy,
-    extract_base_date,
-    read_excel_dataframe,
-    extract_last_sync_signoff_aging_str,
+from src.pipeline import run_pipeline, run_batch, run_trend, find_source_files
+from src.profiler import (
+    StageProfiler,
+    print_profile,
+    save_profiles_json,
+    save_chrome_trace,
 )
-from src.pivots import get_all_pivot_tables
-from src.writers import (
-    write_pivot_tables_to_sheet,
-    write_summary_tables_to_sheet,
-    copy_all_tables_to_report,
-)
-from src.tables import get_all_tables
-from src.formatting import format_all_reports
 import src.constants as C
+from src.report_specs import TREND
 
 # ======================================
 # MAIN WORKFLOW
 # ======================================
 DEBUG = False
 
-
-def main():
-    # ===================================================================
-    # PROCESS EXCEL
-    #   Make a copy of the source file to do all further processing
-    working_copy_file = make_copy(C.SOURCE_FILE, debug=DEBUG)
-    force_excel_recalc(working_copy_file)  # recalculate all formulas
-
-    #   Open the workbook to for calculations and writing pivots. To be closed after writing all pivots, tables, and reports
-    wb_main = load_formula_workbook(working_copy_file)
-
-    #   Extract base date for reports and for filtering due date pivot
-    base_date = extract_base_date(ws=wb_main[C.BASE_DATE_SHEET], cell=C.BASE_DATE_CELL)
-
-    # ===================================================================
-    # PIVOT TABLES
-    #   Read ReviewNoteAging and Signoff Aging tabs, and load dataframes to build pivots
-    df_reviewnote_aging = read_excel_dataframe(
-        file_name=working_copy_file,
-        sheet_name=C.DF1_SHEET,
-        header_start=C.DF1_SHEET_HEADER,
-        debug=DEBUG,
+# How the summary tables are produced
+#   "computed" - values computed in pandas from the pivots, written to Calculations and Report.
+#                No recalculation is needed to build the reports
+#   "formula"  - VLOOKUP/IF formulas in Calculations, recalculated and copied to Report as values
+TABLE_MODE = "computed"
+
+# In "computed" mode, write the formula versions of the tables to Calculations (instead of the
+# values), so the numbers in the workbook can be audited. The Report still uses the computed values
+AUDITABLE = False
+
+# Where the formatted reports go
+#   "workbook" - the Report tab of the working copy
+#   "streamed" - a separate reports-only workbook (SUMMARY_<source file>), written row by row
+#                through a write-only worksheet. The working copy is only read, never loaded with
+#                its formulas or saved, so there is no Calculations tab.
+#                Needs TABLE_MODE = "computed" and AUDITABLE = False
+OUTPUT_MODE = "workbook"
+
+# Parse the ReviewNoteAging and SignoffAging sheets in two worker processes, while the working copy
+# is loaded. Batch runs read the sheets of each file one after the other (files run in parallel)
+PARALLEL_READ = True
+
+# Print the report rows whose values moved since the last snapshot of the report (the last run
+# on the same base date, e.g. of an export edited during the day, else the previous base date)
+REPORT_CHANGES = False
+
+# Take the 'As of [PREV DATE]' values from the snapshot the last run saved (report_snapshots.sqlite3),
+# instead of the PrevDate tab. The tab is still read when there is no earlier snapshot, and by
+# the formula versions of the tables
+USE_SNAPSHOTS = True
+
+
+def main(
+    use_cache=True, report_changes=REPORT_CHANGES, profile=False, trace_memory=False
+):
+    """Build the reports for C.SOURCE_FILE. With profile, returns the stage profile of the run"""
+    profiler = StageProfiler(
+        enabled=profile, trace_memory=trace_memory, label=C.SOURCE_FILE
     )
-    df_reviewnote_aging.columns = df_reviewnote_aging.columns.str.strip()
-
-    df_signoff_aging = read_excel_dataframe(
-        file_name=working_copy_file,
-        sheet_name=C.DF2_SHEET,
-        header_start=C.DF2_SHEET_HEADER,
+    run_pipeline(
+        C.SOURCE_FILE,
+        table_mode=TABLE_MODE,
+        auditable=AUDITABLE,
+        output_mode=OUTPUT_MODE,
+        use_cache=use_cache,
+        parallel_read=PARALLEL_READ,
+        report_changes=report_changes,
+        use_snapshots=USE_SNAPSHOTS,
+        profiler=profiler,
         debug=DEBUG,
     )
-    df_signoff_aging.columns = df_signoff_aging.columns.str.strip()
-
-    # Collect the dataframes in a dict
-    dfs = {"reviewnote_aging": df_reviewnote_aging, "signoff_aging": df_signoff_aging}
-
-    #   Build and write pivots to sheet, pass the dfs dict
-    pivots = get_all_pivot_tables(dfs, base_date, debug=DEBUG)
-    pivot_ranges = write_pivot_tables_to_sheet(
-        pivots, wb_main[C.CALC_SHEET], debug=DEBUG
+    return profiler.report() if profile else None
+
+
+def batch(
+    path_or_glob,
+    workers=None,
+    output_dir=None,
+    use_cache=True,
+    report_changes=REPORT_CHANGES,
+    profile=False,
+    trace_memory=False,
+):
+    """Build the reports for every source workbook in a folder (or matching a glob pattern)"""
+    source_files = find_source_files(path_or_glob)
+    if not source_files:
+        print(f"⚠️ No source workbooks found in {path_or_glob}")
+        return []
+
+    print(f"\n📂 {len(source_files)} source workbooks, {workers or 'all'} workers")
+    return run_batch(
+        source_files,
+        workers=workers,
+        output_dir=output_dir,
+        table_mode=TABLE_MODE,
+        auditable=AUDITABLE,
+        output_mode=OUTPUT_MODE,
+        use_cache=use_cache,
+        report_changes=report_changes,
+        use_snapshots=USE_SNAPSHOTS,
+        profile=profile,
+        trace_memory=trace_memory,
+        debug=DEBUG,
     )
 
-    # print("Pivot ranges:", pivot_ranges)
-
-    # ===================================================================
-    # SUMMARY TABLES
-    #   Find position in sheet to write summary tables below pivots, without any overwrites
-    max_val = max(pivot["end_row"] for pivot in pivot_ranges.values())
-    table_start_row = max_val + C.BUFFER_LINES  # buffer rows after pivots
-
-    # Strings for table titles
-    base_date_str = base_date.strftime("%m/%d/%Y")
-    last_sync_str = extract_last_sync_signoff_aging_str(
-        ws=wb_main[C.LAST_SYNC_SHEET], cell=C.LAST_SYNC_CELL
-    )
 
-    #   Build and write summary tables to sheet
-    tables = get_all_tables(
-        base_date_str, last_sync_str, pivot_ranges, table_start_row, debug=DEBUG
+def trend(
+    days=TREND["days"], reports=False, use_cache=True, profile=False, trace_memory=False
+):
+    """Counts per assignee for each of the last days base dates of C.SOURCE_FILE, in one pass.
+    With profile, returns the stage profile of the run"""
+    profiler = StageProfiler(
+        enabled=profile, trace_memory=trace_memory, label=C.SOURCE_FILE
     )
-    table_ranges = write_summary_tables_to_sheet(
-        tables, wb_main[C.CALC_SHEET], table_start_row, debug=DEBUG
-    )
-
-    # print(table_ranges)
-
-    # Save the file before generating the reports
-    wb_main.save(working_copy_file)
-
-    # ===================================================================
-    # GENERATE FORMATTED REPORTS
-    #   Prepare reports in 'Report' sheet and format them
-
-    report_ranges = copy_all_tables_to_report(
-        file_path=working_copy_file,
-        wb_src=wb_main,
-        table_ranges=table_ranges,
+    run_trend(
+        C.SOURCE_FILE,
+        days=days,
+        reports=reports,
+        use_cache=use_cache,
+        profiler=profiler,
         debug=DEBUG,
     )
+    return profiler.report() if profile else None
 
-    # print("MAIN - Report ranges:", report_ranges)
-    format_all_reports(ws_report=wb_main[C.REPORT_SHEET], report_ranges=report_ranges)
-
-    # r1_range = copy_table_to_report(
-    #     src_path=working_copy_file,
-    #     wb_src=wb_main,
-    #     table_range=table_ranges["open_notes"],
-    #     report_start_row=C.REPORT1_START_ROW,
-    #     report_start_col=C.REPORT1_START_COL,
-    # )
-    # format_open_notes_report(ws_report=wb_main[C.REPORT_SHEET], report_range=r1_range)
-
-    # r2_range = copy_table_to_report(
-    #     src_path=working_copy_file,
-    #     wb_src=wb_main,
-    #     table_range=table_ranges["addressed_notes"],
-    #     report_start_row=C.REPORT2_START_ROW,
-    #     report_start_col=C.REPORT2_START_COL,
-    # )
-
-    # r3_range = copy_table_to_report(
-    #     src_path=working_copy_file,
-    #     wb_src=wb_main,
-    #     table_range=table_ranges["signoff_aging"],
-    #     report_start_row=C.REPORT3_START_ROW,
-    #     report_start_col=C.REPORT3_START_COL,
-    # )
 
-    # print([r1_range, r2_range, r3_range])
-
-    wb_main.save(working_copy_file)
-    wb_main.close()
-
-    # print("Range:", r1_range)
-    # print("Test value", wb_main["Report"]["A4"].value)
+def save_profiles(profiles, profile_path=None, trace_path=None):
+    """Print the stage profile of each run, and save them as JSON and/or a Chrome trace"""
+    for profile in profiles:
+        print_profile(profile)
+    if profile_path:
+        save_profiles_json(profiles, profile_path)
+    if trace_path:
+        save_chrome_trace(profiles, trace_path)
 
 
 # ======================================
 # SCRIPT ENTRY POINT
 # ======================================
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Build the review note reports")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse the source workbook again instead of using the cached sheets",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="PATH",
+        help="Folder (or glob pattern) of source workbooks to build reports for, in parallel",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for --batch (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=None,
+        help="Folder for the --batch outputs (default: next to each source workbook)",
+    )
+    parser.add_argument(
+        "--changes",
+        action="store_true",
+        default=REPORT_CHANGES,
+        help="Print the report rows whose values moved since the last snapshot of the report",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        default=None,
+        help="Time each pipeline stage and save the profile as JSON",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        default=None,
+        help="Save the stage timings as a Chrome trace (chrome://tracing or ui.perfetto.dev)",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Also record Python allocations per stage with tracemalloc (slower)",
+    )
+    parser.add_argument(
+        "--trend",
+        metavar="DAYS",
+        type=int,
+        nargs="?",
+        const=TREND["days"],
+        default=None,
+        help=f"Write the counts per assignee for each of the last DAYS base dates "
+        f"(default {TREND['days']}) to a trend workbook, instead of the reports",
+    )
+    parser.add_argument(
+        "--trend-reports",
+        action="store_true",
+        help="With --trend, also write the Open Review Notes report of every date",
+    )
+    args = parser.parse_args()
+    profile = bool(args.profile or args.trace or args.trace_memory)
+
+    if args.trend is not None:
+        run_profile = trend(
+            days=args.trend,
+            reports=args.trend_reports,
+            use_cache=not args.no_cache,
+            profile=profile,
+            trace_memory=args.trace_memory,
+        )
+        if profile:
+            save_profiles([run_profile], args.profile, args.trace)
+    elif args.batch:
+        results = batch(
+            args.batch,
+            workers=args.workers,
+            output_dir=args.output_dir,
+            use_cache=not args.no_cache,
+            report_changes=args.changes,
+            profile=profile,
+            trace_memory=args.trace_memory,
+        )
+        if profile:
+            save_profiles([r["profile"] for r in results], args.profile, args.trace)
+        # Non-zero exit code if any workbook failed
+        sys.exit(0 if all(r["ok"] for r in results) else 1)
+    else:
+        run_profile = main(
+            use_cache=not args.no_cache,
+            report_changes=args.changes,
+            profile=profile,
+            trace_memory=args.trace_memory,
+        )
+        if profile:
+            save_profiles([run_profile], args.profile, args.trace)
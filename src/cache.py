@@ -0,0 +1,142 @@
+# ======================================
+# IMPORTS
+# ======================================
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from datetime import datetime
+
+import pandas as pd
+
+import src.constants as C
+
+# ========================================================
+# Local cache of the parsed source sheets
+#   Re-running the report on the same source workbook skips the xlsx parse.
+#   Each entry is a folder named after the content hash of the workbook:
+#       <CACHE_DIR>/<hash>/meta.json            base date, last sync string, frame keys
+#       <CACHE_DIR>/<hash>/<frame key>.pkl      parsed dataframes (pandas pickle)
+#   Least recently used entries are evicted once the cache grows over CACHE_MAX_BYTES.
+# ========================================================
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def source_cache_key(source_file: str, sheets: dict) -> str:
+    """Content hash of the source workbook, combined with how the sheets are read
+
+    A change in the workbook bytes, the requested sheets/columns, or CACHE_VERSION gives a new key
+    """
+    digest = hashlib.sha256()
+    with open(source_file, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+
+    digest.update(str(C.CACHE_VERSION).encode())
+    digest.update(json.dumps(sheets, sort_keys=True).encode())
+
+    return digest.hexdigest()
+
+
+def _entry_dir(cache_dir, key):
+    return os.path.join(cache_dir, key)
+
+
+def load_cached_source(key: str, cache_dir: str = C.CACHE_DIR):
+    """Load the parsed frames, base date and last sync string for a cache key
+
+    Returns None on a cache miss, else a dict
+    {"dfs": {key: dataframe}, "base_date": datetime, "last_sync_str": str}
+    """
+    entry = _entry_dir(cache_dir, key)
+    meta_path = os.path.join(entry, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        dfs = {
+            name: pd.read_pickle(os.path.join(entry, f"{name}.pkl"))
+            for name in meta["frames"]
+        }
+    except (OSError, ValueError, KeyError, EOFError, pickle.UnpicklingError):
+        # Incomplete or unreadable entry - treat as a miss and rebuild it
+        shutil.rmtree(entry, ignore_errors=True)
+        return None
+
+    # Mark as recently used for eviction
+    os.utime(meta_path)
+
+    return {
+        "dfs": dfs,
+        "base_date": datetime.fromisoformat(meta["base_date"]),
+        "last_sync_str": meta["last_sync_str"],
+    }
+
+
+def save_cached_source(
+    key: str,
+    dfs: dict,
+    base_date: datetime,
+    last_sync_str: str,
+    cache_dir: str = C.CACHE_DIR,
+    max_bytes: int = C.CACHE_MAX_BYTES,
+):
+    """Store the parsed frames and extracted header values under the cache key, then evict old entries"""
+    entry = _entry_dir(cache_dir, key)
+    os.makedirs(entry, exist_ok=True)
+
+    for name, df in dfs.items():
+        df.to_pickle(os.path.join(entry, f"{name}.pkl"))
+
+    # meta.json is written last, so an entry without it is never read as complete
+    meta = {
+        "frames": list(dfs),
+        "base_date": base_date.isoformat(),
+        "last_sync_str": last_sync_str,
+    }
+    with open(os.path.join(entry, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    evict_cache(cache_dir=cache_dir, max_bytes=max_bytes, keep=key)
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def evict_cache(
+    cache_dir: str = C.CACHE_DIR, max_bytes: int = C.CACHE_MAX_BYTES, keep=None
+):
+    """Remove least recently used entries until the cache fits in max_bytes
+
+    The entry named in keep (the one just written) is never removed
+    """
+    if not os.path.isdir(cache_dir):
+        return
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if not os.path.isdir(path):
+            continue
+        meta_path = os.path.join(path, "meta.json")
+        last_used = os.path.getmtime(meta_path if os.path.exists(meta_path) else path)
+        entries.append((last_used, name, _dir_size(path)))
+
+    total = sum(size for _, _, size in entries)
+    for _, name, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name == keep:
+            continue
+        shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+        total -= size
+        print(f"🧹 Evicted cache entry {name[:12]} ({size / 1e6:.1f} MB)")
@@ -2,43 +2,34 @@ from openpyxl.styles import PatternFill, Font, Border, Side
 
 # Files
 SOURCE_FILE = r"Ongoing Deliverable_US-1-US AU-1896858.1_Synopsys Inc._GDC EMSS PM Support_10.29.2025.xlsx"
+# Prefix of the working copy (with the Calculations and Report tabs)
+WORKING_COPY_PREFIX = "REPORT_"
+# Prefix of the reports-only workbook written in the "streamed" output mode
+STREAMED_REPORT_PREFIX = "SUMMARY_"
+# Prefix of the trend workbook (counts per assignee over several base dates, see src/trend.py)
+TREND_PREFIX = "TREND_"
 
-# Rows and Columns where pivots start
-PIVOT1_START_ROW = 1  # Overdue pivot
-PIVOT2_START_ROW = 1  # Due date 1-14 days
-PIVOT3_START_ROW = 1  # Count of content
-PIVOT4_START_ROW = 1  # Status is Addressed
-PIVOT5_START_ROW = 1  # Signoff Aging
+# Layout of the Calculations and Report tabs (see src/layout.py)
+#   Pivots, tables and reports are packed side by side from the first row and column,
+#   with LAYOUT_GAP_COLS empty columns between them
+LAYOUT_FIRST_ROW = 1
+LAYOUT_FIRST_COL = 1
+LAYOUT_GAP_COLS = 1
 
-PIVOT1_START_COL = 1  # Overdue pivot
-PIVOT2_START_COL = 4  # Due date 1-14 days
-PIVOT3_START_COL = 8  # Count of content
-PIVOT4_START_COL = 11  # Status is Addressed
-PIVOT5_START_COL = 14  # Signoff Aging
 
+# Cache of parsed source sheets (see src/cache.py)
+CACHE_DIR = ".report_cache"
+CACHE_MAX_BYTES = 2 * 1024**3  # Least recently used entries are evicted above this size
+CACHE_VERSION = 2  # Bump when the way source sheets are parsed changes
 
-# Columns where summary tables start (start row is a few BUFFER_LINES below the longest pivot)
-TABLE1_START_COL = 1  # Open review notes table
-TABLE2_START_COL = 9  # Addressed review notes table
-TABLE3_START_COL = 14  # Signoff Aging table
+# Snapshots of each run's counts (SQLite), the 'As of [PREV DATE]' values of the next run
+# (see src/snapshots.py). The PrevDate tab is only read while there is no earlier snapshot
+SNAPSHOT_DB = "report_snapshots.sqlite3"
 
-# Coordinates of Reports
-# Report 1 - Open Review Notes
-REPORT1_START_ROW = 1
-REPORT1_START_COL = 1
-REPORT1_GRAND_TOTAL_COL = 5
-REPORT1_DIFFERENCE_COL = 7
-
-# Report 2 - Addressed Review Notes
-REPORT2_START_ROW = 1
-REPORT2_START_COL = 9
-REPORT2_ADDRESSED_COL = 10
-REPORT2_DIFFERENCE_COL = 12
-
-# Report 3 - Signoff Aging
-REPORT3_START_ROW = 1
-REPORT3_START_COL = 14
-REPORT3_DIFFERENCE_COL = 17
+# Formula recalculation engine used by force_excel_recalc
+#   "python" - in-process evaluator (src/recalc.py), works without Excel
+#   "excel"  - hidden Excel instance through xlwings (Windows/macOS with Excel installed)
+RECALC_ENGINE = "python"
 
 
 # No. of lines to leave below the longest pivot table before starting the tables
@@ -64,11 +55,47 @@ DF1_SHEET_HEADER = 6  # Data starts in excel row 7 => header 7
 DF2_SHEET = "SignoffAging"
 DF2_SHEET_HEADER = 6  # Data starts in excel row 7 => header 7
 
+# Columns read from the source sheets (everything else is skipped while reading)
+DF1_COLUMNS = [
+    "Assigned group",
+    "Allocated To",
+    "Created by group",
+    "Created By",
+    "Content",
+    "Aged",
+    "Due Date",
+    "Status",
+]
+DF1_DATE_COLUMNS = ["Due Date"]
+DF2_COLUMNS = ["Assignee", "Workflow", "Signoff Role"]
+
+# Compact dtypes of the kept columns (see _read_sheet_columns in src/excel_io.py)
+#   category - repeated labels, dictionary encoded so the pivots group and filter on int codes
+#   integer  - smallest nullable int that holds the values
+#   presence - only whether the cell is filled (the pivots only count non-empty values)
+DF1_CATEGORY_COLUMNS = [
+    "Assigned group",
+    "Allocated To",
+    "Created by group",
+    "Created By",
+    "Status",
+]
+DF1_INTEGER_COLUMNS = ["Aged"]
+DF1_PRESENCE_COLUMNS = ["Content"]
+DF2_CATEGORY_COLUMNS = ["Assignee", "Workflow", "Signoff Role"]
+
+# Rows per chunk when streaming the source sheets (date columns are converted per chunk)
+READ_CHUNK_ROWS = 50_000
+
 
 # Sheet names
 CALC_SHEET = "Calculations"
 REPORT_SHEET = "Report"
+TREND_SHEET = "Trend"
+TREND_REPORTS_SHEET = "Trend Reports"
+TREND_GAP_ROWS = 2  # Empty rows between the stacked reports of the Trend Reports sheet
 BASE_DATE_SHEET = "ReviewNoteAging"
 BASE_DATE_CELL = "B4"
 LAST_SYNC_SHEET = "SignoffAging"
 LAST_SYNC_CELL = "B4"
+PREV_DATE_SHEET = "PrevDate"  # Manually maintained 'As of [PREV DATE]' values
@@ -1,31 +1,57 @@
 # ======================================
 # IMPORTS
 # ======================================
+import os
 import shutil
+import numpy as np
 import pandas as pd
-import xlwings as xw
+from pandas.api.types import union_categoricals
 import re
 from datetime import datetime
 from openpyxl import load_workbook
 import time
 
+import src.constants as C
+from src.recalc import recalculate_workbook
+from src.xlsx_package import save_workbook_partial, read_cells
 
-def make_copy(source_file: str, debug: bool = False) -> str:
-    """Copies source file to make a working copy with tabs for Calculations and Report"""
 
-    copy_file = f"REPORT_{source_file}"
+def output_path(source_file: str, prefix: str, output_dir: str = None) -> str:
+    """Path of an output file named after the source file, e.g. REPORT_<source file name>
+
+    Written next to the source file, or in output_dir if given (created if it does not exist)
+    """
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    directory = output_dir if output_dir is not None else os.path.dirname(source_file)
+    return os.path.join(directory, f"{prefix}{os.path.basename(source_file)}")
+
+
+def copy_source(source_file: str, output_dir: str = None, debug: bool = False) -> str:
+    """Copies source file to the working copy"""
+
+    copy_file = output_path(source_file, C.WORKING_COPY_PREFIX, output_dir)
     shutil.copy(source_file, copy_file)
 
+    print("\n✅ Copied file to:", copy_file)
+    return copy_file
+
+
+def load_working_copy(copy_file: str, debug: bool = False):
+    """Load the working copy and add the tabs for Calculations and Report
+
+    Nothing is saved here, the tabs reach the file with the first save of the returned workbook
+    """
     # Create tabs
-    wb = load_workbook(copy_file)
-    tabs = ["Calculations", "Report"]
+    wb = load_formula_workbook(copy_file)
+    tabs = [C.CALC_SHEET, C.REPORT_SHEET]
     for tab in tabs:
         if tab in wb.sheetnames:
             del wb[tab]
         wb.create_sheet(tab, index=tabs.index(tab))
 
     if debug:
-        print("\n🐞 ====== DEBUG BLOCK START: make_copy (report_builder.py) ======")
+        print("\n🐞 ====== DEBUG BLOCK START: load_working_copy (excel_io.py) ======")
         ws = wb["ReviewNoteAging"]
         print("[DEBUG] Checking VLOOKUP formula cells (Colum R-S, Row 7-12):")
         # Check if formulas survived
@@ -34,13 +60,9 @@ def make_copy(source_file: str, debug: bool = False) -> str:
             min_row=7, max_row=12, min_col=18, max_col=19, values_only=False
         ):
             print([cell.value for cell in row])
-        print("🐞 ====== DEBUG BLOCK END: make_copy (report_builder.py) ====== \n")
+        print("🐞 ====== DEBUG BLOCK END: load_working_copy (excel_io.py) ====== \n")
 
-    wb.save(copy_file)
-    wb.close()  # Close the file so it does not mess with any other libraries using the same file later
-
-    print("\n✅ Copied file to:", copy_file)
-    return copy_file
+    return wb
 
 
 def load_formula_workbook(filepath: str):
@@ -51,6 +73,16 @@ def load_formula_workbook(filepath: str):
     return load_workbook(filepath)
 
 
+def save_working_copy(wb, filename: str, debug: bool = False):
+    """Save the working copy. Only the Calculations and Report tabs are re-serialized,
+    the source sheets are copied unchanged from the file on disk"""
+    copied = save_workbook_partial(
+        wb, filename, rewrite_sheets=(C.CALC_SHEET, C.REPORT_SHEET), debug=debug
+    )
+    if debug:
+        print(f"[DEBUG] Saved {filename}, copied sheets unchanged: {copied}")
+
+
 def load_values_only_workbook(filepath: str):
     """
     Load workbook in data_only=True mode.
@@ -59,11 +91,37 @@ def load_values_only_workbook(filepath: str):
     return load_workbook(filepath, data_only=True, read_only=True)
 
 
-def force_excel_recalc(filename: str):
+def force_excel_recalc(
+    filename: str, engine: str = None, sheets=None, debug: bool = False
+):
     """Force complete recalculation of all formulas in the excel sheet
 
     Useful if any formulas were written programmatically, and the values need to be read by other libraries later
+
+    engine:
+        "python" - recalculate in-process (src/recalc.py), no Excel needed. Runs on any OS
+        "excel"  - open the file in a hidden Excel instance through xlwings (Windows/macOS only)
+        Defaults to C.RECALC_ENGINE (read at call time, so it can be switched at run time)
+    sheets:
+        Sheets whose formulas are recalculated by the python engine (all sheets if None).
+        Excel always recalculates the whole workbook
     """
+    engine = engine or C.RECALC_ENGINE
+
+    if engine == "python":
+        stats = recalculate_workbook(filename, sheets=sheets, debug=debug)
+        print(
+            f"\n✅ Recalculated {stats['evaluated']} formulas in-process",
+            f"({stats['errors']} errors, {stats['unsupported']} unsupported kept as cached values)",
+        )
+        return
+
+    if engine != "excel":
+        raise ValueError(f"⚠️ Unknown recalculation engine: {engine}")
+
+    # xlwings needs an Excel installation, so only import it when the Excel engine is used
+    import xlwings as xw
+
     app = xw.App(visible=False)  # run in the background
     wb = app.books.open(filename)
 
@@ -79,26 +137,246 @@ def force_excel_recalc(filename: str):
     app.quit()
 
 
-def read_excel_dataframe(
-    file_name: str, sheet_name: str, header_start: int, debug: bool = False
-) -> pd.DataFrame:
-    """Read the excel and return dataframe from the required sheet"""
+# Strings that pd.read_excel reads as missing values by default
+EXCEL_NA_VALUES = {
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+}
+
+
+def _to_dates(values) -> pd.Series:
+    return pd.to_datetime(pd.Series(values, dtype=object), errors="coerce")
+
+
+def _to_categories(values) -> pd.Series:
+    return pd.Series(values, dtype="category")
+
+
+def _to_numbers(values) -> pd.Series:
+    return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+
+
+def _to_presence(values) -> pd.Series:
+    """True where the cell is filled, <NA> where it is empty (so notna/count still work)"""
+    present = np.fromiter(
+        (v is not None for v in values), dtype=bool, count=len(values)
+    )
+    return pd.Series(pd.arrays.BooleanArray(present, ~present))
+
+
+def _concat_chunks(chunks: list, convert) -> pd.Series:
+    if not chunks:
+        return convert([])
+    if len(chunks) == 1:
+        return chunks[0]
+    if isinstance(chunks[0].dtype, pd.CategoricalDtype):
+        # Chunks have their own categories - union them instead of falling back to object
+        try:
+            return pd.Series(union_categoricals(chunks))
+        except TypeError:
+            # Categories of different dtypes (e.g. an all-empty or all-number chunk)
+            objects = [chunk.astype(object) for chunk in chunks]
+            return pd.concat(objects, ignore_index=True).astype("category")
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _compact_integers(series: pd.Series) -> pd.Series:
+    """Smallest nullable int dtype that holds the values, if they are all whole numbers"""
+    values = series.dropna()
+    if len(values) == 0 or not (values == np.floor(values)).all():
+        return series
+    for dtype in ("Int8", "Int16", "Int32", "Int64"):
+        info = np.iinfo(dtype.lower())
+        if info.min <= values.min() and values.max() <= info.max:
+            return series.astype(dtype)
+    return series
+
+
+def _read_sheet_columns(
+    ws,
+    header_start,
+    columns,
+    date_columns,
+    chunk_rows,
+    category_columns=(),
+    integer_columns=(),
+    presence_columns=(),
+):
+    """Stream one read-only worksheet and return a dataframe with only the requested columns
+
+    The columns are stored compactly: dates as datetime64, category columns dictionary
+    encoded (category dtype), integer columns as the smallest nullable int, and presence
+    columns as a nullable boolean (only whether the cell is filled is kept)
+    """
 
-    df = pd.read_excel(io=file_name, sheet_name=sheet_name, header=header_start)
+    # Header row: header_start is 0-based like pd.read_excel's header argument
+    rows = ws.iter_rows(min_row=header_start + 1, values_only=True)
+    header = next(rows, ())
+    positions = {}
+    for i, name in enumerate(header):
+        name = str(name).strip() if name is not None else None
+        if name in columns and name not in positions:
+            positions[name] = i
+
+    if not positions:
+        return pd.DataFrame(columns=[])
+
+    kept = list(positions.items())
+    data = {name: [] for name, _ in kept}
+
+    # Typed columns are converted chunk by chunk while streaming, so the raw values are freed
+    converters = {}
+    for names, convert in (
+        (date_columns, _to_dates),
+        (category_columns, _to_categories),
+        (integer_columns, _to_numbers),
+        (presence_columns, _to_presence),
+    ):
+        converters.update({name: convert for name in names if name in data})
+    chunks = {name: [] for name in converters}
+
+    def flush_chunks():
+        for name, convert in converters.items():
+            if data[name]:
+                chunks[name].append(convert(data[name]))
+                data[name] = []
+
+    n_rows = 0
+    for row in rows:
+        values = [row[i] if i < len(row) else None for _, i in kept]
+        if all(v is None for v in values):
+            continue  # Blank row
+        for (name, _), value in zip(kept, values):
+            if isinstance(value, str) and value in EXCEL_NA_VALUES:
+                value = None
+            data[name].append(value)
+        n_rows += 1
+        if n_rows % chunk_rows == 0:
+            flush_chunks()
+    flush_chunks()
+
+    columns_out = {}
+    for name, _ in kept:
+        if name in converters:
+            columns_out[name] = _concat_chunks(chunks[name], converters[name])
+            if name in integer_columns:
+                columns_out[name] = _compact_integers(columns_out[name])
+        else:
+            columns_out[name] = pd.Series(data[name])
+
+    return pd.DataFrame(columns_out)
+
+
+def read_excel_dataframes(file_name: str, sheets: dict, debug: bool = False) -> dict:
+    """Read several sheets in one pass over the workbook, keeping only the columns that are needed
+
+    The file is opened once in read-only mode and each sheet is streamed row by row
+    (openpyxl iter_rows(values_only=True)), so memory use follows the kept columns
+    instead of the whole sheet. Column names are stripped, and the typed columns are
+    converted during the stream (see _read_sheet_columns).
+
+    Args:
+        file_name (str): workbook to read
+        sheets (dict): {key: {"sheet_name": str, "header_start": int, "columns": list[str],
+                        "date_columns": list[str], "category_columns": list[str],
+                        "integer_columns": list[str], "presence_columns": list[str]}}
+                       header_start is 0-based, like the header argument of pd.read_excel
+        debug (bool, optional): Debug print or not. Defaults to False.
+
+    Returns a dict of {key: dataframe}
+    """
+
+    wb = load_workbook(file_name, read_only=True, data_only=True)
+    try:
+        dfs = {
+            key: _read_sheet_columns(ws=wb[spec["sheet_name"]], **_read_options(spec))
+            for key, spec in sheets.items()
+        }
+    finally:
+        wb.close()
+
+    _debug_dataframes(file_name, dfs, debug)
+
+    return dfs
+
+
+def _read_options(spec: dict) -> dict:
+    return {
+        "header_start": spec["header_start"],
+        "columns": spec["columns"],
+        "date_columns": spec.get("date_columns", []),
+        "category_columns": spec.get("category_columns", []),
+        "integer_columns": spec.get("integer_columns", []),
+        "presence_columns": spec.get("presence_columns", []),
+        "chunk_rows": C.READ_CHUNK_ROWS,
+    }
+
+
+def _debug_dataframes(file_name, dfs, debug):
     if debug:
-        print("\n🐞 ====== DEBUG BLOCK START: get_dataframe (report_builder.py) ======")
         print(
-            f"[DEBUG] Reading data from {file_name}"
-        )  # Expected: Read from REPORT_{filename}
-        print("🐞 ====== DEBUG BLOCK END: get_dataframe (report_builder.py) ====== \n")
+            "\n🐞 ====== DEBUG BLOCK START: read_excel_dataframes (excel_io.py) ======"
+        )
+        print(f"[DEBUG] Reading data from {file_name}")
+        for key, df in dfs.items():
+            print(f"[DEBUG] {key}: {df.shape}, columns {df.columns.to_list()}")
+            mb = df.memory_usage(deep=True).sum() / 1024**2
+            print(
+                f"[DEBUG] {key}: {mb:.1f} MB, dtypes {df.dtypes.astype(str).to_dict()}"
+            )
+        print(
+            "🐞 ====== DEBUG BLOCK END: read_excel_dataframes (excel_io.py) ====== \n"
+        )
 
-    return df
 
+def _read_one_sheet(file_name: str, spec: dict) -> pd.DataFrame:
+    """Worker process: open the workbook read-only and stream a single sheet"""
+    wb = load_workbook(file_name, read_only=True, data_only=True)
+    try:
+        return _read_sheet_columns(ws=wb[spec["sheet_name"]], **_read_options(spec))
+    finally:
+        wb.close()
 
-def extract_base_date(ws, cell) -> datetime:
-    """Extract date from the given sheet and cell"""
-    cell_value = str(ws[cell].value)
-    match = re.search(r"(\d{1,2}/\d{1,2}/\d{4})", cell_value)
+
+def submit_sheet_reads(pool, file_name: str, sheets: dict) -> dict:
+    """Start reading each sheet in its own worker of a process pool (same sheets dict as
+    read_excel_dataframes). The caller can do other work until collect_sheet_reads
+
+    Returns a dict of {key: future}
+    """
+    return {
+        key: pool.submit(_read_one_sheet, file_name, spec)
+        for key, spec in sheets.items()
+    }
+
+
+def collect_sheet_reads(futures: dict, file_name: str, debug: bool = False) -> dict:
+    """Wait for the sheets started by submit_sheet_reads. Returns a dict of {key: dataframe}"""
+    dfs = {key: future.result() for key, future in futures.items()}
+    _debug_dataframes(file_name, dfs, debug)
+    return dfs
+
+
+def parse_base_date(cell_value) -> datetime:
+    """Base date (mm/dd/yyyy) from the report title cell, e.g. 'Review Note Aging Report as of 10/29/2025'"""
+    match = re.search(r"(\d{1,2}/\d{1,2}/\d{4})", str(cell_value))
 
     base_date = datetime.strptime(match.group(1), "%m/%d/%Y") if match else None
 
@@ -112,12 +390,88 @@ def extract_base_date(ws, cell) -> datetime:
     return base_date
 
 
-def extract_last_sync_signoff_aging_str(ws, cell) -> str:
-    """String formatted with last sync details"""
-
-    cell_value = str(ws[cell].value)
+def parse_last_sync_str(cell_value) -> str:
+    """Signoff aging table title from the last sync cell, e.g. 'Last Synced At: 10/29/2025 08:15 AM'"""
+    cell_value = str(cell_value)
+    if ":" not in cell_value:
+        raise ValueError(f"⚠️ Last sync timestamp not found in: {cell_value}")
     timestamp = cell_value.split(":", 1)[1].strip()
 
     final_str = f"Sign-off Aging pivot (Last Synced At: {timestamp})"
 
     return final_str
+
+
+def probe_source_header(source_file: str, debug: bool = False) -> dict:
+    """Read the base date and the last sync string straight from the xlsx package
+
+    Only the first rows of the two sheets are read (no workbook load), so this takes milliseconds
+    and can run before anything else to validate the source file
+    Returns {"base_date": datetime, "last_sync_str": str}
+    """
+    start = time.perf_counter()
+
+    cells = {C.BASE_DATE_SHEET: [C.BASE_DATE_CELL]}
+    cells.setdefault(C.LAST_SYNC_SHEET, []).append(C.LAST_SYNC_CELL)
+    values = read_cells(source_file, cells)
+
+    header = {
+        "base_date": parse_base_date(values[C.BASE_DATE_SHEET][C.BASE_DATE_CELL]),
+        "last_sync_str": parse_last_sync_str(
+            values[C.LAST_SYNC_SHEET][C.LAST_SYNC_CELL]
+        ),
+    }
+
+    if debug:
+        print("\n🐞 ====== DEBUG BLOCK START: probe_source_header (excel_io.py) ======")
+        print("[DEBUG] Header cells:", values)
+        print(f"[DEBUG] Probe took {(time.perf_counter() - start) * 1000:.1f} ms")
+        print("🐞 ====== DEBUG BLOCK END: probe_source_header (excel_io.py) ======\n")
+
+    return header
+
+
+def prev_date_last_row(wb):
+    """Last used row of the PrevDate sheet, to bound the lookups into it (None without the sheet)"""
+    if C.PREV_DATE_SHEET not in wb.sheetnames:
+        return None
+    return wb[C.PREV_DATE_SHEET].max_row
+
+
+def read_prev_date_values(wb) -> dict:
+    """Read the 'As of [PREV DATE]' values from the PrevDate sheet, as (label, value) pairs per table
+
+    Uses the same ranges as the VLOOKUP formulas in src/tables.py:
+        open_notes      - PrevDate!$A$2:$B$36
+        addressed_notes - PrevDate!$D:$E
+        signoff_aging   - PrevDate!$G:$H
+
+    Returns empty lists if there is no PrevDate sheet (the formulas return 0 in that case)
+    """
+    prev_values = {"open_notes": [], "addressed_notes": [], "signoff_aging": []}
+    if C.PREV_DATE_SHEET not in wb.sheetnames:
+        return prev_values
+
+    ws = wb[C.PREV_DATE_SHEET]
+    for row_num, row in enumerate(
+        ws.iter_rows(min_col=1, max_col=8, values_only=True), start=1
+    ):
+        row = tuple(row) + (None,) * (8 - len(row))
+        # VLOOKUP returns 0 for a blank value cell
+        if 2 <= row_num <= 36 and row[0] is not None:
+            prev_values["open_notes"].append((row[0], row[1] or 0))
+        if row[3] is not None:
+            prev_values["addressed_notes"].append((row[3], row[4] or 0))
+        if row[6] is not None:
+            prev_values["signoff_aging"].append((row[6], row[7] or 0))
+
+    return prev_values
+
+
+def read_prev_date_file(filename: str) -> dict:
+    """read_prev_date_values from a workbook file, through a read-only load of its values"""
+    wb = load_values_only_workbook(filename)
+    try:
+        return read_prev_date_values(wb)
+    finally:
+        wb.close()
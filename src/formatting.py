@@ -1,8 +1,12 @@
+from copy import copy
+from itertools import zip_longest
+from weakref import WeakKeyDictionary
+
 from openpyxl.styles import PatternFill, Border, Font, Side, Alignment
+from openpyxl.styles.cell_style import StyleArray
 from openpyxl.formatting.rule import CellIsRule, FormulaRule
 from openpyxl.utils import get_column_letter
-
-import src.constants as C
+from openpyxl.worksheet.worksheet import Worksheet
 
 # ========================================================
 # BASIC COLORS AND FONTS
@@ -133,6 +137,7 @@ FOOTER_BORDER = Border(
 )
 
 GROUP_ROW_FILL = PatternFill(fill_type="solid", start_color=GREY)
+CHILD_ROW_ALIGNMENT = Alignment(indent=2)
 
 
 # ========================================================
@@ -140,137 +145,212 @@ GROUP_ROW_FILL = PatternFill(fill_type="solid", start_color=GREY)
 # ========================================================
 
 
+# Column width index
+#   Writers record the longest text they put in each column (track_column_text), so autofit
+#   never rescans a column. autofit_colums sets the pending widths from the index, and
+#   apply_column_widths writes them to the sheet once, before the workbook is saved
+_COLUMN_TEXT_LENGTHS = WeakKeyDictionary()  # worksheet -> {column number: longest text}
+_PENDING_WIDTHS = WeakKeyDictionary()  # worksheet -> {column number: width}
+
+
+def track_column_text(ws, col, values):
+    """Record the values written to one column of the sheet in the width index
+    Empty values (None, "", 0) don't count, same as a column scan"""
+    longest = max((len(str(value)) for value in values if value), default=0)
+    if not longest:
+        return
+
+    lengths = _COLUMN_TEXT_LENGTHS.setdefault(ws, {})
+    if longest > lengths.get(col, 0):
+        lengths[col] = longest
+
+
+def track_grid_text(ws, start_col, rows):
+    """Record a block of rows (list of row value lists) starting at start_col in the width index"""
+    for offset, values in enumerate(zip_longest(*rows)):
+        track_column_text(ws, start_col + offset, values)
+
+
 def autofit_colums(ws, start_col, end_col, padding=COLUMN_PADDING, limit_width=True):
-    """Set column width based on maximum length of content inside column"""
+    """Set column width based on maximum length of content inside column
+
+    The lengths come from the width index, the width is applied by apply_column_widths
+    """
+    lengths = _COLUMN_TEXT_LENGTHS.get(ws, {})
+    pending = _PENDING_WIDTHS.setdefault(ws, {})
     for col in range(start_col, end_col + 1):
-        col_letter = get_column_letter(col)
-        max_len = 0
-        for cell in ws[col_letter]:
-            if cell.value:
-                max_len = max(max_len, len(str(cell.value)))
-                if limit_width:
-                    # max width should be <= MAX_COL_WIDTH
-                    max_len = min(MAX_COL_WIDTH, max_len)
-        ws.column_dimensions[col_letter].width = max_len + padding
-
-
-def format_title(ws, row, col):
+        max_len = lengths.get(col, 0)
+        if limit_width:
+            # max width should be <= MAX_COL_WIDTH
+            max_len = min(MAX_COL_WIDTH, max_len)
+        pending[col] = max_len + padding
+
+
+def apply_column_widths(ws):
+    """Write the pending autofit widths to the sheet (once, at the end)"""
+    for col, width in _PENDING_WIDTHS.pop(ws, {}).items():
+        ws.column_dimensions[get_column_letter(col)].width = width
+
+
+# Range styling
+#   The format_* functions below describe the styles of a range as a style plan
+#       {(row, col): {"font": Font, "fill": PatternFill, "border": Border, "alignment": Alignment}}
+#   Later entries for the same cell and attribute win, same as assigning them one after another.
+#   apply_range_styles stamps a whole plan at once: each distinct (current style, new attributes)
+#   combination is resolved to a shared style array once per workbook, then copied to the cells
+STYLE_COLLECTIONS = {
+    "font": ("_fonts", "fontId"),
+    "fill": ("_fills", "fillId"),
+    "border": ("_borders", "borderId"),
+    "alignment": ("_alignments", "alignmentId"),
+}
+_STYLE_ARRAYS = (
+    WeakKeyDictionary()
+)  # workbook -> {(style array, attributes): style array}
+
+
+def apply_range_styles(ws, plan):
+    """Apply a style plan (see above) to the worksheet"""
+    if not isinstance(ws, Worksheet):
+        # Buffered report cells (writers.ReportBuffer) hold plain style objects
+        for (row, col), attrs in plan.items():
+            cell = ws.cell(row=row, column=col)
+            for attr, value in attrs.items():
+                setattr(cell, attr, value)
+        return
+
+    wb = ws.parent
+    resolved = _STYLE_ARRAYS.setdefault(wb, {})
+    for (row, col), attrs in plan.items():
+        cell = ws.cell(row=row, column=col)
+        current = cell._style or StyleArray()  # unstyled cells have no style array yet
+        key = (tuple(current), tuple(sorted(attrs.items(), key=lambda kv: kv[0])))
+
+        style = resolved.get(key)
+        if style is None:
+            style = copy(current)
+            for attr, value in attrs.items():
+                collection, id_field = STYLE_COLLECTIONS[attr]
+                setattr(style, id_field, getattr(wb, collection).add(value))
+            resolved[key] = style
+
+        # Every cell gets its own copy, openpyxl changes style arrays in place
+        cell._style = copy(style)
+
+
+def _add_to_plan(ws, plan, cell_styles):
+    """Merge {(row, col): attributes} into the plan, or apply them now if there is no plan"""
+    if plan is None:
+        apply_range_styles(ws, cell_styles)
+        return
+    for cell, attrs in cell_styles.items():
+        plan.setdefault(cell, {}).update(attrs)
+
+
+def _style_cells(ws, plan, cells, **attrs):
+    """Same attributes for all the cells"""
+    _add_to_plan(ws, plan, {cell: attrs for cell in cells})
+
+
+def format_title(ws, row, col, plan=None):
     """Style a header cell with bold font and title color"""
-    cell = ws.cell(row=row, column=col)
-    cell.font = TITLE_FONT
+    _style_cells(ws, plan, [(row, col)], font=TITLE_FONT)
 
 
-def format_header(ws, start_row, start_col, end_col):
+def format_header(ws, start_row, start_col, end_col, plan=None):
     """Style a header with bold font, fill color"""
-    num_cols = end_col - start_col + 1
-    for col in range(num_cols):
-        cell = ws.cell(row=start_row, column=start_col + col)
-        cell.font = HEADER_FONT
-        cell.fill = HEADER_FILL
-        cell.border = HEADER_BORDER
+    cells = [(start_row, col) for col in range(start_col, end_col + 1)]
+    _style_cells(
+        ws, plan, cells, font=HEADER_FONT, fill=HEADER_FILL, border=HEADER_BORDER
+    )
 
 
-def format_footer(ws, end_row, start_col, end_col):
+def format_footer(ws, end_row, start_col, end_col, plan=None):
     """Style the last row with bold font and fill color"""
-    num_cols = end_col - start_col + 1
-    for col in range(num_cols):
-        cell = ws.cell(row=end_row, column=start_col + col)
-        cell.font = FOOTER_FONT
-        cell.fill = FOOTER_FILL
-        cell.border = FOOTER_BORDER
+    cells = [(end_row, col) for col in range(start_col, end_col + 1)]
+    _style_cells(
+        ws, plan, cells, font=FOOTER_FONT, fill=FOOTER_FILL, border=FOOTER_BORDER
+    )
 
 
 def format_group_rows(
-    ws, start_row, start_col, end_row, end_col, group_col, group_list
+    ws, start_row, start_col, end_row, end_col, group_col, group_list, plan=None
 ):
     """Fill the entire Group row with a grey colour.
     - group_col is the column number where the group names appear
     - group_list is a list of group names to check
     """
-    for row in range(start_row, end_row + 1):
-        cell = ws.cell(row=row, column=group_col)
-        if cell.value in group_list:
-            # Colour the entire row
-            for col in range(start_col, end_col + 1):
-                cell = ws.cell(row=row, column=col)
-                cell.fill = GROUP_ROW_FILL
-                cell.font = BOLD_FONT
+    cells = [
+        (row, col)
+        for row in range(start_row, end_row + 1)
+        if ws.cell(row=row, column=group_col).value in group_list
+        # Colour the entire row
+        for col in range(start_col, end_col + 1)
+    ]
+    _style_cells(ws, plan, cells, fill=GROUP_ROW_FILL, font=BOLD_FONT)
 
 
-def indent_child_rows(ws, start_row, end_row, group_col, group_list):
+def indent_child_rows(ws, start_row, end_row, group_col, group_list, plan=None):
     """Indent all items appearing below the groups (from group_list)
     - group_col is the column with the groups and children
     """
+    cells = []
     for row in range(start_row, end_row + 1):
-        cell = ws.cell(row=row, column=group_col)
-        if cell.value not in group_list and cell.value not in (None, ""):
-            cell.alignment = Alignment(indent=2)
-
-
-def format_table_data_cells(ws, start_row, start_col, end_row, end_col, debug=False):
+        value = ws.cell(row=row, column=group_col).value
+        if value not in group_list and value not in (None, ""):
+            cells.append((row, group_col))
+    _style_cells(ws, plan, cells, alignment=CHILD_ROW_ALIGNMENT)
+
+
+# Borders of the table data cells (title, header, footer excluded)
+TABLE_DATA_BORDERS = {
+    "top_left": TOP_LEFT_CORNER_BORDER,
+    "top_right": TOP_RIGHT_CORNER_BORDER,
+    "bottom_left": BOTTOM_LEFT_CORNER_BORDER,
+    "bottom_right": BOTTOM_RIGHT_CORNER_BORDER,
+    "top": TOP_EDGE_BORDER,
+    "bottom": BOTTOM_EDGE_BORDER,
+    "left": LEFT_EDGE_BORDER,
+    "right": RIGHT_EDGE_BORDER,
+    "inner": INNER_CELL_BORDER,
+}
+
+
+def _box_part(row, col, start_row, start_col, end_row, end_col):
+    """Which part of a box a cell is in: a corner, an edge, or inner
+    In a one row (or one column) box, the bottom (right) side wins"""
+    vertical = "bottom" if row == end_row else "top" if row == start_row else ""
+    horizontal = "right" if col == end_col else "left" if col == start_col else ""
+    if vertical and horizontal:
+        return f"{vertical}_{horizontal}"
+    return vertical or horizontal or "inner"
+
+
+def format_table_data_cells(
+    ws,
+    start_row,
+    start_col,
+    end_row,
+    end_col,
+    debug=False,
+    plan=None,
+    borders=TABLE_DATA_BORDERS,
+):
     """Style the cells inside the table
-    Values passed exclude title, header, footer"""
-
-    # --------------------------------------------
-    # 1. Set all the corners
-    cell = ws.cell(row=start_row, column=start_col)
-    cell.border = TOP_LEFT_CORNER_BORDER
-    if debug:
-        print(f"TOP_LEFT_CORNER_BORDER: ({start_row}, {start_col}), {cell.value}")
-
-    cell = ws.cell(row=start_row, column=end_col)
-    cell.border = TOP_RIGHT_CORNER_BORDER
-    if debug:
-        print(f"TOP_RIGHT_CORNER_BORDER: ({start_row}, {end_col})), {cell.value}")
-
-    cell = ws.cell(row=end_row, column=start_col)
-    cell.border = BOTTOM_LEFT_CORNER_BORDER
-    if debug:
-        print(f"BOTTOM_LEFT_CORNER_BORDER: ({end_row}, {start_col}), {cell.value}")
-
-    cell = ws.cell(row=end_row, column=end_col)
-    cell.border = BOTTOM_RIGHT_CORNER_BORDER
-    if debug:
-        print(f"BOTTOM_RIGHT_CORNER_BORDER: ({end_row}, {end_col}), {cell.value}")
-
-    # --------------------------------------------
-    # 2. Set all edges (excluding corners)
-    # Top edge
-    for col in range(start_col + 1, end_col):
-        cell = ws.cell(start_row, col)
-        cell.border = TOP_EDGE_BORDER
-        if debug:
-            print(f"TOP_EDGE_BORDER: ({start_row}, {col}), {cell.value}")
-
-    # Bottom edge
-    for col in range(start_col + 1, end_col):
-        cell = ws.cell(end_row, col)
-        cell.border = BOTTOM_EDGE_BORDER
-        if debug:
-            print(f"BOTTOM_EDGE_BORDER: ({end_row}, {col}), {cell.value}")
-
-    # Left edge
-    for row in range(start_row + 1, end_row):
-        cell = ws.cell(row, start_col)
-        cell.border = LEFT_EDGE_BORDER
-        if debug:
-            print(f"LEFT_EDGE_BORDER: ({row}, {start_col}), {cell.value}")
-
-    # Right edge
-    for row in range(start_row + 1, end_row):
-        cell = ws.cell(row, end_col)
-        cell.border = RIGHT_EDGE_BORDER
-        if debug:
-            print(f"RIGHT_EDGE_BORDER: ({row}, {end_col}), {cell.value}")
-
-    # --------------------------------------------
-    # 3. Inner cells
-    for row in range(start_row + 1, end_row):
-        for col in range(start_col + 1, end_col):
-            cell = ws.cell(row, col)
-            cell.border = INNER_CELL_BORDER
+    Values passed exclude title, header, footer
+
+    Corners get a thin border on their two outer sides, edges on their outer side,
+    and all other sides are dotted
+    """
+    box_plan = {}
+    for row in range(start_row, end_row + 1):
+        for col in range(start_col, end_col + 1):
+            part = _box_part(row, col, start_row, start_col, end_row, end_col)
+            box_plan[(row, col)] = {"border": borders[part]}
             if debug:
-                print(f"INNER_CELL_BORDER: ({row}, {col}), {cell.value}")
+                print(f"{part.upper()} BORDER: ({row}, {col})")
+
+    _add_to_plan(ws, plan, box_plan)
 
 
 def conditional_format_number_5color_scale(ws, cell_range):
@@ -314,9 +394,11 @@ def conditional_format_number_positive_negative(ws, cell_range):
 # 2. Format groups (if groups)
 # 3. Format inside cells
 # 4. Format header, footer, title
+# Each report runs this workflow from the style rules of its spec (src/report_specs.py),
+# see format_reports in src/report_engine.py
 
 
-def apply_basic_formatting(ws_report, report_range):
+def apply_basic_formatting(ws_report, report_range, plan=None):
     rep_start_row = report_range["start_row"]
     rep_start_col = report_range["start_col"]
     rep_end_row = report_range["end_row"]
@@ -326,7 +408,7 @@ def apply_basic_formatting(ws_report, report_range):
     autofit_colums(ws=ws_report, start_col=rep_start_col, end_col=rep_end_col)
 
     # Format the title
-    format_title(ws=ws_report, row=rep_start_row, col=rep_start_col)
+    format_title(ws=ws_report, row=rep_start_row, col=rep_start_col, plan=plan)
 
     # Format the header rows
     header_row = rep_start_row + 1
@@ -335,6 +417,7 @@ def apply_basic_formatting(ws_report, report_range):
         start_row=header_row,
         start_col=rep_start_col,
         end_col=rep_end_col,
+        plan=plan,
     )
 
     # Set borders to all table data cells, and outside table border
@@ -346,312 +429,26 @@ def apply_basic_formatting(ws_report, report_range):
         start_col=rep_start_col,
         end_row=data_end_row,
         end_col=rep_end_col,
+        plan=plan,
     )
 
     # Format the footer rows
     format_footer(
-        ws=ws_report, end_row=rep_end_row, start_col=rep_start_col, end_col=rep_end_col
-    )
-
-
-def apply_indents_for_child_rows(ws_report, report_range, group_list):
-    rep_start_row = report_range["start_row"]
-    rep_start_col = report_range["start_col"]
-    rep_end_row = report_range["end_row"]
-    rep_end_col = report_range["end_col"]
-
-    # Format the main group rows (Audit, TA) - color the entire row
-    format_group_rows(
         ws=ws_report,
-        start_row=rep_start_row,
-        start_col=rep_start_col,
         end_row=rep_end_row,
-        end_col=rep_end_col,
-        group_col=rep_start_col,
-        group_list=group_list,
-    )
-
-    # Indent the child rows - Indent all rows other than the main groups
-    indent_start_row = rep_start_row + 2  # First 2 rows are title and header
-    indent_end_row = rep_end_row - 1  # Last row is footer
-    indent_child_rows(
-        ws=ws_report,
-        start_row=indent_start_row,
-        end_row=indent_end_row,
-        group_col=rep_start_col,
-        group_list=group_list,
-    )
-
-
-def format_open_notes_report(ws_report, open_notes_range):
-    """Format Report1: Open Review Notes (based on Open Review Notes table)
-
-    Args:
-        ws_report (Openpyxl Worksheet): handle to the report worksheet
-        report_range (dict): start and end positions of the report
-                            e.g. {"start_row": 1, "start_col": 1, "end_col": 7, "end_row": 38}
-    """
-
-    # ==== 1. Apply conditional formatting ====
-    f_start_row = open_notes_range["start_row"] + 2  # First 2 rows are title and header
-    f_end_row = open_notes_range["end_row"] - 1  # Last row is footer
-
-    #   Conditional formatting #1 (5 scale) - Grand Total
-    total_col = get_column_letter(C.REPORT1_GRAND_TOTAL_COL)
-    total_cell_range = f"{total_col}{f_start_row}:{total_col}{f_end_row}"
-    conditional_format_number_5color_scale(ws=ws_report, cell_range=total_cell_range)
-
-    #   Conditional formatting #1 (> or < 0) - Difference
-    diff_col = get_column_letter(C.REPORT1_DIFFERENCE_COL)
-    diff_cell_range = f"{diff_col}{f_start_row}:{diff_col}{f_end_row}"
-    conditional_format_number_positive_negative(
-        ws=ws_report, cell_range=diff_cell_range
-    )
-
-    # ==== 2. Indent child rows and fill-colour the group header rows ====
-    assigned_groups = ["Audit", "TA"]
-    apply_indents_for_child_rows(
-        ws_report=ws_report, report_range=open_notes_range, group_list=assigned_groups
-    )
-
-    # ==== 3. Format table data cells (inner cells), header, footer, and title ====
-    apply_basic_formatting(ws_report=ws_report, report_range=open_notes_range)
-
-    print("\n⚑ 2. Formatted Open Review Notes Report")
-
-
-# ---------------------------------------------------------
-
-
-def format_addressed_notes_report(ws_report, addressed_notes_range):
-    """Format Report1: Open Review Notes (based on Open Review Notes table)
-
-    Args:
-        ws_report (Openpyxl Worksheet): handle to the report worksheet
-        report_range (dict): start and end positions of the report
-                            e.g. {"start_row": 1, "start_col": 1, "end_col": 7, "end_row": 38}
-    """
-
-    # ==== 1. Apply conditional formatting ====
-    f_start_row = (
-        addressed_notes_range["start_row"] + 2
-    )  # First 2 rows are title and header
-    f_end_row = addressed_notes_range["end_row"] - 1  # Last row is footer
-
-    # Conditional formatting #1 (5 scale) - Addressed column
-    addr_col = get_column_letter(C.REPORT2_ADDRESSED_COL)
-    addr_cell_range = f"{addr_col}{f_start_row}:{addr_col}{f_end_row}"
-    conditional_format_number_5color_scale(ws=ws_report, cell_range=addr_cell_range)
-
-    #   Conditional formatting #1 (> or < 0) - Difference
-    diff_col = get_column_letter(C.REPORT2_DIFFERENCE_COL)
-    diff_cell_range = f"{diff_col}{f_start_row}:{diff_col}{f_end_row}"
-    conditional_format_number_positive_negative(
-        ws=ws_report, cell_range=diff_cell_range
-    )
-
-    # ==== 2. Indent child rows and fill-colour the group header rows ====
-    assigned_groups = ["Audit", "TA"]
-    apply_indents_for_child_rows(
-        ws_report=ws_report,
-        report_range=addressed_notes_range,
-        group_list=assigned_groups,
-    )
-
-    # ==== 3. Format table data cells (inner cells), header, footer, and title ====
-    apply_basic_formatting(ws_report=ws_report, report_range=addressed_notes_range)
-
-    print("\n⚑ 1. Formatted Addressed Review Notes Report")
-
-
-def format_signoff_aging_report(ws_report, signoff_aging_range):
-    """Format Report3: Signoff Aging Report (based on Signoff Aging table)
-
-    Args:
-        ws_report (Openpyxl Worksheet): handle to the report worksheet
-        report_range (dict): start and end positions of the report
-                            e.g. {"start_row": 1, "start_col": 1, "end_col": 7, "end_row": 38}
-    """
-    # ==== 1. Apply conditional formatting ====
-    f_start_row = (
-        signoff_aging_range["start_row"] + 2
-    )  # First 2 rows are title and header
-    f_end_row = signoff_aging_range["end_row"] - 1  # Last row is footer
-
-    #   Conditional formatting #1 (> or < 0) - Difference
-    diff_col = get_column_letter(C.REPORT3_DIFFERENCE_COL)
-    diff_cell_range = f"{diff_col}{f_start_row}:{diff_col}{f_end_row}"
-    conditional_format_number_positive_negative(
-        ws=ws_report, cell_range=diff_cell_range
-    )
-
-    # ==== 2. Format table data cells (inner cells), header, footer, and title ====
-    apply_basic_formatting(ws_report=ws_report, report_range=signoff_aging_range)
-
-    print("\n⚑ 3. Signoff Aging Report")
-
-
-def format_all_reports(ws_report, report_ranges):
-    if report_ranges["open_notes"]:
-        format_open_notes_report(
-            ws_report=ws_report, open_notes_range=report_ranges["open_notes"]
-        )
-
-    if report_ranges["addressed_notes"]:
-        format_addressed_notes_report(
-            ws_report=ws_report, addressed_notes_range=report_ranges["addressed_notes"]
-        )
-
-    if report_ranges["signoff_aging_notes"]:
-        format_signoff_aging_report(
-            ws_report=ws_report,
-            signoff_aging_range=report_ranges["signoff_aging_notes"],
-        )
-
-
-# -------------------------
-# OLD - to be deleted
-# -------------------------
-
-
-def old_format_open_notes_report(ws_report, report_range):
-    """Format Report1: Open Review Notes (based on Open Review Notes table)
-
-    Args:
-        ws_report (Openpyxl Worksheet): handle to the report worksheet
-        report_range (dict): start and end positions of the report
-                            e.g. {"start_row": 1, "start_col": 1, "end_col": 7, "end_row": 38}
-    """
-
-    rep_start_row = report_range["start_row"]
-    rep_start_col = report_range["start_col"]
-    rep_end_row = report_range["end_row"]
-    rep_end_col = report_range["end_col"]
-
-    # Fit text to columns
-    autofit_colums(ws=ws_report, start_col=rep_start_col, end_col=rep_end_col)
-
-    # Format the title
-    format_title(ws=ws_report, row=rep_start_row, col=rep_start_col)
-
-    # Format the header rows
-    header_row = rep_start_row + 1
-    format_header(
-        ws=ws_report,
-        start_row=header_row,
         start_col=rep_start_col,
         end_col=rep_end_col,
+        plan=plan,
     )
 
-    # Conditional formatting #1 (5 scale) - Grand Total
-    total_col = get_column_letter(C.REPORT1_GRAND_TOTAL_COL)
-    total_start_row = rep_start_row + 2  # First 2 rows are title and header
-    total_end_row = rep_end_row - 1  # Last row is footer
-    total_cell_range = f"{total_col}{total_start_row}:{total_col}{total_end_row}"
-    conditional_format_number_5color_scale(ws=ws_report, cell_range=total_cell_range)
-
-    # Conditional formatting #1 (> or < 0) - Difference
-    diff_col = get_column_letter(C.REPORT1_DIFFERENCE_COL)
-    diff_start_row = rep_start_row + 2  # First 2 rows are title and header
-    diff_end_row = rep_end_row - 1  # Last row is footer
-    diff_cell_range = f"{diff_col}{diff_start_row}:{diff_col}{diff_end_row}"
-    conditional_format_number_positive_negative(
-        ws=ws_report, cell_range=diff_cell_range
-    )
-
-    # Format the main group rows (Audit, TA) - color the entire row
-    main_groups = ["Audit", "TA"]
-    format_group_rows(
-        ws=ws_report,
-        start_row=rep_start_row,
-        start_col=rep_start_col,
-        end_row=rep_end_row,
-        end_col=rep_end_col,
-        group_col=rep_start_col,
-        group_list=main_groups,
-    )
-
-    # Indent the child rows - Indent all rows other than the main groups
-    main_groups = ["Audit", "TA"]
-    indent_start_row = rep_start_row + 2  # First 2 rows are title and header
-    indent_end_row = rep_end_row - 1  # Last row is footer
-    indent_child_rows(
-        ws=ws_report,
-        start_row=indent_start_row,
-        end_row=indent_end_row,
-        group_col=rep_start_col,
-        group_list=main_groups,
-    )
-
-    # Set borders to all table data cells, and outside table border
-    data_start_row = rep_start_row + 2  # First 2 rows are title and header
-    data_end_row = rep_end_row - 1  # Last row is footer
-    format_table_data_cells(
-        ws=ws_report,
-        start_row=data_start_row,
-        start_col=rep_start_col,
-        end_row=data_end_row,
-        end_col=rep_end_col,
-    )
-
-    # Format the footer rows
-    format_footer(
-        ws=ws_report, end_row=rep_end_row, start_col=rep_start_col, end_col=rep_end_col
-    )
-
-    print("\n📍 1. Formatted Open Notes Report")
-
-
-def old_format_addressed_notes_report(ws_report, report_range):
-    """Format Report2: Addressed Review Notes (based on Addressed Review Notes table)
-
-    Args:
-        ws_report (Openpyxl Worksheet): handle to the report worksheet
-        report_range (dict): start and end positions of the report
-                            e.g. {"start_row": 1, "start_col": 1, "end_col": 7, "end_row": 38}
-    """
 
+def apply_indents_for_child_rows(ws_report, report_range, group_list, plan=None):
     rep_start_row = report_range["start_row"]
     rep_start_col = report_range["start_col"]
     rep_end_row = report_range["end_row"]
     rep_end_col = report_range["end_col"]
 
-    # Fit text to columns
-    autofit_colums(ws=ws_report, start_col=rep_start_col, end_col=rep_end_col)
-
-    # Format the title
-    format_title(ws=ws_report, row=rep_start_row, col=rep_start_col)
-
-    # Format the header rows
-    header_row = rep_start_row + 1
-    format_header(
-        ws=ws_report,
-        start_row=header_row,
-        start_col=rep_start_col,
-        end_col=rep_end_col,
-    )
-    print(
-        f"Addressed notes Header -------- header_row: {header_row}, start_col: {rep_start_col}, end_col: {rep_end_col}"
-    )
-
-    # Conditional formatting #1 (5 scale) - Addressed column
-    total_col = get_column_letter(C.REPORT2_ADDRESSED_COL)
-    total_start_row = rep_start_row + 2  # First 2 rows are title and header
-    total_end_row = rep_end_row - 1  # Last row is footer
-    total_cell_range = f"{total_col}{total_start_row}:{total_col}{total_end_row}"
-    conditional_format_number_5color_scale(ws=ws_report, cell_range=total_cell_range)
-
-    # Conditional formatting #1 (> or < 0) - Difference
-    diff_col = get_column_letter(C.REPORT2_DIFFERENCE_COL)
-    diff_start_row = rep_start_row + 2  # First 2 rows are title and header
-    diff_end_row = rep_end_row - 1  # Last row is footer
-    diff_cell_range = f"{diff_col}{diff_start_row}:{diff_col}{diff_end_row}"
-    conditional_format_number_positive_negative(
-        ws=ws_report, cell_range=diff_cell_range
-    )
-
     # Format the main group rows (Audit, TA) - color the entire row
-    main_groups = ["Audit", "TA"]
     format_group_rows(
         ws=ws_report,
         start_row=rep_start_row,
@@ -659,11 +456,11 @@ def old_format_addressed_notes_report(ws_report, report_range):
         end_row=rep_end_row,
         end_col=rep_end_col,
         group_col=rep_start_col,
-        group_list=main_groups,
+        group_list=group_list,
+        plan=plan,
     )
 
     # Indent the child rows - Indent all rows other than the main groups
-    main_groups = ["Audit", "TA"]
     indent_start_row = rep_start_row + 2  # First 2 rows are title and header
     indent_end_row = rep_end_row - 1  # Last row is footer
     indent_child_rows(
@@ -671,80 +468,6 @@ def old_format_addressed_notes_report(ws_report, report_range):
         start_row=indent_start_row,
         end_row=indent_end_row,
         group_col=rep_start_col,
-        group_list=main_groups,
-    )
-
-    # Set borders to all table data cells, and outside table border
-    data_start_row = rep_start_row + 2  # First 2 rows are title and header
-    data_end_row = rep_end_row - 1  # Last row is footer
-    format_table_data_cells(
-        ws=ws_report,
-        start_row=data_start_row,
-        start_col=rep_start_col,
-        end_row=data_end_row,
-        end_col=rep_end_col,
-    )
-
-    # Format the footer rows
-    format_footer(
-        ws=ws_report, end_row=rep_end_row, start_col=rep_start_col, end_col=rep_end_col
-    )
-
-    print("\n📍 2. Formatted Addressed Review Notes Report")
-
-
-def old_format_signoff_aging_report(ws_report, report_range):
-    """Format Report3: Signoff Aging Report (based on Signoff Aging table)
-
-    Args:
-        ws_report (Openpyxl Worksheet): handle to the report worksheet
-        report_range (dict): start and end positions of the report
-                            e.g. {"start_row": 1, "start_col": 1, "end_col": 7, "end_row": 38}
-    """
-
-    rep_start_row = report_range["start_row"]
-    rep_start_col = report_range["start_col"]
-    rep_end_row = report_range["end_row"]
-    rep_end_col = report_range["end_col"]
-
-    # Fit text to columns
-    autofit_colums(ws=ws_report, start_col=rep_start_col, end_col=rep_end_col)
-
-    # Format the title
-    format_title(ws=ws_report, row=rep_start_row, col=rep_start_col)
-
-    # Format the header rows
-    header_row = rep_start_row + 1
-    format_header(
-        ws=ws_report,
-        start_row=header_row,
-        start_col=rep_start_col,
-        end_col=rep_end_col,
-    )
-
-    # Conditional formatting #1 (> or < 0) - Difference
-    diff_col = get_column_letter(C.REPORT3_DIFFERENCE_COL)
-    diff_start_row = rep_start_row + 2  # First 2 rows are title and header
-    diff_end_row = rep_end_row - 1  # Last row is footer
-    diff_cell_range = f"{diff_col}{diff_start_row}:{diff_col}{diff_end_row}"
-    conditional_format_number_positive_negative(
-        ws=ws_report, cell_range=diff_cell_range
-    )
-
-    # Set borders to all table data cells, and outside table border
-    data_start_row = rep_start_row + 2  # First 2 rows are title and header
-    data_end_row = rep_end_row - 1  # Last row is footer
-    format_table_data_cells(
-        ws=ws_report,
-        start_row=data_start_row,
-        start_col=rep_start_col,
-        end_row=data_end_row,
-        end_col=rep_end_col,
-    )
-
-    # Format the footer rows
-    format_footer(
-        ws=ws_report, end_row=rep_end_row, start_col=rep_start_col, end_col=rep_end_col
+        group_list=group_list,
+        plan=plan,
     )
-
-    print("\n📍 3. Formatted Signoff Aging Report")
@@ -0,0 +1,145 @@
+# ======================================
+# IMPORTS
+# ======================================
+import src.constants as C
+from src.pivots import layout_pivot, layout_aging_pivot, has_unique_labels
+from src.report_specs import PIVOTS, REPORTS
+
+# ========================================================
+# Layout allocator
+#   The size of every block is known as soon as the pivots are built:
+#       pivot          - title, blank row, 'Row Labels' header, then its layout rows
+#       table / report - title, header, then one row per layout row of its row pivot
+#   Blocks are packed side by side (in spec order, LAYOUT_GAP_COLS apart) into bands,
+#   and the bands of a sheet are stacked BUFFER_LINES apart:
+#       Calculations - the pivots, then the summary tables (and the aging pivot) below them
+#       Report       - the reports
+#   All ranges are returned before anything is written, so the formula tables can point
+#   at the pivots, and every block can be written in a single pass
+# ========================================================
+
+PIVOT_HEADER_ROWS = 3  # Title, blank row, 'Row Labels' header
+TABLE_HEADER_ROWS = 2  # Title, header
+PIVOT_WIDTH = 2  # Label and value columns
+
+
+def pack_band(sizes: dict, top_row: int, first_col: int = C.LAYOUT_FIRST_COL):
+    """Place blocks of {key: (height, width)} left to right, all starting on top_row
+
+    Returns {key: {"start_row", "start_col", "end_row", "end_col"}}
+    """
+    ranges = {}
+    col = first_col
+    for key, (height, width) in sizes.items():
+        ranges[key] = {
+            "start_row": top_row,
+            "start_col": col,
+            "end_row": top_row + height - 1,
+            "end_col": col + width - 1,
+        }
+        col += width + C.LAYOUT_GAP_COLS
+    return ranges
+
+
+def band_end_row(ranges: dict) -> int:
+    """Last row used by a band of blocks"""
+    return max(block["end_row"] for block in ranges.values())
+
+
+def pivot_address(block: dict, labels) -> dict:
+    """Range of a pivot block as the pivot writers return it: from the 'Row Labels' header
+    to the total row, and whether the labels are unique (see write_simple_pivot)"""
+    return {
+        "start_row": block["start_row"] + PIVOT_HEADER_ROWS - 1,
+        "start_col": block["start_col"],
+        "end_row": block["end_row"],
+        "end_col": block["end_col"],
+        "unique_labels": has_unique_labels(labels),
+    }
+
+
+def allocate_layout(
+    pivots: dict,
+    aging_pivot=None,
+    prev_values=None,
+    pivot_specs=PIVOTS,
+    reports=REPORTS,
+    debug=False,
+):
+    """Ranges of all the pivots, summary tables and reports, from the pivot sizes
+
+    Returns a dict of {key: range} dicts:
+        pivots       - pivot blocks in Calculations (title row to total row)
+        pivot_ranges - the same pivots from the 'Row Labels' header (see pivot_address)
+        tables       - summary tables in Calculations, below the pivots
+        reports      - reports in the Report tab
+        aging        - {"aging": block} of the aging pivot, right of the summary tables
+                       (empty without an aging pivot)
+        prev         - blocks of the previous values in Calculations, below the summary tables
+                       (see build_prev_value_tables, empty without prev_values)
+    and "pivot_layouts", the layout_pivot of every pivot, computed once here for the writers,
+    the computed tables and the snapshot
+    """
+    pivot_layouts = {key: layout_pivot(pivot) for key, pivot in pivots.items()}
+    labels = {key: pivot_layout["label"] for key, pivot_layout in pivot_layouts.items()}
+
+    pivot_blocks = pack_band(
+        {
+            key: (PIVOT_HEADER_ROWS + len(labels[key]), PIVOT_WIDTH)
+            for key in pivot_specs
+        },
+        top_row=C.LAYOUT_FIRST_ROW,
+    )
+
+    table_sizes = {
+        key: (TABLE_HEADER_ROWS + len(labels[spec["rows"]]), len(spec["columns"]))
+        for key, spec in reports.items()
+    }
+    band_sizes = dict(table_sizes)
+    if aging_pivot is not None:
+        aging_layout = layout_aging_pivot(aging_pivot)
+        band_sizes["aging"] = (
+            PIVOT_HEADER_ROWS + len(aging_layout),
+            len(aging_layout.columns) - 1,  # All but row_type
+        )
+
+    # Leave BUFFER_LINES rows below the longest pivot before starting the tables
+    table_blocks = pack_band(
+        band_sizes, top_row=band_end_row(pivot_blocks) + C.BUFFER_LINES
+    )
+    aging_blocks = (
+        {"aging": table_blocks.pop("aging")} if "aging" in table_blocks else {}
+    )
+    report_blocks = pack_band(table_sizes, top_row=C.LAYOUT_FIRST_ROW)
+
+    prev_blocks = {}
+    if prev_values is not None:
+        prev_blocks = pack_band(
+            {
+                key: (TABLE_HEADER_ROWS + len(pairs), PIVOT_WIDTH)
+                for key, pairs in prev_values.items()
+            },
+            top_row=band_end_row({**table_blocks, **aging_blocks}) + C.BUFFER_LINES,
+        )
+
+    layout = {
+        "pivots": pivot_blocks,
+        "pivot_ranges": {
+            key: pivot_address(block, labels[key])
+            for key, block in pivot_blocks.items()
+        },
+        "tables": table_blocks,
+        "reports": report_blocks,
+        "aging": aging_blocks,
+        "prev": prev_blocks,
+    }
+
+    if debug:
+        print("\n🐞 ====== DEBUG BLOCK START: allocate_layout (layout.py) ======")
+        for band, blocks in layout.items():
+            for key, block in blocks.items():
+                print(f"[DEBUG] {band}.{key}: {block}")
+        print("🐞 ====== DEBUG BLOCK END: allocate_layout (layout.py) ======\n")
+
+    layout["pivot_layouts"] = pivot_layouts
+    return layout
@@ -0,0 +1,563 @@
+# ======================================
+# IMPORTS
+# ======================================
+import glob
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.excel_io import (
+    copy_source,
+    force_excel_recalc,
+    load_working_copy,
+    submit_sheet_reads,
+    collect_sheet_reads,
+    output_path,
+    save_working_copy,
+    probe_source_header,
+    read_excel_dataframes,
+    read_prev_date_values,
+    read_prev_date_file,
+    prev_date_last_row,
+)
+from src.cache import (
+    source_cache_key,
+    load_cached_source,
+    save_cached_source,
+)
+from src.pivots import (
+    get_all_pivot_tables,
+    build_aging_pivot,
+)
+from src.writers import (
+    write_pivot_tables_to_sheet,
+    write_summary_tables_to_sheet,
+    write_aging_pivot_to_sheet,
+    copy_all_tables_to_report,
+    ReportBuffer,
+    stream_report_workbook,
+)
+from src.tables import get_all_tables, build_prev_value_tables
+from src.report_engine import compute_report_tables, write_reports, format_reports
+from src.layout import allocate_layout
+from src.trend import build_trend, write_trend_workbook
+from src.report_specs import TREND
+from src.snapshots import (
+    snapshot_scope,
+    snapshot_from_layouts,
+    save_snapshot,
+    load_previous_snapshot,
+    snapshot_changes,
+)
+from src.formatting import apply_column_widths
+from src.profiler import StageProfiler
+import src.constants as C
+
+# Sheets and columns read from the source workbook to build the pivots
+SOURCE_SHEETS = {
+    "reviewnote_aging": {
+        "sheet_name": C.DF1_SHEET,
+        "header_start": C.DF1_SHEET_HEADER,
+        "columns": C.DF1_COLUMNS,
+        "date_columns": C.DF1_DATE_COLUMNS,
+        "category_columns": C.DF1_CATEGORY_COLUMNS,
+        "integer_columns": C.DF1_INTEGER_COLUMNS,
+        "presence_columns": C.DF1_PRESENCE_COLUMNS,
+    },
+    "signoff_aging": {
+        "sheet_name": C.DF2_SHEET,
+        "header_start": C.DF2_SHEET_HEADER,
+        "columns": C.DF2_COLUMNS,
+        "category_columns": C.DF2_CATEGORY_COLUMNS,
+    },
+}
+
+
+# ======================================
+# ONE SOURCE WORKBOOK
+# ======================================
+def run_pipeline(
+    source_file: str,
+    output_dir: str = None,
+    table_mode: str = "computed",
+    auditable: bool = False,
+    output_mode: str = "workbook",
+    use_cache: bool = True,
+    parallel_read: bool = True,
+    report_changes: bool = False,
+    use_snapshots: bool = True,
+    profiler: StageProfiler = None,
+    debug: bool = False,
+) -> dict:
+    """Build the reports for one source workbook (copy, read, pivots, tables, reports)
+
+    See main.py for the table_mode, auditable and output_mode options.
+    parallel_read parses the two source sheets in worker processes, while the working copy loads
+    Output files are written next to the source file, or in output_dir if given
+    report_changes prints the report rows whose values moved since the last snapshot of this
+    report (the last run on the same base date, else the previous base date)
+    use_snapshots takes the 'As of [PREV DATE]' values from the last snapshot of this report
+    (src/snapshots.py) instead of the PrevDate tab, and saves the counts of this run
+    profiler (src/profiler.py) records the time and memory of each stage, if given
+
+    Returns the files written {"working_copy": path, "report_file": path}
+    (report_file is the working copy, unless the reports are streamed to their own workbook)
+    """
+    if profiler is None:
+        profiler = StageProfiler(enabled=False)
+
+    # ===================================================================
+    # PROCESS EXCEL
+    #   Base date (for reports and for filtering due date pivot) and the last sync string (for the
+    #   signoff aging table title) are probed straight from the source package. This checks the
+    #   source file before any full load
+    with profiler.stage("probe_source_header"):
+        header = probe_source_header(source_file, debug=debug)
+    base_date = header["base_date"]
+    last_sync_str = header["last_sync_str"]
+
+    #   Parsed source sheets are cached by the content hash of the source workbook
+    with profiler.stage("load_cached_source"):
+        cache_key = source_cache_key(source_file, SOURCE_SHEETS) if use_cache else None
+        cached = load_cached_source(cache_key) if use_cache else None
+
+    #   Make a copy of the source file to do all further processing
+    with profiler.stage("copy_source"):
+        working_copy_file = copy_source(source_file, output_dir=output_dir, debug=debug)
+
+    #   Formula values are only needed to read the source sheets into dataframes, so the copy is
+    #   recalculated (before it is loaded) only on a cache miss
+    if cached is None:
+        with profiler.stage("force_excel_recalc"):
+            force_excel_recalc(working_copy_file, debug=debug)
+
+    #   Streamed reports go to their own workbook, so the working copy is only read (source sheets
+    #   and PrevDate): it is never loaded with its formulas, given a Calculations tab or saved again
+    if output_mode == "streamed" and (table_mode != "computed" or auditable):
+        print(
+            "⚠️ Streamed output needs the computed tables without the auditable overlay,",
+            "writing to the Report tab",
+        )
+        output_mode = "workbook"
+    load_copy = output_mode != "streamed"
+
+    #   Open the copy for calculations and writing pivots (with the Calculations and Report tabs).
+    #   To be closed after writing all pivots, tables, and reports
+    wb_main = None
+    if cached is not None:
+        print("\n⚡ Loaded parsed source sheets from cache")
+        dfs = cached["dfs"]
+        if load_copy:
+            with profiler.stage("load_working_copy"):
+                wb_main = load_working_copy(working_copy_file, debug=debug)
+    elif parallel_read:
+        # ===================================================================
+        # PIVOT TABLES
+        #   ReviewNoteAging and Signoff Aging are parsed in worker processes (one per sheet),
+        #   while this process loads the working copy and adds the Calculations and Report tabs
+        #   Only the columns used by the pivots are kept
+        with profiler.stage("read_excel_dataframes"):
+            with ProcessPoolExecutor(max_workers=len(SOURCE_SHEETS)) as pool:
+                futures = submit_sheet_reads(pool, working_copy_file, SOURCE_SHEETS)
+                if load_copy:
+                    with profiler.stage("load_working_copy"):
+                        wb_main = load_working_copy(working_copy_file, debug=debug)
+                dfs = collect_sheet_reads(futures, working_copy_file, debug=debug)
+    else:
+        #   Read ReviewNoteAging and Signoff Aging tabs in one pass, one after the other
+        if load_copy:
+            with profiler.stage("load_working_copy"):
+                wb_main = load_working_copy(working_copy_file, debug=debug)
+        with profiler.stage("read_excel_dataframes"):
+            dfs = read_excel_dataframes(
+                file_name=working_copy_file, sheets=SOURCE_SHEETS, debug=debug
+            )
+
+    if cached is None and use_cache:
+        with profiler.stage("save_cached_source"):
+            save_cached_source(cache_key, dfs, base_date, last_sync_str)
+
+    #   Build and write pivots to sheet, pass the dfs dict
+    #   The due date pivot is a view of the aging crosstab, which the aging pivot reuses
+    crosstabs = {}
+    with profiler.stage("get_all_pivot_tables"):
+        pivots = get_all_pivot_tables(
+            dfs,
+            base_date,
+            crosstabs=crosstabs,
+            debug=debug,
+        )
+
+    with profiler.stage("build_aging_pivot"):
+        aging_pivot = build_aging_pivot(
+            dfs, base_date, crosstabs=crosstabs, debug=debug
+        )
+
+    #   'As of [PREV DATE]' values of the computed tables. When they come from a snapshot, the
+    #   auditable overlay looks them up in a block of Calculations instead of the PrevDate tab,
+    #   so the formulas explain the values of the Report
+    prev_values = prev_tables = None
+    if table_mode == "computed":
+        with profiler.stage("get_prev_values"):
+            prev_values, snapshot_date = get_prev_values(
+                source_file, base_date, wb_main, use_snapshots=use_snapshots
+            )
+        if auditable and snapshot_date is not None:
+            prev_tables = build_prev_value_tables(
+                prev_values, f"snapshot of {snapshot_date:%m/%d/%Y}"
+            )
+
+    #   Ranges of every pivot, table and report, from the pivot sizes (nothing written yet)
+    with profiler.stage("allocate_layout"):
+        layout = allocate_layout(
+            pivots,
+            aging_pivot=aging_pivot,
+            prev_values=prev_values if prev_tables else None,
+            debug=debug,
+        )
+
+    # ===================================================================
+    # SUMMARY TABLES
+    # String for table titles
+    base_date_str = base_date.strftime("%m/%d/%Y")
+
+    #   Build and write summary tables to sheet
+    with profiler.stage("get_all_tables"):
+        if table_mode == "computed":
+            tables = compute_report_tables(
+                layout["pivot_layouts"],
+                prev_values,
+                base_date_str,
+                last_sync_str,
+                debug=debug,
+            )
+        else:
+            tables = get_all_tables(
+                base_date_str,
+                last_sync_str,
+                layout["pivot_ranges"],
+                layout["tables"],
+                prev_date_rows=prev_date_last_row(wb_main),
+                debug=debug,
+            )
+
+        #   Formula overlay for an auditable workbook (same table ranges as the computed tables)
+        calc_tables = tables
+        if table_mode == "computed" and auditable:
+            calc_tables = get_all_tables(
+                base_date_str,
+                last_sync_str,
+                layout["pivot_ranges"],
+                layout["tables"],
+                prev_date_rows=prev_date_last_row(wb_main),
+                prev_blocks=layout["prev"],
+                debug=debug,
+            )
+
+    #   Pivots and tables go to the blocks allocated for them, in one pass over Calculations
+    if wb_main is not None:
+        with profiler.stage("write_calculations_sheet"):
+            write_pivot_tables_to_sheet(
+                pivots,
+                wb_main[C.CALC_SHEET],
+                layout["pivots"],
+                pivot_layouts=layout["pivot_layouts"],
+                debug=debug,
+            )
+            table_ranges = write_summary_tables_to_sheet(
+                calc_tables, wb_main[C.CALC_SHEET], layout["tables"], debug=debug
+            )
+            write_aging_pivot_to_sheet(
+                aging_pivot, wb_main[C.CALC_SHEET], layout["aging"]["aging"]
+            )
+            if prev_tables:
+                write_summary_tables_to_sheet(
+                    prev_tables, wb_main[C.CALC_SHEET], layout["prev"], debug=debug
+                )
+
+    # ===================================================================
+    # GENERATE FORMATTED REPORTS
+    #   Prepare reports in 'Report' sheet and format them
+    if output_mode == "streamed":
+        #   Reports are assembled in a buffer and streamed to their own workbook
+        ws_report = ReportBuffer()
+    else:
+        ws_report = wb_main[C.REPORT_SHEET]
+
+    if table_mode == "computed":
+        #   The computed tables already hold the final values, write them straight to Report
+        with profiler.stage("write_reports"):
+            report_ranges = write_reports(
+                ws_report=ws_report,
+                tables=tables,
+                report_ranges=layout["reports"],
+                debug=debug,
+            )
+    else:
+        #   copy_all_tables_to_report saves and recalculates the workbook once for all tables,
+        #   so there is no separate save here
+        with profiler.stage("copy_all_tables_to_report"):
+            report_ranges = copy_all_tables_to_report(
+                file_path=working_copy_file,
+                wb_src=wb_main,
+                table_ranges=table_ranges,
+                report_blocks=layout["reports"],
+                debug=debug,
+            )
+
+    with profiler.stage("format_reports"):
+        format_reports(ws_report=ws_report, report_ranges=report_ranges)
+
+    report_file = working_copy_file
+    if output_mode == "streamed":
+        with profiler.stage("stream_report_workbook"):
+            report_file = stream_report_workbook(
+                ws_report,
+                output_path(source_file, C.STREAMED_REPORT_PREFIX, output_dir),
+                debug=debug,
+            )
+
+    if wb_main is not None:
+        with profiler.stage("save"):
+            #   Column widths from all autofit calls are applied once, just before saving
+            for ws in wb_main.worksheets:
+                apply_column_widths(ws)
+
+            #   Only Calculations and Report are written out again, the source sheets are copied as they are
+            save_working_copy(wb_main, working_copy_file, debug=debug)
+            wb_main.close()
+
+    #   Counts of this run, the previous values of the next one.
+    #   Saved only once the reports are written, so a failed run leaves no snapshot behind
+    snapshot_values = snapshot_from_layouts(layout["pivot_layouts"])
+    if report_changes:
+        print_report_changes(
+            load_previous_snapshot(
+                snapshot_scope(source_file), base_date, same_date=True
+            ),
+            snapshot_values,
+        )
+    if use_snapshots:
+        with profiler.stage("save_snapshot"):
+            save_snapshot(
+                snapshot_scope(source_file),
+                base_date,
+                snapshot_values,
+                source_file=source_file,
+            )
+
+    return {"working_copy": working_copy_file, "report_file": report_file}
+
+
+def get_prev_values(source_file, base_date, wb, use_snapshots=True) -> tuple:
+    """'As of [PREV DATE]' values for the computed tables (same format as read_prev_date_values)
+
+    Taken from the latest earlier snapshot of this report, or from the PrevDate tab while
+    there is none (e.g. on the first run). The tab is read from wb, or from the source file
+    when the working copy is not loaded (wb is None, streamed output)
+
+    Returns (values, base date of the snapshot used, None for the PrevDate tab)
+    """
+    snapshot = None
+    if use_snapshots:
+        snapshot = load_previous_snapshot(snapshot_scope(source_file), base_date)
+
+    if snapshot is None:
+        if use_snapshots:
+            print(
+                f"\n📸 No earlier snapshot, previous values from the {C.PREV_DATE_SHEET} tab"
+            )
+        if wb is None:
+            return read_prev_date_file(source_file), None
+        return read_prev_date_values(wb), None
+
+    print(
+        "\n📸 Previous values from the snapshot of",
+        snapshot["base_date"].strftime("%m/%d/%Y"),
+    )
+    return snapshot["values"], snapshot["base_date"]
+
+
+def print_report_changes(snapshot, values: dict):
+    """Report rows whose values moved since a snapshot (see snapshot_changes)"""
+    if snapshot is None:
+        print("\n🔁 Changes: no earlier snapshot of this report to compare with")
+        return
+
+    changes = snapshot_changes(snapshot["values"], values)
+    print(
+        f"\n🔁 Changes since the snapshot of {snapshot['base_date']:%m/%d/%Y}:",
+        f"{sum(len(rows) for rows in changes.values())} report rows moved",
+    )
+    for table_key, rows in changes.items():
+        for label, old, new in rows:
+            print(f"   {table_key}: {label} {old} → {new}")
+
+
+# ======================================
+# TREND OVER SEVERAL BASE DATES
+# ======================================
+def run_trend(
+    source_file: str,
+    days: int = TREND["days"],
+    reports: bool = False,
+    output_dir: str = None,
+    use_cache: bool = True,
+    profiler: StageProfiler = None,
+    debug: bool = False,
+) -> dict:
+    """Counts of the trend series (see TREND in src/report_specs.py) for each of the last
+    days base dates, from one read of the source, written to TREND_<source file>
+
+    reports also writes the trend report of every date (Trend Reports sheet)
+    The source is only read (no working copy): the parsed sheets come from the cache, or
+    from the values saved in the source workbook. Nothing is added to the cache
+    Returns the files written {"trend_file": path}
+    """
+    if profiler is None:
+        profiler = StageProfiler(enabled=False)
+
+    with profiler.stage("probe_source_header"):
+        header = probe_source_header(source_file, debug=debug)
+    base_date = header["base_date"]
+
+    with profiler.stage("load_cached_source"):
+        cached = None
+        if use_cache:
+            cached = load_cached_source(source_cache_key(source_file, SOURCE_SHEETS))
+
+    if cached is not None:
+        print("\n⚡ Loaded parsed source sheets from cache")
+        dfs = cached["dfs"]
+    else:
+        with profiler.stage("read_excel_dataframes"):
+            dfs = read_excel_dataframes(
+                file_name=source_file, sheets=SOURCE_SHEETS, debug=debug
+            )
+
+    with profiler.stage("build_trend"):
+        trend = build_trend(dfs, base_date, days=days, debug=debug)
+
+    pivots = None
+    if reports:
+        with profiler.stage("get_all_pivot_tables"):
+            pivots = get_all_pivot_tables(dfs, base_date, debug=debug)
+
+    with profiler.stage("write_trend_workbook"):
+        trend_file = write_trend_workbook(
+            trend,
+            output_path(source_file, C.TREND_PREFIX, output_dir),
+            pivots=pivots,
+            last_sync_str=header["last_sync_str"],
+            debug=debug,
+        )
+
+    return {"trend_file": trend_file}
+
+
+# ======================================
+# BATCH OF SOURCE WORKBOOKS
+# ======================================
+# Files in a batch folder that are not source workbooks: our own outputs, and Excel lock files
+SKIPPED_PREFIXES = (
+    C.WORKING_COPY_PREFIX,
+    C.STREAMED_REPORT_PREFIX,
+    C.TREND_PREFIX,
+    "~$",
+)
+
+
+def find_source_files(path_or_glob: str) -> list:
+    """Source workbooks in a folder (all .xlsx files) or matching a glob pattern, sorted by name"""
+    if os.path.isdir(path_or_glob):
+        path_or_glob = os.path.join(path_or_glob, "*.xlsx")
+
+    return sorted(
+        path
+        for path in glob.glob(path_or_glob)
+        if os.path.isfile(path)
+        and not os.path.basename(path).startswith(SKIPPED_PREFIXES)
+    )
+
+
+def _run_one(
+    source_file: str, options: dict, profile: bool, trace_memory: bool
+) -> dict:
+    """Run the pipeline for one file in a worker process. Failures are returned, not raised,
+    so one bad workbook does not stop the batch"""
+    start = time.perf_counter()
+    profiler = StageProfiler(
+        enabled=profile, trace_memory=trace_memory, label=source_file
+    )
+    result = {"source_file": source_file, "ok": True, "error": None}
+    try:
+        result["outputs"] = run_pipeline(source_file, profiler=profiler, **options)
+    except Exception as e:
+        result["ok"] = False
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    result["seconds"] = time.perf_counter() - start
+    if profile:
+        result["profile"] = profiler.report()
+    return result
+
+
+def run_batch(
+    source_files: list,
+    workers: int = None,
+    profile: bool = False,
+    trace_memory: bool = False,
+    **options,
+) -> list:
+    """Run the pipeline for many source workbooks in a process pool
+
+    options are passed on to run_pipeline. The files are already spread over the workers, so the
+    sheets of one file are read one after the other (parallel_read=False) unless asked otherwise
+    Returns one result dict per file, in input order
+    {"source_file", "ok", "seconds", "outputs" or "error"/"traceback", "profile" if profile is set}
+    """
+    start = time.perf_counter()
+    options.setdefault("parallel_read", False)
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(
+                _run_one, source_file, options, profile, trace_memory
+            ): source_file
+            for source_file in source_files
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results[result["source_file"]] = result
+            status = "✅" if result["ok"] else "❌"
+            print(
+                f"{status} {result['source_file']} ({result['seconds']:.1f} s)",
+                flush=True,
+            )
+
+    results = [results[source_file] for source_file in source_files]
+    print_batch_summary(results, time.perf_counter() - start)
+    return results
+
+
+def print_batch_summary(results: list, wall_seconds: float):
+    """Per-file timings, failures and overall throughput of a batch run"""
+    failed = [r for r in results if not r["ok"]]
+
+    print("\n📊 ====== BATCH SUMMARY ======")
+    for r in results:
+        status = "ok" if r["ok"] else "FAILED"
+        print(f"  {r['seconds']:8.1f} s  {status:6}  {r['source_file']}")
+
+    for r in failed:
+        print(f"\n❌ {r['source_file']}\n{r['traceback']}")
+
+    # Failed files usually stop early, so only the finished ones count towards the throughput
+    done = len(results) - len(failed)
+    files_per_min = done / wall_seconds * 60 if wall_seconds else 0
+    print(
+        f"\n{done}/{len(results)} workbooks done in {wall_seconds:.1f} s",
+        f"({files_per_min:.1f} workbooks/min)",
+    )
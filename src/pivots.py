@@ -1,257 +1,488 @@
 # ======================================
 # IMPORTS
 # ======================================
+import numpy as np
 import pandas as pd
-from datetime import datetime
 
+from src.report_specs import PIVOTS, AGING_BUCKETS, AGING_PIVOT
 
-def build_overdue_pivot(df: pd.DataFrame, debug: bool = False):
-    """Build a pivot for Overdue counts by 'Assigned group' and 'Allocated To', filtered to rows where Aged > 0"""
+# ======================================
+# SINGLE-PASS AGGREGATION ENGINE
+#   Every pivot is declared in src/report_specs.py (PIVOTS): a source frame, a filter, group
+#   keys and a counted column. The pivots of a source are built in one pass over its frame:
+#   group keys are factorized once per key set, each distinct filter is one boolean mask over
+#   the full frame (no filtered copies), and every count is a np.bincount over the group codes.
+# ======================================
 
-    rows = ["Assigned group", "Allocated To"]
-    values = "Content"  # To be renamed as Overdue
+# Filter ops of the pivot specs: (column, value) -> boolean Series
+FILTER_OPS = {
+    "==": lambda column, value: column == value,
+    "!=": lambda column, value: column != value,
+    ">": lambda column, value: column > value,
+    "in": lambda column, value: column.isin(value),
+    "not in": lambda column, value: ~column.isin(value),
+}
+# Ops on a date column, evaluated on the day offsets from the base date
+DATE_FILTER_OPS = ("due_within_days", "due_in_buckets")
+
+
+def factorize_column(column: pd.Series):
+    """pd.factorize(column, sort=True), straight from the integer codes for a category column
+
+    The categories are sorted once (like pd.factorize sorts the values) and the row codes are
+    remapped, so the rows' strings are never hashed
+    Returns (codes, uniques): codes -1 where the value is missing
+    """
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        return pd.factorize(column, sort=True)
+
+    order, uniques = pd.factorize(column.cat.categories, sort=True)
+    row_codes = column.cat.codes.to_numpy()
+    codes = np.full(len(row_codes), -1, dtype=np.int64)
+    present = row_codes >= 0
+    codes[present] = order[row_codes[present]]
+    return codes, uniques
+
+
+def factorize_group_keys(df: pd.DataFrame, keys: list):
+    """Factorize the group key columns into one sorted group code per row
+
+    Returns (codes, index):
+        codes - int array, one code per row (-1 where any key is missing, like groupby drops NaN)
+        index - the groups, sorted like pivot_table sorts its index
+                (MultiIndex for several keys, a plain Index named after the key for one key)
+    """
+    level_codes = []
+    level_uniques = []
+    for key in keys:
+        codes, uniques = factorize_column(df[key])
+        level_codes.append(codes.astype(np.int64))
+        level_uniques.append(uniques)
+
+    # One combined code per row, in (level0, level1, ...) order
+    valid = np.ones(len(df), dtype=bool)
+    combined = np.zeros(len(df), dtype=np.int64)
+    for codes, uniques in zip(level_codes, level_uniques):
+        valid &= codes >= 0
+        combined = combined * max(len(uniques), 1) + codes
+
+    # Dense codes for the key combinations that actually occur, sorted
+    group_ids, combined_uniques = pd.factorize(combined[valid], sort=True)
+    codes = np.full(len(df), -1, dtype=np.int64)
+    codes[valid] = group_ids
+
+    # Back from the combined codes to the label of each level
+    levels = []
+    remaining = np.asarray(combined_uniques, dtype=np.int64)
+    for uniques in reversed(level_uniques):
+        size = max(len(uniques), 1)
+        levels.insert(0, uniques.take(remaining % size))
+        remaining = remaining // size
+
+    if len(keys) == 1:
+        index = pd.Index(levels[0], name=keys[0])
+    else:
+        index = pd.MultiIndex.from_arrays(levels, names=keys)
 
-    required = ["Assigned group", "Allocated To", "Content"]
-    missing = [col for col in required if col not in df.columns]
-    if missing:
-        raise ValueError(f"Missing columns for overdue_pivot: {missing}")
+    return codes, index
 
-    # Filter for Aged
-    filtered_df = df[df["Aged"] > 0].copy()
 
-    # Build pivot (keep the #N/A values because we want to display them as well)
-    pivot = filtered_df.pivot_table(values=values, index=rows, aggfunc="count").rename(
-        columns={"Content": "Overdue"}
-    )
+def count_by_group(codes, index, row_mask, value_mask, value_name) -> pd.DataFrame:
+    """Count of non-empty values per group, over the rows selected by row_mask
 
-    if debug:
-        print("\n🐞 ====== DEBUG BLOCK START: build_overdue_pivot (pivots.py) ======")
-        # Check if the dataframe structure is correct. MultiIndex expected
-        print("[DEBUG] Pivot Index Type:", type(pivot.index))  # Expected: MultiIndex
-        print(
-            "[DEBUG] Pivot Index Names:", pivot.index.names
-        )  # Expected: ['Assigned group', 'Allocated To']
-        print(
-            "[DEBUG] Pivot Columns:", pivot.columns.to_list()
-        )  # Expected: ['Overdue']
-        print(
-            "[DEBUG] Pivot Preview:", pivot.head(5)
-        )  # Expected: top of multiindex pivot data
-
-        # Write to debug files
-        pivot.to_csv("debug/debug_pivot1.csv", index=True)
-        pivot.to_pickle("debug/debug_pivot1.pkl")
-        print("🐞 Saved intermediate pivot1 to debug_pivot1.csv and debug_pivot1.pkl")
-        print("🐞 ====== DEBUG BLOCK END: build_overdue_pivot (pivots.py) ====== \n")
+    Same result as df[row_mask].pivot_table(values=..., index=keys, aggfunc="count"):
+    groups with no selected rows are left out
+    """
+    selected = (codes >= 0) & row_mask
+    n_groups = len(index)
+    rows_per_group = np.bincount(codes[selected], minlength=n_groups)
+    values_per_group = np.bincount(codes[selected & value_mask], minlength=n_groups)
 
-    return pivot
-
-
-def build_due_date_pivot(df: pd.DataFrame, base_date: datetime, debug: bool = False):
-    """Build a pivot for Due Date count by 'Assigned group' and 'Allocated To', filtered for 'Due within 1-14 Days' start day inclusive"""
+    present = rows_per_group > 0
+    return pd.DataFrame(
+        {value_name: values_per_group[present].astype(np.int64)},
+        index=index[present],
+    )
 
-    rows = ["Assigned group", "Allocated To"]
-    values = "Content"  # To be renamed 'Due within 1-14 Days'
 
-    required = ["Assigned group", "Allocated To", "Content"]
-    missing = [col for col in required if col not in df.columns]
-    if missing:
-        raise ValueError(f"Missing columns for due_date_pivot: {missing}")
-
-    # Apply filter for due dates between 1-14 days (including today)
-    # TODO: Verify with Iris - might need to change to 1-13 days in filter
-    filter_due_in_14_days = (df["Due Date"] - base_date).dt.days.between(
-        0, 14, inclusive="both"
-    )
-    df1 = df[filter_due_in_14_days]
+def due_day_offsets(dates: pd.Series, base_date):
+    """Days from the base date to each date, computed once as an int array
+
+    Same days as (dates - base_date).dt.days (floored). Returns (days, valid): valid is False
+    where the date is missing
+    """
+    delta = (dates - base_date).to_numpy(dtype="timedelta64[ns]")
+    valid = ~np.isnat(delta)
+    days = np.zeros(len(delta), dtype=np.int64)
+    days[valid] = delta[valid] // np.timedelta64(1, "D")
+    return days, valid
+
+
+def aging_bucket_edges(buckets: list = AGING_BUCKETS) -> np.ndarray:
+    """First days of the buckets that have one, checked to be increasing"""
+    firsts = [first for _, first in buckets]
+    if None in firsts[1:]:
+        raise ValueError("Only the first aging bucket can start at None")
+    edges = np.array([first for first in firsts if first is not None], dtype=np.int64)
+    if (np.diff(edges) <= 0).any():
+        raise ValueError(f"Aging buckets must start on increasing days: {buckets}")
+    return edges
+
+
+def aging_bucket_codes(days, valid, buckets: list = AGING_BUCKETS) -> np.ndarray:
+    """Bucket number of each day offset (np.searchsorted against the bucket edges),
+    -1 where the date is missing or before the first bucket"""
+    edges = aging_bucket_edges(buckets)
+    codes = np.searchsorted(edges, days, side="right").astype(np.int64)
+    if buckets[0][1] is not None:
+        codes -= 1  # Days before the first edge are in no bucket
+    codes[~valid] = -1
+    return codes
+
+
+def bucket_numbers(labels: list, buckets: list = AGING_BUCKETS) -> list:
+    """Positions of the bucket labels in the bucket list"""
+    names = [label for label, _ in buckets]
+    unknown = [label for label in labels if label not in names]
+    if unknown:
+        raise ValueError(f"Unknown aging buckets {unknown}, expected some of {names}")
+    return [names.index(label) for label in labels]
+
+
+def filter_mask(df: pd.DataFrame, conditions: list, base_date) -> np.ndarray:
+    """Rows that meet all the (column, op, value) conditions of a pivot filter
+
+    due_within_days selects the rows due between value[0] and value[1] days from the base date
+    (both inclusive), due_in_buckets the rows in the AGING_BUCKETS of the labels in value.
+    Without a base date they select nothing
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value in conditions:
+        if op in DATE_FILTER_OPS:
+            if not base_date:
+                return np.zeros(len(df), dtype=bool)
+            days, valid = due_day_offsets(df[column], base_date)
+            if op == "due_within_days":
+                first, last = value
+                mask &= valid & (days >= first) & (days <= last)
+            else:
+                mask &= np.isin(aging_bucket_codes(days, valid), bucket_numbers(value))
+            continue
+        elif op in FILTER_OPS:
+            selected = FILTER_OPS[op](df[column], value)
+        else:
+            raise ValueError(f"Unknown filter op {op!r} on column {column!r}")
+        # Missing values in nullable columns (e.g. the Int16 'Aged') compare as <NA>
+        mask &= selected.to_numpy(dtype=bool, na_value=False)
+    return mask
+
+
+def check_pivot_columns(df: pd.DataFrame, base_date, pivot_specs: dict):
+    """Raise ValueError if a column used by a pivot is missing (date filters are skipped
+    without a base date, they select nothing then)"""
+    for key, spec in pivot_specs.items():
+        required = spec["group_keys"] + [spec["count"]]
+        required += [
+            column
+            for column, op, _ in spec["filter"]
+            if base_date or op not in DATE_FILTER_OPS
+        ]
+        missing = [col for col in required if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing columns for {key} pivot: {missing}")
+
+
+def pivot_masks(df: pd.DataFrame, base_date, pivot_specs: dict) -> dict:
+    """(row mask, value mask) of each pivot: the rows selected by its filter, and the rows with a
+    non-empty counted column. Each distinct filter and counted column is evaluated once
+
+    The columns are not checked here, see check_pivot_columns (called by build_pivots)
+    """
+    filters = {}
+    counted = {}
+    masks = {}
+    for key, spec in pivot_specs.items():
+        filter_key = repr(spec["filter"])
+        if filter_key not in filters:
+            filters[filter_key] = filter_mask(df, spec["filter"], base_date)
+        if spec["count"] not in counted:
+            counted[spec["count"]] = df[spec["count"]].notna().to_numpy()
+        masks[key] = (filters[filter_key], counted[spec["count"]])
+
+    return masks
+
+
+def build_pivots(
+    dfs: dict, base_date, pivot_specs: dict = PIVOTS, crosstabs=None, debug=False
+):
+    """Build the pivots of the specs, one aggregation pass per source frame
+
+    Each pivot is the same as df[filter].pivot_table(values=count, index=group_keys,
+    aggfunc="count"), with the count column renamed to the value_name of the spec.
+    Pivots whose only condition is due_in_buckets are summed from the aging crosstab of
+    their group keys (see aging_crosstab); crosstabs, if given, is filled with the crosstabs
+    built here, so build_aging_pivot can reuse them
+
+    Returns a dict {pivot key: pivot dataframe}, in the order of the specs
+    """
+    if crosstabs is None:
+        crosstabs = {}
+    pivots = {}
+    n_groups = {}
+    sources = dict.fromkeys(spec["source"] for spec in pivot_specs.values())
+    for source in sources:
+        df = dfs[source]
+        specs = {k: s for k, s in pivot_specs.items() if s["source"] == source}
+        check_pivot_columns(df, base_date, specs)
+        views = {k: s for k, s in specs.items() if is_bucket_view(s)}
+        masks = pivot_masks(
+            df, base_date, {k: s for k, s in specs.items() if k not in views}
+        )
 
-    # Build pivot
-    pivot1 = df1.pivot_table(values=values, index=rows, aggfunc="count").rename(
-        columns={"Content": "Due within 1-14 Days"}
-    )
+        # Group keys are factorized once per key set
+        groups = {}
+        for key, spec in specs.items():
+            keys = tuple(spec["group_keys"])
+            if keys not in groups:
+                groups[keys] = factorize_group_keys(df, list(keys))
+            codes, index = groups[keys]
+
+            if key in views:
+                column, _, labels = spec["filter"][0]
+                crosstab_key = (source, keys, column, spec["count"])
+                if crosstab_key not in crosstabs:
+                    crosstabs[crosstab_key] = aging_crosstab(
+                        df, base_date, keys, column, spec["count"], groups[keys]
+                    )
+                pivots[key] = bucket_view(
+                    crosstabs[crosstab_key], labels, spec["value_name"]
+                )
+                continue
+
+            row_mask, value_mask = masks[key]
+            pivots[key] = count_by_group(
+                codes, index, row_mask, value_mask, spec["value_name"]
+            )
+
+        n_groups[source] = {keys: len(index) for keys, (_, index) in groups.items()}
 
     if debug:
-        print("\n🐞 ====== DEBUG BLOCK START: build_due_date_pivot (pivots.py) ======")
-        # Check dataframe structure. MultiIndex expected
-        print("[DEBUG] Pivot Index type:", type(pivot1.index))
-        print(
-            "[DEBUG] Pivot index names:", pivot1.index.names
-        )  # Expected: ['Assigned group', 'Allocated To']
-        print(
-            "[DEBUG] Pivot columns:", pivot1.columns.to_list()
-        )  # Expected: ['Due within 1-14 Days']
-        print("[DEBUG] Pivot preview:", pivot1.head(5))
+        print("\n🐞 ====== DEBUG BLOCK START: build_pivots (pivots.py) ======")
+        for source, counts in n_groups.items():
+            print(f"[DEBUG] {source}: {len(dfs[source])} rows scanned")
+            for keys, count in counts.items():
+                print(f"[DEBUG]   {' / '.join(keys)}: {count} groups")
+        for name, pivot in pivots.items():
+            print(
+                f"[DEBUG] {name}: {len(pivot)} rows, columns {pivot.columns.to_list()}"
+            )
+        print("🐞 ====== DEBUG BLOCK END: build_pivots (pivots.py) ====== \n")
 
-        # Write to debug files
-        pivot1.to_csv("debug/debug_pivot2.csv", index=True)
-        pivot1.to_pickle("debug/debug_pivot2.pkl")
-        print("🐞 Saved pivot2 dump into debug_pivot2.csv and debug_pivot2.pkl")
-        print("🐞 ====== DEBUG BLOCK END: build_due_date_pivot (pivots.py) ====== \n")
+    return {key: pivots[key] for key in pivot_specs}
 
-    return pivot1
 
+# ======================================
+# AGING BUCKETS
+#   The day offsets from the base date to the due date are computed once, and each row gets
+#   its AGING_BUCKETS bucket with np.searchsorted against the bucket edges. One bincount over
+#   (group, bucket) then gives the count of every bucket per group: the aging crosstab.
+#   The aging pivot shows all its buckets, and the due_in_buckets pivots (e.g. due_date,
+#   'Due within 1-14 Days' = '0-7 Days' + '8-14 Days') are views that sum some of them
+# ======================================
+def is_bucket_view(spec: dict) -> bool:
+    """True for a pivot whose only condition is due_in_buckets"""
+    return len(spec["filter"]) == 1 and spec["filter"][0][1] == "due_in_buckets"
+
+
+def count_by_group_and_bucket(codes, index, buckets, n_buckets, value_mask):
+    """Crosstab of the groups and the buckets: rows and non-empty values per (group, bucket)
+
+    Returns (rows, values), int arrays of shape (number of groups, n_buckets)
+    """
+    selected = (codes >= 0) & (buckets >= 0)
+    cells = codes[selected] * n_buckets + buckets[selected]
+    shape = (len(index), n_buckets)
+    rows = np.bincount(cells, minlength=shape[0] * shape[1]).reshape(shape)
+    values = np.bincount(
+        cells[value_mask[selected]], minlength=shape[0] * shape[1]
+    ).reshape(shape)
+    return rows, values
+
+
+def aging_crosstab(df, base_date, group_keys, column, count, groups=None) -> dict:
+    """Aging crosstab of a frame: {"index": groups, "rows": array, "values": array}
+    (see count_by_group_and_bucket). groups is (codes, index) from factorize_group_keys,
+    if already done. Without a base date no row is in a bucket
+    """
+    codes, index = groups or factorize_group_keys(df, list(group_keys))
+    if base_date:
+        days, valid = due_day_offsets(df[column], base_date)
+        buckets = aging_bucket_codes(days, valid)
+    else:
+        buckets = np.full(len(df), -1, dtype=np.int64)
 
-def build_count_of_content_pivot(df: pd.DataFrame, debug: bool = False):
-    """Build a pivot with no filters, indexed to 'Assigned group' and 'Allocated To', count of Content value"""
+    rows, values = count_by_group_and_bucket(
+        codes, index, buckets, len(AGING_BUCKETS), df[count].notna().to_numpy()
+    )
+    return {"index": index, "rows": rows, "values": values}
+
+
+def bucket_view(crosstab: dict, labels: list, value_name: str) -> pd.DataFrame:
+    """Pivot of the rows in some of the buckets, summed from the aging crosstab
+    (same as count_by_group with the due_in_buckets filter)"""
+    numbers = bucket_numbers(labels)
+    rows = crosstab["rows"][:, numbers].sum(axis=1)
+    values = crosstab["values"][:, numbers].sum(axis=1)
+    present = rows > 0
+    return pd.DataFrame(
+        {value_name: values[present].astype(np.int64)},
+        index=crosstab["index"][present],
+    )
 
-    rows = ["Assigned group", "Allocated To"]
-    values = "Content"
 
-    required = ["Assigned group", "Allocated To", "Content"]
+def build_aging_pivot(dfs, base_date, spec=AGING_PIVOT, crosstabs=None, debug=False):
+    """Count of each AGING_BUCKETS bucket per group: one column per bucket, groups with at
+    least one dated row. Reuses the crosstab of build_pivots if it is in crosstabs
+    """
+    df = dfs[spec["source"]]
+    required = spec["group_keys"] + [spec["column"], spec["count"]]
     missing = [col for col in required if col not in df.columns]
     if missing:
-        raise ValueError(f"Missing columns for count_of_content_pivot: {missing}")
+        raise ValueError(f"Missing columns for {spec['name']} pivot: {missing}")
+
+    crosstab_key = (
+        spec["source"],
+        tuple(spec["group_keys"]),
+        spec["column"],
+        spec["count"],
+    )
+    crosstab = (crosstabs or {}).get(crosstab_key)
+    reused = crosstab is not None
+    if crosstab is None:
+        crosstab = aging_crosstab(
+            df, base_date, spec["group_keys"], spec["column"], spec["count"]
+        )
 
-    # Build pivot
-    pivot = df.pivot_table(values=values, index=rows, aggfunc="count")
+    present = crosstab["rows"].sum(axis=1) > 0
+    pivot = pd.DataFrame(
+        crosstab["values"][present].astype(np.int64),
+        index=crosstab["index"][present],
+        columns=[label for label, _ in AGING_BUCKETS],
+    )
 
     if debug:
-        print(
-            "\n🐞 ====== DEBUG BLOCK START: build_count_of_content_pivot (pivots.py) ======"
-        )
-        # Check if the dataframe structure is correct. MultiIndex expected
-        print("[DEBUG] Pivot Index Type:", type(pivot.index))  # Expected: MultiIndex
-        print(
-            "[DEBUG] Pivot Index Names:", pivot.index.names
-        )  # Expected: ['Assigned group', 'Allocated To']
-        print(
-            "[DEBUG] Pivot Columns:", pivot.columns.to_list()
-        )  # Expected: ['Count of Content']
-        print(
-            "[DEBUG] Pivot Preview:", pivot.head(5)
-        )  # Expected: top of multiindex pivot data
-
-        # Write to debug files
-        pivot.to_csv("debug/debug_pivot3.csv", index=True)
-        pivot.to_pickle("debug/debug_pivot3.pkl")
-        print("🐞 Saved intermediate pivot1 to debug_pivot3.csv and debug_pivot3.pkl")
-        print(
-            "🐞 ====== DEBUG BLOCK END: build_count_of_content_pivot (pivots.py) ====== \n"
-        )
+        print("\n🐞 ====== DEBUG BLOCK START: build_aging_pivot (pivots.py) ======")
+        print(f"[DEBUG] Bucket edges: {aging_bucket_edges().tolist()}")
+        print(f"[DEBUG] Crosstab reused from build_pivots: {reused}")
+        print(f"[DEBUG] {len(pivot)} groups, bucket totals {pivot.sum().to_dict()}")
+        print("🐞 ====== DEBUG BLOCK END: build_aging_pivot (pivots.py) ====== \n")
 
     return pivot
 
 
-def build_addressed_status_pivot(df: pd.DataFrame, debug: bool = False):
-    rows = ["Created by group", "Created By"]
-    values = "Content"
+def get_all_pivot_tables(dfs, base_date, crosstabs=None, debug=False):
+    """Prepare the pivot tables of all report specs (see src/report_specs.py)
 
-    required = ["Created by group", "Created By", "Content", "Status"]
-    missing = [col for col in required if col not in df.columns]
-    if missing:
-        raise ValueError(f"Missing columns for addressed_status_pivot: {missing}")
+    crosstabs: filled with the aging crosstabs that were built (see build_pivots)
+    """
+    pivots = build_pivots(dfs, base_date, PIVOTS, crosstabs=crosstabs, debug=debug)
 
-    # Filter for 'Status' = 'Addressed'
-    filtered_df = df[df["Status"] == "Addressed"]
+    return {key: pivots[key] for key in PIVOTS}
 
-    # Build pivot table
-    pivot = filtered_df.pivot_table(values=values, index=rows, aggfunc="count").rename(
-        columns={"Content": "Addressed"}
-    )
 
-    if debug:
-        print(
-            "\n🐞 ====== DEBUG BLOCK START: build_addressed_status_pivot (pivots.py) ======"
-        )
-        # Check if the dataframe structure is correct. MultiIndex expected
-        print("[DEBUG] Pivot Index Type:", type(pivot.index))  # Expected: MultiIndex
-        print(
-            "[DEBUG] Pivot Index Names:", pivot.index.names
-        )  # Expected: ['Created by group', 'Created By']
-        print(
-            "[DEBUG] Pivot Columns:", pivot.columns.to_list()
-        )  # Expected: ['Addressed']
-        print(
-            "[DEBUG] Pivot Preview:", pivot.head(5)
-        )  # Expected: top of multiindex pivot data
-
-        # Write to debug files
-        pivot.to_csv("debug/debug_pivot4.csv", index=True)
-        pivot.to_pickle("debug/debug_pivot4.pkl")
-        print("🐞 Saved intermediate pivot to debug_pivot4.csv and debug_pivot4.pkl")
-        print(
-            "🐞 ====== DEBUG BLOCK END: build_addressed_status_pivot (pivots.py) ====== \n"
-        )
+def has_unique_labels(labels) -> bool:
+    """True if no label appears twice (text compared case-insensitively, like VLOOKUP matches it),
+    so a lookup of a row's own label always finds that row"""
+    keys = [label.casefold() if isinstance(label, str) else label for label in labels]
+    return len(set(keys)) == len(keys)
 
-    return pivot
 
+def layout_pivot(pivot_df: pd.DataFrame) -> pd.DataFrame:
+    """Rows of a pivot in the order they are written to the sheet, below the 'Row Labels' header
 
-def build_signoff_aging_pivot(df: pd.DataFrame, debug: bool = False):
-    df_row = "Assignee"
-    df_value = "Workflow"
-    df_filter_col = "Signoff Role"
+    The whole grid is built with array operations (no per-row python loop):
+    multi-index pivots get a group header row (with the group total) before the items of
+    each group, and a grand total row at the end. Simple pivots get a total row at the end.
 
-    required = [df_row, df_value, df_filter_col]
-    missing = [col for col in required if col not in df.columns]
-    if missing:
-        raise ValueError(f"Missing columns for signoff_aging pivot: {missing}")
+    Returns a dataframe with columns:
+        label    - text in the label column (group name, item name, 'Grand Total'/'Total')
+        value    - value in the value column
+        row_type - 'group', 'child', 'grand_total' for multi-index pivots
+                   'item', 'total' for simple pivots
+                   (the writers use row_type to pick the cell styles)
+    """
 
-    # Filter for Sign-off Role
-    filtered_df = df[
-        (df["Signoff Role"] != "In-Charge") & (df["Signoff Role"] != "Senior")
-    ]
+    value_col_name = pivot_df.columns.to_list()[0]
+    values = pivot_df[value_col_name].to_numpy()
 
-    # Build pivot table
-    pivot = filtered_df.pivot_table(values=df_value, index=df_row, aggfunc="count")
-
-    if debug:
-        print(
-            "🐞 ====== DEBUG BLOCK START: build_signoff_aging_pivot (pivots.py) ====== \n"
-        )
-        print(f"[DEBUG] Pivot index names: {pivot.index.names}")
-        print(f"[DEBUG] Pivot columns: {pivot.columns}")
-        print(f"[DEBUG] Pivot previes: {pivot.head(5)}")
-
-        # Write to debug file
-        pivot.to_csv("debug/debug_pivot5.csv", index=True)
-        pivot.to_pickle("debug/debug_pivot5.pkl")
-        print("🐞 Saved intermediate pivot to debug_pivot5.csv and debug_pivot5.pkl")
-        print(
-            "🐞 ====== DEBUG BLOCK END: build_signoff_aging_pivot (pivots.py) ====== \n"
+    if not isinstance(pivot_df.index, pd.MultiIndex):
+        labels = np.empty(len(values) + 1, dtype=object)
+        labels[:-1] = pivot_df.index.to_numpy(dtype=object)
+        labels[-1] = "Total"
+        row_types = np.array(["item"] * len(values) + ["total"], dtype=object)
+        return pd.DataFrame(
+            {
+                "label": labels,
+                "value": np.append(values, values.sum()),
+                "row_type": row_types,
+            }
         )
 
-    return pivot
+    groups = pivot_df.index.get_level_values(0).to_numpy(dtype=object)
+    items = pivot_df.index.get_level_values(1).to_numpy(dtype=object)
+    n_items = len(items)
 
+    # A new group starts wherever the level0 label changes
+    new_group = np.ones(n_items, dtype=bool)
+    new_group[1:] = groups[1:] != groups[:-1]
+    group_starts = np.flatnonzero(new_group)
+    group_of_item = np.cumsum(new_group) - 1
+    n_groups = len(group_starts)
 
-def get_all_pivot_tables(dfs, base_date, debug=False):
-    """Prepare the required pivot tables and return as a list"""
+    group_totals = np.add.reduceat(values, group_starts) if n_items else values[:0]
 
-    # Unpack the dfs dict that contain two dataframes from 'ReviewNoteAging' and 'SignoffAging'
-    df_reviewnote = dfs["reviewnote_aging"]
-    df_signoff = dfs["signoff_aging"]
+    # Output positions: each group header is placed before its items
+    item_positions = np.arange(n_items) + group_of_item + 1
+    group_positions = group_starts + np.arange(n_groups)
+    n_rows = n_items + n_groups + 1
 
-    # -----------------------------------------------------
-    # Prepare the pivot tables
-    # -----------------------------------------------------
-    # Pivot1: Overdue pivot
-    overdue_pivot = build_overdue_pivot(df=df_reviewnote, debug=debug)
+    labels = np.empty(n_rows, dtype=object)
+    row_values = np.zeros(n_rows, dtype=values.dtype if n_items else np.int64)
+    row_types = np.empty(n_rows, dtype=object)
 
-    # Pivot2: Overdue pivot
-    if base_date:
-        due_date_pivot = build_due_date_pivot(
-            df=df_reviewnote, base_date=base_date, debug=debug
-        )
-    else:
-        # Empty pivot
-        due_date_pivot = df.iloc[0:0].pivot_table(
-            values="Content", index=["Assigned group", "Allocated To"], aggfunc="count"
-        )
+    labels[item_positions] = items
+    row_values[item_positions] = values
+    row_types[item_positions] = "child"
+
+    labels[group_positions] = groups[group_starts]
+    row_values[group_positions] = group_totals
+    row_types[group_positions] = "group"
 
-    # Pivot3: Count of content pivot
-    count_of_content_pivot = build_count_of_content_pivot(df=df_reviewnote, debug=debug)
+    labels[-1] = "Grand Total"
+    row_values[-1] = group_totals.sum()
+    row_types[-1] = "grand_total"
 
-    # Pivot4: Addressed Status pivot
-    addressed_status_pivot = build_addressed_status_pivot(df=df_reviewnote, debug=debug)
+    return pd.DataFrame({"label": labels, "value": row_values, "row_type": row_types})
 
-    # Pivot5: Signoff Aging pivot
-    signoff_aging_pivot = build_signoff_aging_pivot(df=df_signoff, debug=debug)
 
-    pivots = {
-        "overdue": overdue_pivot,
-        "due_date": due_date_pivot,
-        "count_of_content": count_of_content_pivot,
-        "addressed_status": addressed_status_pivot,
-        "signoff_aging": signoff_aging_pivot,
-    }
+def layout_wide_pivot(pivot_df: pd.DataFrame) -> pd.DataFrame:
+    """Rows of a pivot with several value columns, laid out like layout_pivot (group rows with
+    the group totals, items, grand total) for every column
 
-    return pivots
+    Returns a dataframe with columns label, the pivot columns and row_type
+    """
+    layouts = [layout_pivot(pivot_df[[column]]) for column in pivot_df.columns]
+    first = layouts[0]
+    layout = {"label": first["label"]}
+    for column, column_layout in zip(pivot_df.columns, layouts):
+        layout[column] = column_layout["value"]
+    layout["row_type"] = first["row_type"]
+    return pd.DataFrame(layout)
+
+
+def layout_aging_pivot(aging_pivot: pd.DataFrame) -> pd.DataFrame:
+    """Rows of the aging pivot (see layout_wide_pivot), with a 'Grand Total' column of all
+    the buckets of the row"""
+    return layout_wide_pivot(
+        aging_pivot.assign(**{"Grand Total": aging_pivot.sum(axis=1)})
+    )
@@ -0,0 +1,163 @@
+# ======================================
+# IMPORTS
+# ======================================
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# Peak RSS comes from the resource module, which is not available on Windows
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# ========================================================
+# Stage profiler for the pipeline
+#   Each stage records wall time, CPU time (this process), the peak RSS of the process so far,
+#   and - with trace_memory - the tracemalloc growth and peak inside the stage.
+#   Stages can be nested (e.g. loading the working copy inside the parallel sheet read).
+#
+#   Results are a plain dict (see report), saved as JSON, or as a Chrome trace
+#   (chrome://tracing or https://ui.perfetto.dev) to compare runs side by side
+# ========================================================
+
+MB = 1024 * 1024
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None where it is not available)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / MB if sys.platform == "darwin" else peak / 1024
+
+
+class StageProfiler:
+    """Collects stage timings for one pipeline run. A disabled profiler records nothing"""
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = False, label=None):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.label = label
+        self.stages = []
+        self._open = []  # stack of [stage record, highest traced peak seen while open]
+        self._t0 = time.perf_counter()
+        self._started_at = datetime.now().isoformat(timespec="seconds")
+
+        if self.enabled and self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _fold_traced_peak(self):
+        """Pass the traced peak since the last reset to all open stages, then reset it,
+        so nested stages each see their own peak"""
+        _, peak = tracemalloc.get_traced_memory()
+        for frame in self._open:
+            frame[1] = max(frame[1], peak)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        record = {"name": name, "depth": len(self._open)}
+        if self.trace_memory:
+            self._fold_traced_peak()
+            record["_traced_start"] = tracemalloc.get_traced_memory()[0]
+        frame = [record, 0]
+        self._open.append(frame)
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            record["start_s"] = round(wall_start - self._t0, 6)
+            record["wall_s"] = round(time.perf_counter() - wall_start, 6)
+            record["cpu_s"] = round(time.process_time() - cpu_start, 6)
+            record["peak_rss_mb"] = peak_rss_mb()
+
+            if self.trace_memory:
+                self._fold_traced_peak()
+                current = tracemalloc.get_traced_memory()[0]
+                traced_start = record.pop("_traced_start")
+                record["traced_delta_mb"] = round((current - traced_start) / MB, 3)
+                record["traced_peak_mb"] = round((frame[1] - traced_start) / MB, 3)
+
+            self._open.pop()
+            self.stages.append(record)
+
+    def report(self) -> dict:
+        """Plain dict of the run and its stages (in start order)"""
+        return {
+            "label": self.label,
+            "started_at": self._started_at,
+            "total_s": round(time.perf_counter() - self._t0, 6),
+            "peak_rss_mb": peak_rss_mb(),
+            "trace_memory": self.trace_memory,
+            "stages": sorted(self.stages, key=lambda s: s["start_s"]),
+        }
+
+
+def print_profile(profile: dict):
+    """Table of the stages of one run, slowest parts easy to spot"""
+    print(
+        f"\n⏱️ ====== PROFILE: {profile['label']} ({profile['total_s']:.2f} s) ======"
+    )
+    for stage in profile["stages"]:
+        name = "  " * stage["depth"] + stage["name"]
+        memory = ""
+        if "traced_peak_mb" in stage:
+            memory = f"  traced +{stage['traced_delta_mb']:.1f} MB (peak {stage['traced_peak_mb']:.1f} MB)"
+        print(
+            f"  {name:<34} {stage['wall_s']:8.3f} s wall {stage['cpu_s']:8.3f} s cpu{memory}"
+        )
+    if profile["peak_rss_mb"] is not None:
+        print(f"  Peak RSS: {profile['peak_rss_mb']:.0f} MB")
+
+
+def save_profiles_json(profiles: list, path: str):
+    """Save the profiles of one or more runs as JSON"""
+    with open(path, "w") as f:
+        json.dump({"runs": profiles}, f, indent=2)
+    print("\n✅ Profile saved to:", path)
+
+
+def save_chrome_trace(profiles: list, path: str):
+    """Save the profiles as a Chrome trace (one process row per run)"""
+    events = []
+    for pid, profile in enumerate(profiles, start=1):
+        events.append(
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {"name": profile["label"] or f"run {pid}"},
+            }
+        )
+        for stage in profile["stages"]:
+            args = {
+                k: v
+                for k, v in stage.items()
+                if k not in ("name", "depth", "start_s", "wall_s")
+            }
+            events.append(
+                {
+                    "name": stage["name"],
+                    "ph": "X",
+                    "ts": stage["start_s"] * 1e6,
+                    "dur": stage["wall_s"] * 1e6,
+                    "pid": pid,
+                    "tid": 1,
+                    "args": args,
+                }
+            )
+
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    print("\n✅ Chrome trace saved to:", path)
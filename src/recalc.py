@@ -0,0 +1,825 @@
+# ======================================
+# IMPORTS
+# ======================================
+import re
+import zipfile
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+from src.xlsx_package import (
+    CELL_RE,
+    FORMULA_RE,
+    VALUE_RE,
+    cell_attrs,
+    parse_cell_value,
+    read_shared_strings,
+    rewrite_zip_parts,
+    sheet_part_paths,
+    split_cell_ref,
+    xml_escape,
+    xml_unescape,
+)
+
+# ========================================================
+# In-process formula recalculation
+#   A small evaluator for the formulas this project writes (see src/tables.py):
+#   VLOOKUP, IFERROR, IF, OR/AND/NOT, SUM, arithmetic, comparisons and cell/range
+#   references, including other sheets ('PrevDate!$G:$H').
+#   Formulas are evaluated in dependency order, and the results are written back as
+#   cached <v> values in the sheet xml, so a data_only workbook sees the computed values.
+# ========================================================
+
+
+class FormulaError(Exception):
+    """An Excel error value (#N/A, #VALUE!, ...) raised while evaluating a formula"""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+class UnsupportedFormula(Exception):
+    """The formula uses syntax or functions the evaluator does not cover"""
+
+
+# --------------------------------------------------------
+# Tokenizer
+# --------------------------------------------------------
+_SHEET = r"(?:'(?:[^']|'')+'|[A-Za-z_][\w\.]*)!"
+_CELL = r"\$?[A-Za-z]{1,3}\$?\d+"
+_COL = r"\$?[A-Za-z]{1,3}"
+
+TOKEN_RE = re.compile(
+    rf"""
+    (?P<ws>\s+)
+    |(?P<string>"(?:[^"]|"")*")
+    |(?P<error>\#(?:N/A|VALUE!|REF!|DIV/0!|NUM!|NAME\?|NULL!))
+    |(?P<func>[A-Za-z_][\w\.]*(?=\())
+    |(?P<range>(?:{_SHEET})?(?:{_CELL}:{_CELL}|{_COL}:{_COL}|{_CELL}))
+    |(?P<number>\d+(?:\.\d*)?(?:[Ee][+-]?\d+)?|\.\d+(?:[Ee][+-]?\d+)?)
+    |(?P<bool>(?i:TRUE|FALSE)\b)
+    |(?P<op><=|>=|<>|[-+*/^&=<>%(),])
+    """,
+    re.VERBOSE,
+)
+
+# Operator precedence for binary operators (higher binds tighter)
+BINARY_PRECEDENCE = {
+    "=": 1,
+    "<>": 1,
+    "<": 1,
+    ">": 1,
+    "<=": 1,
+    ">=": 1,
+    "&": 2,
+    "+": 3,
+    "-": 3,
+    "*": 4,
+    "/": 4,
+    "^": 5,
+}
+
+
+def tokenize(formula: str) -> list:
+    """Split a formula (without the leading '=') into (kind, text) tokens"""
+    tokens = []
+    pos = 0
+    while pos < len(formula):
+        match = TOKEN_RE.match(formula, pos)
+        if not match:
+            raise UnsupportedFormula(f"Cannot parse formula at: {formula[pos:]!r}")
+        kind = match.lastgroup
+        if kind != "ws":
+            tokens.append((kind, match.group()))
+        pos = match.end()
+    return tokens
+
+
+# --------------------------------------------------------
+# Shared formulas
+#   Excel stores a formula filled down/across once, on its master cell
+#   (<f t="shared" ref="R2:R9" si="0">VLOOKUP(A2,...)</f>), and the other cells only point to it
+#   (<f t="shared" si="0"/>). Their formula is the master text with the relative references
+#   moved by the offset of the cell from the master.
+# --------------------------------------------------------
+REF_PART_RE = re.compile(r"(\$?)([A-Za-z]{1,3})(?:(\$?)(\d+))?")
+
+
+def _shift_reference(text: str, d_row: int, d_col: int) -> str:
+    """Move the relative parts of a reference ('A1', '$G:$H', 'Sheet!B$2:C5') by an offset"""
+    sheet, _, ref = text.rpartition("!")
+
+    def shift(match):
+        col_abs, col, row_abs, row = match.groups()
+        col_number = column_index_from_string(col.upper())
+        if not col_abs:
+            col_number += d_col
+        if row is not None and not row_abs:
+            row = str(int(row) + d_row)
+        if not 1 <= col_number <= 16384 or (row is not None and int(row) < 1):
+            raise FormulaError("#REF!")
+        col_text = col_abs + get_column_letter(col_number)
+        return col_text if row is None else f"{col_text}{row_abs}{row}"
+
+    try:
+        ref = REF_PART_RE.sub(shift, ref)
+    except FormulaError:
+        return "#REF!"
+    return f"{sheet}!{ref}" if sheet else ref
+
+
+def shift_formula(formula: str, d_row: int, d_col: int) -> str:
+    """Formula of a shared formula cell d_row rows and d_col columns from its master cell"""
+    parts = []
+    pos = 0
+    while pos < len(formula):
+        match = TOKEN_RE.match(formula, pos)
+        if not match:
+            raise UnsupportedFormula(f"Cannot parse formula at: {formula[pos:]!r}")
+        text = match.group()
+        if match.lastgroup == "range":
+            text = _shift_reference(text, d_row, d_col)
+        parts.append(text)
+        pos = match.end()
+    return "".join(parts)
+
+
+# --------------------------------------------------------
+# Parser: tokens -> nested tuples
+#   ("num", 1.0) ("str", "x") ("bool", True) ("err", "#N/A")
+#   ("ref", sheet, r1, c1, r2, c2)  r2 is None for whole-column ranges
+#   ("func", "IF", [args]) ("op", "+", left, right) ("neg", expr) ("pct", expr)
+# --------------------------------------------------------
+def _parse_reference(text: str, current_sheet: str):
+    sheet = current_sheet
+    if "!" in text:
+        sheet, text = text.rsplit("!", 1)
+        if sheet.startswith("'"):
+            sheet = sheet[1:-1].replace("''", "'")
+
+    first, _, last = text.partition(":")
+    last = last or first
+    if any(ch.isdigit() for ch in first):
+        r1, c1 = split_cell_ref(first.upper())
+        r2, c2 = split_cell_ref(last.upper())
+    else:
+        # Whole-column range such as $G:$H
+        r1, r2 = 1, None
+        c1 = column_index_from_string(first.replace("$", "").upper())
+        c2 = column_index_from_string(last.replace("$", "").upper())
+
+    return ("ref", sheet, r1, c1, r2, c2)
+
+
+def parse_formula(formula: str, current_sheet: str):
+    """Parse a formula string ('=...' or without '=') into an expression tree"""
+    text = formula[1:] if formula.startswith("=") else formula
+    tokens = tokenize(text)
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else (None, None)
+
+    def take():
+        nonlocal pos
+        token = peek()
+        pos += 1
+        return token
+
+    def expect(text):
+        kind, value = take()
+        if value != text:
+            raise UnsupportedFormula(f"Expected {text!r} in formula {formula!r}")
+
+    def parse_primary():
+        kind, value = take()
+        if kind == "number":
+            return ("num", float(value))
+        if kind == "string":
+            return ("str", value[1:-1].replace('""', '"'))
+        if kind == "bool":
+            return ("bool", value.upper() == "TRUE")
+        if kind == "error":
+            return ("err", value)
+        if kind == "range":
+            return _parse_reference(value, current_sheet)
+        if kind == "func":
+            name = value.upper()
+            if name.startswith("_XLFN."):
+                name = name[len("_XLFN.") :]
+            expect("(")
+            args = []
+            if peek()[1] != ")":
+                while True:
+                    # Empty arguments (e.g. IF(A1,,1)) are treated as blank
+                    if peek()[1] in (",", ")"):
+                        args.append(("blank",))
+                    else:
+                        args.append(parse_expression(0))
+                    if peek()[1] == ",":
+                        take()
+                        continue
+                    break
+            expect(")")
+            return ("func", name, args)
+        if value == "(":
+            expr = parse_expression(0)
+            expect(")")
+            return expr
+        if value == "-":
+            return ("neg", parse_unary())
+        if value == "+":
+            return parse_unary()
+        raise UnsupportedFormula(f"Unexpected token {value!r} in formula {formula!r}")
+
+    def parse_unary():
+        expr = parse_primary()
+        while peek()[1] == "%":
+            take()
+            expr = ("pct", expr)
+        return expr
+
+    def parse_expression(min_precedence):
+        left = parse_unary()
+        while True:
+            kind, value = peek()
+            precedence = BINARY_PRECEDENCE.get(value) if kind == "op" else None
+            if precedence is None or precedence < min_precedence:
+                return left
+            take()
+            # '^' is evaluated left to right in Excel, like the other operators
+            right = parse_expression(precedence + 1)
+            left = ("op", value, left, right)
+
+    expr = parse_expression(0)
+    if pos != len(tokens):
+        raise UnsupportedFormula(f"Unexpected trailing tokens in formula {formula!r}")
+    return expr
+
+
+# --------------------------------------------------------
+# Workbook model
+#   ctx = {
+#     "zf": open zip, "parts": {sheet: part}, "strings": shared string lookup,
+#     "sheets": {sheet: {"values": {(r, c): v}, "formulas": {(r, c): text}, "max_row": n}},
+#     "evaluate": set of sheet names whose formulas are recalculated,
+#     "results": {(sheet, r, c): value}, "in_progress": set, "unsupported": {(sheet, r, c): reason},
+#     "lookup_index": {(sheet, first row, key col, last row): exact-match index or None},
+#   }
+# --------------------------------------------------------
+def _load_sheet(ctx, sheet_name):
+    """Parse a worksheet part into cached values and formula texts (once per sheet)"""
+    if sheet_name in ctx["sheets"]:
+        return ctx["sheets"][sheet_name]
+
+    if sheet_name not in ctx["parts"]:
+        raise FormulaError("#REF!")
+
+    xml = ctx["zf"].read(ctx["parts"][sheet_name])
+    values = {}
+    formulas = {}
+    shared_masters = {}
+    shared_children = {}
+    max_row = 0
+    for match in CELL_RE.finditer(xml):
+        attrs = cell_attrs(match.group(1))
+        inner = match.group(2)
+        row, col = split_cell_ref(attrs["r"])
+        max_row = max(max_row, row)
+
+        if inner and b"<f" in inner:
+            f_match = FORMULA_RE.search(inner)
+            f_attrs = cell_attrs(f_match.group(1)) if f_match else {}
+            if f_match and f_match.group(2):
+                formulas[(row, col)] = xml_unescape(f_match.group(2))
+                if f_attrs.get("t") == "shared":
+                    shared_masters[f_attrs.get("si")] = (row, col)
+            elif f_attrs.get("t") == "shared":
+                # The text is on the master cell, which may come later in the sheet
+                shared_children[(row, col)] = f_attrs.get("si")
+
+        value = parse_cell_value(attrs.get("t"), inner, ctx["strings"])
+        if attrs.get("t") == "e" and value is not None:
+            value = FormulaError(value)
+        if value is not None:
+            values[(row, col)] = value
+
+    for (row, col), si in shared_children.items():
+        try:
+            if si not in shared_masters:
+                raise UnsupportedFormula(f"Shared formula {si} has no master cell")
+            master_row, master_col = shared_masters[si]
+            formulas[(row, col)] = shift_formula(
+                formulas[(master_row, master_col)], row - master_row, col - master_col
+            )
+        except UnsupportedFormula as err:
+            # Not evaluated: the cell keeps the value cached in the file
+            if sheet_name in ctx["evaluate"]:
+                ctx["unsupported"][(sheet_name, row, col)] = str(err)
+
+    sheet = {"values": values, "formulas": formulas, "max_row": max_row}
+    ctx["sheets"][sheet_name] = sheet
+    return sheet
+
+
+def _stored_value(sheet, row, col):
+    """Value cached in the file. Error values are raised like evaluated errors"""
+    value = sheet["values"].get((row, col))
+    if isinstance(value, FormulaError):
+        raise value
+    return value
+
+
+TOO_DEEP = "Chain of precedents too deep to evaluate"
+
+
+def _cell_value(ctx, sheet_name, row, col):
+    """Value of a single cell, evaluating its formula first if it is on a recalculated sheet"""
+    sheet = _load_sheet(ctx, sheet_name)
+    key = (sheet_name, row, col)
+
+    if key in ctx["results"]:
+        value = ctx["results"][key]
+        if isinstance(value, FormulaError):
+            raise value
+        return value
+
+    if sheet_name in ctx["evaluate"] and (row, col) in sheet["formulas"]:
+        if key in ctx["unsupported"]:
+            return _stored_value(sheet, row, col)
+        if key in ctx["in_progress"]:
+            raise FormulaError("#REF!")  # Circular reference
+
+        ctx["in_progress"].add(key)
+        try:
+            expr = parse_formula(sheet["formulas"][(row, col)], sheet_name)
+            value = _evaluate(ctx, expr, sheet_name)
+            if isinstance(value, tuple) and value[0] == "range":
+                value = _single_value(ctx, value)
+        except FormulaError as err:
+            value = err
+        except UnsupportedFormula as err:
+            # Keep whatever value was cached in the file
+            ctx["unsupported"][key] = str(err)
+            return _stored_value(sheet, row, col)
+        except RecursionError:
+            # Precedents are evaluated recursively, so a very long chain of formulas that
+            # point forward can run out of stack: this cell keeps its cached value, and the
+            # cells that depend on it are evaluated from that value
+            ctx["unsupported"][key] = TOO_DEEP
+            return _stored_value(sheet, row, col)
+        finally:
+            ctx["in_progress"].discard(key)
+
+        ctx["results"][key] = value
+        if isinstance(value, FormulaError):
+            raise value
+        return value
+
+    return _stored_value(sheet, row, col)
+
+
+def _single_value(ctx, rng):
+    """A range used where a single value is expected - only a one cell range is allowed"""
+    _, sheet, r1, c1, r2, c2 = rng
+    if r1 == r2 and c1 == c2:
+        return _cell_value(ctx, sheet, r1, c1)
+    raise FormulaError("#VALUE!")
+
+
+def _range_last_row(ctx, rng):
+    _, sheet, r1, c1, r2, c2 = rng
+    if r2 is None:
+        return _load_sheet(ctx, sheet)["max_row"]
+    return r2
+
+
+def _range_values(ctx, rng):
+    """All values of a range, row by row"""
+    _, sheet, r1, c1, r2, c2 = rng
+    for row in range(r1, _range_last_row(ctx, rng) + 1):
+        for col in range(c1, c2 + 1):
+            yield _cell_value(ctx, sheet, row, col)
+
+
+# --------------------------------------------------------
+# Excel value semantics
+# --------------------------------------------------------
+def to_number(value):
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            raise FormulaError("#VALUE!")
+    raise FormulaError("#VALUE!")
+
+
+def to_bool(value):
+    if value is None:
+        return False
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    if isinstance(value, str) and value.upper() in ("TRUE", "FALSE"):
+        return value.upper() == "TRUE"
+    raise FormulaError("#VALUE!")
+
+
+def to_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _type_rank(value):
+    # Excel orders numbers < text < logicals
+    if isinstance(value, bool):
+        return 2
+    if isinstance(value, str):
+        return 1
+    return 0
+
+
+def match_key(value):
+    """Hashable key under which compare() finds two values equal (text is case-insensitive)"""
+    return (_type_rank(value), value.casefold() if isinstance(value, str) else value)
+
+
+def compare(left, right):
+    """Excel comparison: returns -1, 0 or 1. Blank cells compare as "" / 0 / FALSE"""
+    if left is None:
+        left = (
+            "" if isinstance(right, str) else (False if isinstance(right, bool) else 0)
+        )
+    if right is None:
+        right = (
+            "" if isinstance(left, str) else (False if isinstance(left, bool) else 0)
+        )
+
+    left_rank, right_rank = _type_rank(left), _type_rank(right)
+    if left_rank != right_rank:
+        return -1 if left_rank < right_rank else 1
+    if isinstance(left, str):
+        left, right = left.casefold(), right.casefold()
+    return (left > right) - (left < right)
+
+
+def _binary(op, left, right):
+    if op in ("=", "<>", "<", ">", "<=", ">="):
+        result = compare(left, right)
+        return {
+            "=": result == 0,
+            "<>": result != 0,
+            "<": result < 0,
+            ">": result > 0,
+            "<=": result <= 0,
+            ">=": result >= 0,
+        }[op]
+    if op == "&":
+        return to_text(left) + to_text(right)
+
+    left, right = to_number(left), to_number(right)
+    if op == "+":
+        return left + right
+    if op == "-":
+        return left - right
+    if op == "*":
+        return left * right
+    if op == "/":
+        if right == 0:
+            raise FormulaError("#DIV/0!")
+        return left / right
+    if op == "^":
+        return left**right
+    raise UnsupportedFormula(f"Operator {op}")
+
+
+# --------------------------------------------------------
+# Evaluation
+# --------------------------------------------------------
+def _scalar(ctx, expr, sheet_name):
+    value = _evaluate(ctx, expr, sheet_name)
+    if isinstance(value, tuple) and value[0] == "range":
+        return _single_value(ctx, value)
+    return value
+
+
+def _evaluate(ctx, expr, sheet_name):
+    kind = expr[0]
+    if kind in ("num", "str", "bool"):
+        return expr[1]
+    if kind == "blank":
+        return None
+    if kind == "err":
+        raise FormulaError(expr[1])
+    if kind == "ref":
+        return ("range",) + expr[1:]
+    if kind == "neg":
+        return -to_number(_scalar(ctx, expr[1], sheet_name))
+    if kind == "pct":
+        return to_number(_scalar(ctx, expr[1], sheet_name)) / 100
+    if kind == "op":
+        left = _scalar(ctx, expr[2], sheet_name)
+        right = _scalar(ctx, expr[3], sheet_name)
+        return _binary(expr[1], left, right)
+    if kind == "func":
+        name, args = expr[1], expr[2]
+        if name not in FUNCTIONS:
+            raise UnsupportedFormula(f"Function {name} is not supported")
+        return FUNCTIONS[name](ctx, args, sheet_name)
+    raise UnsupportedFormula(f"Unknown expression {kind}")
+
+
+def _fn_if(ctx, args, sheet_name):
+    if not 1 <= len(args) <= 3:
+        raise FormulaError("#VALUE!")
+    # Only the chosen branch is evaluated, as in Excel
+    if to_bool(_scalar(ctx, args[0], sheet_name)):
+        return _scalar(ctx, args[1], sheet_name) if len(args) > 1 else True
+    return _scalar(ctx, args[2], sheet_name) if len(args) > 2 else False
+
+
+def _fn_iferror(ctx, args, sheet_name):
+    if len(args) != 2:
+        raise FormulaError("#VALUE!")
+    try:
+        return _scalar(ctx, args[0], sheet_name)
+    except FormulaError:
+        return _scalar(ctx, args[1], sheet_name)
+
+
+def _logical_values(ctx, args, sheet_name):
+    for arg in args:
+        value = _evaluate(ctx, arg, sheet_name)
+        if isinstance(value, tuple) and value[0] == "range":
+            # Text and blanks inside ranges are ignored
+            for item in _range_values(ctx, value):
+                if isinstance(item, (bool, int, float)):
+                    yield bool(item)
+        else:
+            yield to_bool(value)
+
+
+def _fn_or(ctx, args, sheet_name):
+    return any(list(_logical_values(ctx, args, sheet_name)))
+
+
+def _fn_and(ctx, args, sheet_name):
+    return all(list(_logical_values(ctx, args, sheet_name)))
+
+
+def _fn_not(ctx, args, sheet_name):
+    if len(args) != 1:
+        raise FormulaError("#VALUE!")
+    return not to_bool(_scalar(ctx, args[0], sheet_name))
+
+
+def _fn_sum(ctx, args, sheet_name):
+    total = 0
+    for arg in args:
+        value = _evaluate(ctx, arg, sheet_name)
+        if isinstance(value, tuple) and value[0] == "range":
+            # Text, logicals and blanks inside ranges are ignored
+            for item in _range_values(ctx, value):
+                if isinstance(item, (int, float)) and not isinstance(item, bool):
+                    total += item
+        else:
+            total += to_number(value)
+    return total
+
+
+def _lookup_index(ctx, table_sheet, r1, c1, last_row):
+    """Hashed exact-match index of the key column of a lookup range: {match key: first row}
+
+    Built once per range and shared by every VLOOKUP into it, so each lookup is a dict get
+    instead of a scan. Key columns with formulas that are recalculated are not indexed
+    (returns None): the scan evaluates them lazily, up to the first match only
+    """
+    cache_key = (table_sheet, r1, c1, last_row)
+    if cache_key in ctx["lookup_index"]:
+        return ctx["lookup_index"][cache_key]
+
+    sheet = _load_sheet(ctx, table_sheet)
+    index = None
+    if table_sheet not in ctx["evaluate"] or not any(
+        row >= r1 and row <= last_row and col == c1 for row, col in sheet["formulas"]
+    ):
+        index = {}
+        for row in range(r1, last_row + 1):
+            key = sheet["values"].get((row, c1))
+            # An exact match skips blank and error cells, as in Excel
+            if key is None or isinstance(key, FormulaError):
+                continue
+            index.setdefault(match_key(key), row)
+
+    ctx["lookup_index"][cache_key] = index
+    return index
+
+
+def _fn_vlookup(ctx, args, sheet_name):
+    if not 3 <= len(args) <= 4:
+        raise FormulaError("#VALUE!")
+
+    lookup_value = _scalar(ctx, args[0], sheet_name)
+    table = _evaluate(ctx, args[1], sheet_name)
+    if not (isinstance(table, tuple) and table[0] == "range"):
+        raise FormulaError("#VALUE!")
+    col_index = int(to_number(_scalar(ctx, args[2], sheet_name)))
+    approximate = to_bool(_scalar(ctx, args[3], sheet_name)) if len(args) > 3 else True
+
+    _, table_sheet, r1, c1, r2, c2 = table
+    if col_index < 1:
+        raise FormulaError("#VALUE!")
+    if col_index > c2 - c1 + 1:
+        raise FormulaError("#REF!")
+    if lookup_value is None:
+        lookup_value = 0
+
+    last_row = _range_last_row(ctx, table)
+    found_row = None
+
+    index = None if approximate else _lookup_index(ctx, table_sheet, r1, c1, last_row)
+    if index is not None:
+        found_row = index.get(match_key(lookup_value))
+        rows_to_scan = ()
+    else:
+        rows_to_scan = range(r1, last_row + 1)
+
+    for row in rows_to_scan:
+        try:
+            key = _cell_value(ctx, table_sheet, row, c1)
+        except FormulaError:
+            if approximate:
+                raise
+            continue  # An exact match skips error cells, as in Excel
+        if key is None:
+            continue
+        if approximate:
+            # Sorted lookup: last row whose key is <= lookup value (same type only)
+            if _type_rank(key) == _type_rank(lookup_value):
+                if compare(key, lookup_value) <= 0:
+                    found_row = row
+                else:
+                    break
+        elif compare(key, lookup_value) == 0:
+            found_row = row
+            break
+
+    if found_row is None:
+        raise FormulaError("#N/A")
+
+    value = _cell_value(ctx, table_sheet, found_row, c1 + col_index - 1)
+    # A blank result cell is returned as 0 by VLOOKUP
+    return 0 if value is None else value
+
+
+FUNCTIONS = {
+    "IF": _fn_if,
+    "IFERROR": _fn_iferror,
+    "OR": _fn_or,
+    "AND": _fn_and,
+    "NOT": _fn_not,
+    "SUM": _fn_sum,
+    "VLOOKUP": _fn_vlookup,
+}
+
+
+# --------------------------------------------------------
+# Writing cached values back into the sheet xml
+# --------------------------------------------------------
+def _cached_value_xml(value):
+    """(type attribute, <v> text) for a formula result"""
+    if isinstance(value, FormulaError):
+        return "e", value.code
+    if isinstance(value, bool):
+        return "b", "1" if value else "0"
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return None, repr(value)
+    return "str", xml_escape(to_text(value))
+
+
+def _patch_sheet_xml(xml: bytes, sheet_name: str, results: dict) -> bytes:
+    """Replace the cached <v> of every recalculated formula cell of the sheet"""
+
+    def replace(match):
+        attrs = cell_attrs(match.group(1))
+        inner = match.group(2)
+        if not inner or b"<f" not in inner:
+            return match.group(0)
+        row, col = split_cell_ref(attrs["r"])
+        key = (sheet_name, row, col)
+        if key not in results:
+            return match.group(0)
+
+        cell_type, text = _cached_value_xml(results[key])
+        attrs.pop("t", None)
+        if cell_type:
+            attrs["t"] = cell_type
+        attr_xml = "".join(f' {k}="{v}"' for k, v in attrs.items())
+
+        formula_xml = FORMULA_RE.search(inner).group(0)
+        rest = VALUE_RE.sub(b"", inner[FORMULA_RE.search(inner).end() :])
+        return (
+            f"<c{attr_xml}>".encode()
+            + formula_xml
+            + f"<v>{text}</v>".encode()
+            + rest
+            + b"</c>"
+        )
+
+    return CELL_RE.sub(replace, xml)
+
+
+def recalculate_workbook(filename: str, sheets=None, debug: bool = False) -> dict:
+    """Recalculate the formulas of an .xlsx file in-process and store the results as cached values
+
+    Args:
+        filename (str): path of the .xlsx file, updated in place
+        sheets (list[str], optional): sheets whose formulas are recalculated. Defaults to all sheets
+        debug (bool, optional): Debug print or not. Defaults to False.
+
+    Returns a dict of counts {"evaluated": n, "errors": n, "unsupported": n}
+    """
+
+    with zipfile.ZipFile(filename) as zf:
+        parts = sheet_part_paths(zf)
+
+        # Shared strings are only parsed if a cell actually refers to one
+        shared = {}
+
+        def shared_string(index):
+            if "list" not in shared:
+                shared["list"] = read_shared_strings(zf)
+            return shared["list"][index]
+
+        ctx = {
+            "zf": zf,
+            "parts": parts,
+            "strings": shared_string,
+            "sheets": {},
+            "evaluate": set(parts if sheets is None else sheets),
+            "results": {},
+            "in_progress": set(),
+            "unsupported": {},
+            "lookup_index": {},
+        }
+
+        # Only sheets that actually contain formulas need to be parsed up front
+        formula_sheets = []
+        for sheet_name in parts:
+            if sheet_name in ctx["evaluate"] and b"<f" in zf.read(parts[sheet_name]):
+                formula_sheets.append(sheet_name)
+
+        # Evaluating a cell evaluates its precedents first (dependency order), results are memoized
+        for sheet_name in formula_sheets:
+            sheet = _load_sheet(ctx, sheet_name)
+            for row, col in sorted(sheet["formulas"]):
+                try:
+                    _cell_value(ctx, sheet_name, row, col)
+                except FormulaError:
+                    pass  # Stored as the cell result
+
+        new_parts = {}
+        for sheet_name in formula_sheets:
+            part = parts[sheet_name]
+            new_parts[part] = _patch_sheet_xml(
+                zf.read(part), sheet_name, ctx["results"]
+            )
+
+    if new_parts:
+        rewrite_zip_parts(filename, new_parts)
+
+    too_deep = sum(reason == TOO_DEEP for reason in ctx["unsupported"].values())
+    if too_deep:
+        print(
+            f"⚠️ {too_deep} formulas have too deep a chain of precedents,",
+            "their cached values were kept",
+        )
+
+    stats = {
+        "evaluated": len(ctx["results"]),
+        "errors": sum(isinstance(v, FormulaError) for v in ctx["results"].values()),
+        "unsupported": len(ctx["unsupported"]),
+    }
+
+    if debug:
+        print("\n🐞 ====== DEBUG BLOCK START: recalculate_workbook (recalc.py) ======")
+        print("[DEBUG] Sheets recalculated:", formula_sheets)
+        print("[DEBUG] Counts:", stats)
+        for key, reason in list(ctx["unsupported"].items())[:10]:
+            print("[DEBUG] Unsupported formula kept as cached value:", key, reason)
+        print("🐞 ====== DEBUG BLOCK END: recalculate_workbook (recalc.py) ====== \n")
+
+    return stats
@@ -0,0 +1,274 @@
+# ======================================
+# IMPORTS
+# ======================================
+import json
+
+import numpy as np
+import pandas as pd
+from openpyxl.utils import get_column_letter
+
+from src.report_specs import REPORTS, GROUP_ROW_LABELS
+from src.formatting import (
+    track_grid_text,
+    apply_basic_formatting,
+    apply_indents_for_child_rows,
+    apply_range_styles,
+    conditional_format_number_5color_scale,
+    conditional_format_number_positive_negative,
+)
+
+# ==================================================================
+# REPORT ENGINE
+#   Builds every report declared in src/report_specs.py (REPORTS) the same way:
+#   1. compute_report_tables - the table values, computed in pandas from the pivots
+#   2. write_reports         - one bulk write of all reports, at the ranges of src/layout.py
+#   3. format_reports        - conditional formats, then one style plan for all reports
+#   The lookups follow the formula versions of the tables (src/tables.py): VLOOKUP returns
+#   the first match (case-insensitive), a missing label gives 0 (IFERROR), and the
+#   'Audit'/'TA' group rows are left blank.
+# ==================================================================
+
+
+def lookup_key(value):
+    """Key used to match labels like VLOOKUP does (text is matched case-insensitively)"""
+    return value.casefold() if isinstance(value, str) else value
+
+
+def first_match_lookup(labels, values) -> pd.Series:
+    """Series of values indexed by lookup key, keeping the first row of duplicate labels (like VLOOKUP)"""
+    keys = pd.Series([lookup_key(label) for label in labels], dtype=object)
+    lookup = pd.Series(list(values), index=keys, dtype=object)
+    return lookup[~keys.duplicated().to_numpy()]
+
+
+def _lookup_column(keys: pd.Series, lookup) -> pd.Series:
+    """VLOOKUP every key in the lookup, 0 where the key is not found"""
+    if lookup is None or len(lookup) == 0:
+        return pd.Series(0, index=keys.index, dtype=object)
+    values = keys.map(lookup)
+    return values.where(values.notna(), 0)
+
+
+def _prev_lookup(pairs):
+    """Lookup of the previous values of a table, from a list of (label, value) pairs"""
+    if not pairs:
+        return None
+    labels, values = zip(*pairs)
+    return first_match_lookup(labels, values)
+
+
+def _group_row_mask(labels: pd.Series) -> np.ndarray:
+    group_keys = {lookup_key(label) for label in GROUP_ROW_LABELS}
+    return labels.map(lambda label: lookup_key(label) in group_keys).to_numpy(
+        dtype=bool
+    )
+
+
+def _sum_above(column: pd.Series) -> int:
+    """SUM() over the rows above the last one - text ("") is ignored, like in Excel"""
+    return sum(v for v in column.iloc[:-1] if not isinstance(v, str))
+
+
+def _table_rows(df: pd.DataFrame) -> list:
+    """Table rows as lists of plain python values"""
+    return [list(row) for row in df.astype(object).itertuples(index=False, name=None)]
+
+
+def compute_report_table(spec, layouts, prev_pairs, title) -> dict:
+    """Values of one report table (see REPORTS in src/report_specs.py)
+
+    layouts holds the pivot layouts by pivot key (see layout_pivot), and prev_pairs the
+    previous values of the table as (label, value) pairs
+    Returns a dict {"title": str, "header": [...], "rows": [[...], ...]}
+    """
+    rows_layout = layouts[spec["rows"]]
+    labels = rows_layout["label"]
+    keys = labels.map(lookup_key)
+    header = [name for name, _ in spec["columns"]]
+
+    is_group_row = np.zeros(len(labels), dtype=bool)
+    if spec["group_rows"]:
+        is_group_row = _group_row_mask(labels)
+    not_group = ~is_group_row
+
+    # Labels, pivot values and lookups first, then the differences in header order
+    df = pd.DataFrame(index=labels.index)
+    for name, source in spec["columns"]:
+        if "label" in source:
+            df[name] = labels
+        elif "value" in source:
+            df[name] = rows_layout["value"]
+        elif "lookup" in source:
+            lookup = layouts[source["lookup"]]
+            df[name] = _lookup_column(
+                keys, first_match_lookup(lookup["label"], lookup["value"])
+            )
+        elif "prev" in source:
+            prev = _lookup_column(keys, _prev_lookup(prev_pairs)).astype(object)
+            prev[is_group_row] = ""
+            if spec["prev_total"] == "sum":
+                # The very last row is the total of the previous values above it
+                prev.iloc[-1] = _sum_above(prev)
+            df[name] = prev
+
+    df = df.astype(object)
+    for name, source in spec["columns"]:
+        if "difference" in source:
+            first, *others = source["difference"]
+            values = df.loc[not_group, first]
+            for other in others:
+                values = values - df.loc[not_group, other]
+            df[name] = ""
+            df.loc[not_group, name] = values
+
+    # Group rows ('Audit', 'TA') only show the label
+    label_columns = [name for name, source in spec["columns"] if "label" in source]
+    value_columns = [name for name in header if name not in label_columns]
+    df.loc[is_group_row, value_columns] = ""
+
+    return {"title": title, "header": header, "rows": _table_rows(df[header])}
+
+
+def compute_report_tables(
+    layouts, prev_values, base_date_str, last_sync_str, reports=REPORTS, debug=False
+):
+    """Prepare the report tables with values computed from the pivots (no formulas)
+
+    layouts holds the layout_pivot of every pivot by pivot key (laid out once by
+    allocate_layout, however many tables look it up)
+    prev_values holds the 'As of [PREV DATE]' values for each table as (label, value) pairs
+    {"open_notes": [...], "addressed_notes": [...], "signoff_aging": [...]}
+    """
+    tables = {}
+    for key, spec in reports.items():
+        title = spec["title"].format(base_date=base_date_str, last_sync=last_sync_str)
+        tables[key] = compute_report_table(
+            spec, layouts, prev_values.get(key) or [], title
+        )
+
+    if debug:
+        file_path = "debug/computed_tables.json"
+        with open(file_path, "w") as f:
+            json.dump(tables, f, indent=2, default=str)
+
+    return tables
+
+
+# ==================================================================
+# BULK WRITE
+# ==================================================================
+
+
+def table_grid(table) -> list:
+    """Rows of a table as written to the sheet: title, header, then the table rows"""
+    width = len(table["header"])
+    return [[table["title"]] + [None] * (width - 1), table["header"]] + table["rows"]
+
+
+def report_cells(tables, report_ranges) -> dict:
+    """{(row, col): value} of all the tables, each placed at its range (see src/layout.py)
+
+    Raises ValueError if a table does not fit its range
+    """
+    cells = {}
+    for key, report_range in report_ranges.items():
+        if not tables.get(key):
+            continue
+        grid = table_grid(tables[key])
+        start_row = report_range["start_row"]
+        start_col = report_range["start_col"]
+        if (start_row + len(grid) - 1, start_col + len(grid[0]) - 1) != (
+            report_range["end_row"],
+            report_range["end_col"],
+        ):
+            raise ValueError(f"Table {key} does not fit its range {report_range}")
+
+        for r, row_values in enumerate(grid):
+            for c, value in enumerate(row_values):
+                cells[(start_row + r, start_col + c)] = value
+
+    return cells
+
+
+def write_reports(ws_report, tables, report_ranges, debug=False):
+    """Write the computed report tables (values, not formulas) straight to the Report sheet
+
+    The cells of all reports are collected first, then written row by row in one pass.
+    No save or recalculation is needed, because the tables already hold the final values.
+    Returns the report ranges that were written, same as copy_all_tables_to_report
+    """
+    cells = report_cells(tables, report_ranges)
+
+    for (row, col), value in sorted(cells.items()):
+        ws_report.cell(row=row, column=col, value=value)
+
+    written = {key: rng for key, rng in report_ranges.items() if tables.get(key)}
+    for key, report_range in written.items():
+        track_grid_text(ws_report, report_range["start_col"], table_grid(tables[key]))
+
+    if debug:
+        print("\n🐞 ====== DEBUG BLOCK START: write_reports (report_engine.py) ======")
+        print("[DEBUG] Cells written:", len(cells))
+        print("[DEBUG] Report ranges:", written)
+        print("🐞 ====== DEBUG BLOCK END: write_reports (report_engine.py) ======\n")
+
+    return written
+
+
+# ==================================================================
+# FORMATTING
+# ==================================================================
+
+
+def _data_column_range(report_range, spec, column_name) -> str:
+    """Cell range of a report column, without the title, header and footer rows"""
+    col = report_range["start_col"] + [name for name, _ in spec["columns"]].index(
+        column_name
+    )
+    letter = get_column_letter(col)
+    first_row = report_range["start_row"] + 2  # First 2 rows are title and header
+    last_row = report_range["end_row"] - 1  # Last row is footer
+    return f"{letter}{first_row}:{letter}{last_row}"
+
+
+def format_reports(ws_report, report_ranges, reports=REPORTS):
+    """Format every report written to the Report sheet, following its style rules
+
+    Conditional formats are added per report, the cell styles of all reports are collected
+    in one plan and applied once
+    """
+    plan = {}
+    for key, spec in reports.items():
+        report_range = report_ranges.get(key)
+        if not report_range:
+            continue
+
+        # ==== 1. Apply conditional formatting ====
+        for column_name in spec["color_scale"]:
+            conditional_format_number_5color_scale(
+                ws=ws_report,
+                cell_range=_data_column_range(report_range, spec, column_name),
+            )
+        for column_name in spec["positive_negative"]:
+            conditional_format_number_positive_negative(
+                ws=ws_report,
+                cell_range=_data_column_range(report_range, spec, column_name),
+            )
+
+        # ==== 2. Indent child rows and fill-colour the group header rows ====
+        if spec["group_rows"]:
+            apply_indents_for_child_rows(
+                ws_report=ws_report,
+                report_range=report_range,
+                group_list=GROUP_ROW_LABELS,
+                plan=plan,
+            )
+
+        # ==== 3. Format table data cells (inner cells), header, footer, and title ====
+        apply_basic_formatting(
+            ws_report=ws_report, report_range=report_range, plan=plan
+        )
+
+        print(f"\n⚑ Formatted {spec['name']}")
+
+    apply_range_styles(ws_report, plan)
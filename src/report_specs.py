@@ -0,0 +1,193 @@
+# ========================================================
+# Report specs
+#   Every report is declared once here: the pivots it is built from (source sheet, filter,
+#   group keys, counted column), its columns (lookups into the pivots, previous values and
+#   differences), and how it is styled.
+#   src/pivots.py (build_pivots) builds all pivots of a source in one aggregation pass, and
+#   src/report_engine.py writes and styles all reports in one pass each.
+#   Positions are not declared: src/layout.py packs the blocks in spec order.
+#   A new report is a new entry in PIVOTS (if it needs a new count) and in REPORTS.
+# ========================================================
+
+ASSIGNED_KEYS = ["Assigned group", "Allocated To"]
+CREATED_KEYS = ["Created by group", "Created By"]
+
+# Group rows of the multi-index pivots, blanked in the tables and filled in the reports
+GROUP_ROW_LABELS = ["Audit", "TA"]
+
+# --------------------------------------------------------
+# Pivots (written to the Calculations tab)
+#   source     - key of the source dataframe (see SOURCE_SHEETS in src/pipeline.py)
+#   group_keys - one key gives a simple pivot, two keys a grouped (multi-index) pivot
+#   filter     - (column, op, value) conditions, all must hold. Ops: ==, !=, >, in, not in,
+#                due_within_days (value is (first, last) days from the base date, inclusive),
+#                due_in_buckets (value is a list of AGING_BUCKETS labels). A pivot whose only
+#                condition is due_in_buckets is a view of the aging crosstab (see AGING_PIVOT)
+#   count      - non-empty values of this column are counted, as value_name
+#   name       - shown in the progress messages
+#   title      - filter description above the pivot
+# --------------------------------------------------------
+PIVOTS = {
+    "overdue": {
+        "name": "Overdue",
+        "source": "reviewnote_aging",
+        "group_keys": ASSIGNED_KEYS,
+        "filter": [("Aged", ">", 0)],
+        "count": "Content",
+        "value_name": "Overdue",
+        "title": "Filter: 'Aged' > 0",
+    },
+    "due_date": {
+        "name": "Due Date",
+        "source": "reviewnote_aging",
+        "group_keys": ASSIGNED_KEYS,
+        "filter": [("Due Date", "due_in_buckets", ["0-7 Days", "8-14 Days"])],
+        "count": "Content",
+        "value_name": "Due within 1-14 Days",
+        "title": "Filter Applied: 'Due Date' 1-14 days (inclusive of start date)",
+    },
+    "count_of_content": {
+        "name": "Count of Content",
+        "source": "reviewnote_aging",
+        "group_keys": ASSIGNED_KEYS,
+        "filter": [],
+        "count": "Content",
+        "value_name": "Content",
+        "title": "Filter: None Applied",
+    },
+    "addressed_status": {
+        "name": "Addressed Status",
+        "source": "reviewnote_aging",
+        "group_keys": CREATED_KEYS,
+        "filter": [("Status", "==", "Addressed")],
+        "count": "Content",
+        "value_name": "Addressed",
+        "title": "Filter: 'Status' == 'Addressed'",
+    },
+    "signoff_aging": {
+        "name": "Signoff aging",
+        "source": "signoff_aging",
+        "group_keys": ["Assignee"],
+        "filter": [("Signoff Role", "not in", ["In-Charge", "Senior"])],
+        "count": "Workflow",
+        "value_name": "Workflow",
+        "title": "Signoff Role != ('In-Charge' or 'Senior')",
+    },
+}
+
+# --------------------------------------------------------
+# Due date aging buckets: (label, first day), days counted from the base date to the due date
+#   A bucket runs up to the day before the first day of the next one, the last one has no end.
+#   Only the first bucket may start at None (no start: everything before the next bucket)
+# --------------------------------------------------------
+AGING_BUCKETS = [
+    ("Overdue", None),
+    ("0-7 Days", 0),
+    ("8-14 Days", 8),
+    ("15-30 Days", 15),
+    ("Over 30 Days", 31),
+]
+
+# Aging pivot (written to the Calculations tab, below the summary tables): the count of each
+# AGING_BUCKETS bucket per group, built as one crosstab (see build_aging_pivot in src/pivots.py)
+AGING_PIVOT = {
+    "name": "Due Date Aging",
+    "source": "reviewnote_aging",
+    "group_keys": ASSIGNED_KEYS,
+    "column": "Due Date",
+    "count": "Content",
+    "title": "Count of Content by days to 'Due Date'",
+}
+
+# --------------------------------------------------------
+# Reports (tables in the Calculations tab, formatted reports in the Report tab)
+#   name       - shown in the progress messages
+#   title      - {base_date} and {last_sync} are filled in per run
+#   rows       - pivot whose layout (groups, items and total) gives the table rows
+#   columns    - in header order, each one of:
+#                  {"label": True}               the row label
+#                  {"value": True}               the value of the row pivot
+#                  {"lookup": pivot}             VLOOKUP of the row label in a pivot (0 if missing)
+#                  {"prev": True}                previous value of the row label (snapshot/PrevDate)
+#                  {"difference": [a, b, ...]}   a - b - ... of other columns
+#   prev_total - "sum": the total row sums the previous values above it
+#                "lookup": it is looked up like the other rows
+#   group_rows - blank all but the label in the GROUP_ROW_LABELS rows
+#   color_scale, positive_negative - columns with the 5 color scale / red-green formatting
+# --------------------------------------------------------
+REPORTS = {
+    "open_notes": {
+        "name": "Open Review Notes Report",
+        "title": "All Open/Reopen Audit review notes to be addressed as of {base_date}",
+        "rows": "count_of_content",
+        "columns": [
+            ("Assigned To", {"label": True}),
+            ("Overdue", {"lookup": "overdue"}),
+            ("Due Soon", {"lookup": "due_date"}),
+            ("Pending", {"difference": ["Grand Total", "Due Soon", "Overdue"]}),
+            ("Grand Total", {"lookup": "count_of_content"}),
+            ("As of [PREV DATE]", {"prev": True}),
+            ("Difference", {"difference": ["Grand Total", "As of [PREV DATE]"]}),
+        ],
+        "prev_total": "lookup",
+        "group_rows": True,
+        "color_scale": ["Grand Total"],
+        "positive_negative": ["Difference"],
+    },
+    "addressed_notes": {
+        "name": "Addressed Review Notes Report",
+        "title": "All Addressed review notes to be cleared as of {base_date}",
+        "rows": "addressed_status",
+        "columns": [
+            ("Created By", {"label": True}),
+            ("Addressed", {"lookup": "addressed_status"}),
+            ("As of [PREV DATE]", {"prev": True}),
+            ("Difference", {"difference": ["Addressed", "As of [PREV DATE]"]}),
+        ],
+        "prev_total": "sum",
+        "group_rows": True,
+        "color_scale": ["Addressed"],
+        "positive_negative": ["Difference"],
+    },
+    "signoff_aging": {
+        "name": "Signoff Aging Report",
+        "title": "{last_sync}",
+        "rows": "signoff_aging",
+        "columns": [
+            ("Row Labels", {"label": True}),
+            ("Count of Workflow", {"value": True}),
+            ("Previous Count", {"prev": True}),
+            ("Differences", {"difference": ["Count of Workflow", "Previous Count"]}),
+        ],
+        "prev_total": "sum",
+        "group_rows": False,
+        "color_scale": [],
+        "positive_negative": ["Differences"],
+    },
+}
+
+# --------------------------------------------------------
+# Trend (TREND_<source file>, see src/trend.py): the series pivots for each of the last
+# `days` base dates, swept in one pass over one load of the source. The notes of the export
+# are taken as they are, only their filters move with the date:
+#   series      - pivots to sweep. Due date filters (due_within_days, due_in_buckets) follow
+#                 the date, day_columns grow by one per day, other conditions hold on all dates
+#   day_columns - columns that count days up to the base date (Aged = base date - due date)
+#   report      - report written for every date with the trend reports. Without the previous
+#                 value columns: all the dates come from the same export
+# --------------------------------------------------------
+TREND = {
+    "name": "Open Review Notes Trend",
+    "days": 30,
+    "series": ["overdue", "due_date"],
+    "day_columns": ["Aged"],
+    "report": {
+        **REPORTS["open_notes"],
+        "columns": [
+            (name, source)
+            for name, source in REPORTS["open_notes"]["columns"]
+            if name not in ("As of [PREV DATE]", "Difference")
+        ],
+        "positive_negative": [],
+    },
+}
@@ -0,0 +1,172 @@
+# ======================================
+# IMPORTS
+# ======================================
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+import src.constants as C
+from src.report_specs import REPORTS
+
+# ========================================================
+# Snapshots of the report counts, one per report and base date
+#   Each run stores its final per-assignee counts in a local SQLite file. The next run looks
+#   up its 'As of [PREV DATE]' values in the latest earlier snapshot of the same report,
+#   instead of in the hand-maintained PrevDate tab.
+#   Values use the same (label, value) pairs per table as read_prev_date_values:
+#       open_notes      - Grand Total per assignee (count of content pivot)
+#       addressed_notes - Addressed per creator (addressed status pivot)
+#       signoff_aging   - Count of Workflow per assignee (signoff aging pivot)
+# ========================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshot_values (
+    scope     TEXT    NOT NULL,
+    base_date TEXT    NOT NULL,
+    table_key TEXT    NOT NULL,
+    position  INTEGER NOT NULL,
+    label,
+    value     INTEGER NOT NULL,
+    PRIMARY KEY (scope, base_date, table_key, position)
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    scope       TEXT NOT NULL,
+    base_date   TEXT NOT NULL,
+    source_file TEXT,
+    saved_at    TEXT NOT NULL,
+    PRIMARY KEY (scope, base_date)
+);
+"""
+
+# Pivot behind the values of each table: the row pivot of every report with previous values
+SNAPSHOT_PIVOTS = {
+    key: spec["rows"]
+    for key, spec in REPORTS.items()
+    if any("prev" in source for _, source in spec["columns"])
+}
+
+# Dates in source file names, e.g. '..._10.29.2025.xlsx'
+FILE_DATE_RE = re.compile(r"[_\s-]*\d{1,4}[./-]\d{1,2}[./-]\d{1,4}")
+
+
+def snapshot_scope(source_file: str) -> str:
+    """Name of the report a source workbook belongs to: the file name without its date,
+    so the exports of one engagement on different days share a scope"""
+    name = os.path.splitext(os.path.basename(source_file))[0]
+    return FILE_DATE_RE.sub("", name).strip() or name
+
+
+def connect(db_path: str = C.SNAPSHOT_DB):
+    # Batch workers write to the same file, so wait for each other's locks
+    con = sqlite3.connect(db_path, timeout=30)
+    con.executescript(SCHEMA)
+    return con
+
+
+def _plain(value):
+    """numpy scalars to python values for sqlite"""
+    return value.item() if hasattr(value, "item") else value
+
+
+def snapshot_from_layouts(pivot_layouts: dict) -> dict:
+    """(label, value) pairs per table from the pivot layouts (see allocate_layout), group rows
+    included, like the pivots"""
+    values = {}
+    for table_key, pivot_key in SNAPSHOT_PIVOTS.items():
+        layout = pivot_layouts[pivot_key]
+        values[table_key] = [
+            (_plain(label), int(value))
+            for label, value in zip(layout["label"], layout["value"])
+        ]
+    return values
+
+
+def save_snapshot(
+    scope: str,
+    base_date: datetime,
+    values: dict,
+    source_file: str = None,
+    db_path: str = C.SNAPSHOT_DB,
+):
+    """Store the values of a run, replacing an earlier snapshot of the same report and date"""
+    date_key = base_date.strftime("%Y-%m-%d")
+    con = connect(db_path)
+    try:
+        with con:
+            con.execute(
+                "DELETE FROM snapshot_values WHERE scope = ? AND base_date = ?",
+                (scope, date_key),
+            )
+            con.executemany(
+                "INSERT INTO snapshot_values VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (scope, date_key, table_key, position, label, value)
+                    for table_key, pairs in values.items()
+                    for position, (label, value) in enumerate(pairs)
+                ],
+            )
+            con.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)",
+                (
+                    scope,
+                    date_key,
+                    source_file,
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+    finally:
+        con.close()
+
+
+def load_previous_snapshot(
+    scope: str, base_date: datetime, db_path: str = C.SNAPSHOT_DB, same_date=False
+):
+    """Latest snapshot of the report from before base_date (or on base_date with same_date,
+    i.e. the last run on the same export)
+
+    Returns None if there is none, else a dict
+    {"base_date": datetime, "values": {table key: [(label, value), ...]}}
+    """
+    if not os.path.exists(db_path):
+        return None
+
+    con = connect(db_path)
+    try:
+        row = con.execute(
+            "SELECT MAX(base_date) FROM snapshots WHERE scope = ? AND base_date "
+            + ("<= ?" if same_date else "< ?"),
+            (scope, base_date.strftime("%Y-%m-%d")),
+        ).fetchone()
+        if row[0] is None:
+            return None
+
+        values = {table_key: [] for table_key in SNAPSHOT_PIVOTS}
+        for table_key, label, value in con.execute(
+            """SELECT table_key, label, value FROM snapshot_values
+               WHERE scope = ? AND base_date = ? ORDER BY table_key, position""",
+            (scope, row[0]),
+        ):
+            values.setdefault(table_key, []).append((label, value))
+    finally:
+        con.close()
+
+    return {"base_date": datetime.strptime(row[0], "%Y-%m-%d"), "values": values}
+
+
+def snapshot_changes(old_values: dict, new_values: dict) -> dict:
+    """Rows whose value moved between two snapshots, per table: {table key: [(label, old, new)]}
+    (0 for rows that were added or dropped). The first row of a label counts, like the lookups
+    """
+    changes = {}
+    for table_key, pairs in new_values.items():
+        old_pairs = old_values.get(table_key, [])
+        old = dict(reversed(old_pairs))
+        new = dict(reversed(pairs))
+        labels = dict.fromkeys([label for label, _ in pairs + old_pairs])
+        changes[table_key] = [
+            (label, old.get(label, 0), new.get(label, 0))
+            for label in labels
+            if old.get(label, 0) != new.get(label, 0)
+        ]
+    return changes
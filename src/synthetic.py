@@ -0,0 +1,316 @@
+# ======================================
+# IMPORTS
+# ======================================
+import os
+import random
+from datetime import datetime, timedelta
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+import src.constants as C
+
+# ========================================================
+# Synthetic source workbooks
+#   Writes a workbook shaped like the client export (same sheets, header offsets, B4 title
+#   cells, VLOOKUP columns and PrevDate tab), with made-up names and random notes, so the
+#   pipeline can be run and timed at any size without the confidential source file.
+#   Rows are appended through write-only worksheets, so 1M notes fit in memory.
+# ========================================================
+
+DEFAULT_BASE_DATE = datetime(2025, 10, 29)
+
+GROUPS = ["Audit", "TA"]  # Main groups the report formatting expects
+NOTE_STATUSES = ["Open", "Addressed", "Reopened", "Cleared"]
+NOTE_STATUS_WEIGHTS = [45, 35, 5, 15]
+SIGNOFF_ROLES = [
+    "Preparer",
+    "In-Charge",
+    "Senior",
+    "Manager",
+    "Senior Manager",
+    "Partner",
+]
+PRIORITIES = ["High", "Medium", "Low"]
+
+FIRST_NAMES = [
+    "Aarav",
+    "Anna",
+    "Ben",
+    "Chen",
+    "Divya",
+    "Elena",
+    "Farah",
+    "George",
+    "Hana",
+    "Ivan",
+    "Jia",
+    "Karan",
+    "Laura",
+    "Mohan",
+    "Nina",
+    "Omar",
+    "Priya",
+    "Quinn",
+    "Ravi",
+    "Sara",
+]
+LAST_NAMES = [
+    "Anand",
+    "Brown",
+    "Costa",
+    "Das",
+    "Evans",
+    "Fischer",
+    "Gupta",
+    "Hughes",
+    "Iyer",
+    "Jones",
+    "Kumar",
+    "Lopez",
+    "Menon",
+    "Nair",
+    "Olsen",
+    "Patel",
+    "Rao",
+    "Smith",
+    "Thomas",
+    "Varma",
+    "Wong",
+    "Yadav",
+    "Zhou",
+]
+
+# ReviewNoteAging columns A..S. R and S are VLOOKUPs into PrevDate, like the client export
+NOTE_COLUMNS = [
+    "Engagement",
+    "Workpaper",
+    "Content",
+    "Status",
+    "Priority",
+    "Created By",
+    "Created by group",
+    "Created Date",
+    "Allocated To",
+    "Assigned group",
+    "Due Date",
+    "Aged",
+    "Addressed By",
+    "Addressed Date",
+    "Cleared By",
+    "Cleared Date",
+    "Comments",
+    "Prev Open Notes",
+    "Prev Addressed Notes",
+]
+SIGNOFF_COLUMNS = [
+    "Engagement",
+    "Workflow",
+    "Workpaper",
+    "Assignee",
+    "Signoff Role",
+    "Days Pending",
+]
+
+# Number formats for the date cells
+DATE_FORMAT = "mm/dd/yyyy"
+
+
+def person_names(count: int) -> list:
+    """count distinct 'Last, First' names (a number is added once the name lists run out)"""
+    names = []
+    for i in range(count):
+        first = FIRST_NAMES[i % len(FIRST_NAMES)]
+        last = LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        cycle = i // (len(FIRST_NAMES) * len(LAST_NAMES))
+        names.append(f"{last}, {first}" + (f" {cycle + 1}" if cycle else ""))
+    return names
+
+
+def assign_groups(names: list) -> dict:
+    """Spread the people over the main groups (about 2/3 Audit, 1/3 TA)"""
+    return {name: GROUPS[0] if i % 3 else GROUPS[1] for i, name in enumerate(names)}
+
+
+def _header_rows(ws, title: str, header_row: int, columns: list):
+    """Blank rows down to the title in B4, then blank rows down to the header row"""
+    title_row, title_col = 4, 2  # B4, see C.BASE_DATE_CELL / C.LAST_SYNC_CELL
+    for row in range(1, header_row):
+        if row == title_row:
+            ws.append([None] * (title_col - 1) + [title])
+        else:
+            ws.append([])
+    ws.append(columns)
+
+
+def _date_cell(ws, value):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.number_format = DATE_FORMAT
+    return cell
+
+
+def write_review_notes(ws, rnd, notes, people, groups, base_date, formulas):
+    """ReviewNoteAging: title in B4, header in row DF1_SHEET_HEADER + 1, one row per note"""
+    header_row = C.DF1_SHEET_HEADER + 1
+    _header_rows(
+        ws,
+        f"Review Note Aging Report as of {base_date.strftime('%m/%d/%Y')}",
+        header_row,
+        NOTE_COLUMNS,
+    )
+
+    allocated_col = get_column_letter(NOTE_COLUMNS.index("Allocated To") + 1)
+    created_col = get_column_letter(NOTE_COLUMNS.index("Created By") + 1)
+    engagements = [f"ENG-{n:05d}" for n in range(max(1, notes // 2000))]
+
+    for i in range(notes):
+        row_num = header_row + 1 + i
+        creator = rnd.choice(people)
+        assignee = rnd.choice(people)
+        status = rnd.choices(NOTE_STATUSES, NOTE_STATUS_WEIGHTS)[0]
+        created = base_date - timedelta(days=rnd.randint(0, 180))
+        due = created + timedelta(days=rnd.randint(7, 90))
+        aged = (base_date - due).days
+        addressed = status in ("Addressed", "Cleared")
+
+        if formulas:
+            prev_open = f"=IFERROR(VLOOKUP({allocated_col}{row_num},{C.PREV_DATE_SHEET}!$A$2:$B$36,2,FALSE),0)"
+            prev_addressed = f"=IFERROR(VLOOKUP({created_col}{row_num},{C.PREV_DATE_SHEET}!$D:$E,2,FALSE),0)"
+        else:
+            prev_open = prev_addressed = None
+
+        ws.append(
+            [
+                rnd.choice(engagements),
+                f"WP-{rnd.randint(1, 999):03d}",
+                # A few notes without content, like the export
+                None if rnd.random() < 0.01 else f"Review note {i + 1}",
+                status,
+                rnd.choice(PRIORITIES),
+                creator,
+                groups[creator],
+                _date_cell(ws, created),
+                assignee,
+                groups[assignee],
+                _date_cell(ws, due),
+                aged,
+                assignee if addressed else None,
+                (
+                    _date_cell(ws, due - timedelta(days=rnd.randint(0, 7)))
+                    if addressed
+                    else None
+                ),
+                creator if status == "Cleared" else None,
+                _date_cell(ws, base_date) if status == "Cleared" else None,
+                None,
+                prev_open,
+                prev_addressed,
+            ]
+        )
+
+
+def write_signoffs(ws, rnd, signoffs, people, base_date):
+    """SignoffAging: last sync title in B4, header in row DF2_SHEET_HEADER + 1"""
+    header_row = C.DF2_SHEET_HEADER + 1
+    _header_rows(
+        ws,
+        f"Last Synced At: {base_date.strftime('%m/%d/%Y')} 08:15 AM",
+        header_row,
+        SIGNOFF_COLUMNS,
+    )
+
+    for i in range(signoffs):
+        ws.append(
+            [
+                f"ENG-{rnd.randint(0, 99):05d}",
+                f"WF-{i + 1:07d}",
+                f"WP-{rnd.randint(1, 999):03d}",
+                rnd.choice(people),
+                rnd.choice(SIGNOFF_ROLES),
+                rnd.randint(0, 60),
+            ]
+        )
+
+
+def write_prev_date(ws, rnd, people):
+    """PrevDate: (label, count) pairs in A:B (rows 2-36), D:E and G:H, see read_prev_date_values"""
+    ws.append(
+        [
+            "Assigned To",
+            "Count",
+            None,
+            "Created By",
+            "Count",
+            None,
+            "Row Labels",
+            "Count",
+        ]
+    )
+
+    open_labels = (GROUPS + people)[:34] + ["Grand Total"]
+    other_labels = GROUPS + people + ["Grand Total"]
+    for i in range(len(other_labels)):
+        row = [None] * 8
+        if i < len(open_labels):
+            row[0:2] = [open_labels[i], rnd.randint(0, 40)]
+        row[3:5] = [other_labels[i], rnd.randint(0, 20)]
+        row[6:8] = [other_labels[i], rnd.randint(0, 20)]
+        ws.append(row)
+
+
+def generate_source_workbook(
+    path: str,
+    notes: int = 1000,
+    signoffs: int = None,
+    assignees: int = 50,
+    seed: int = 0,
+    base_date: datetime = DEFAULT_BASE_DATE,
+    formulas: bool = True,
+    debug: bool = False,
+) -> str:
+    """Write a synthetic source workbook
+
+    Args:
+        path (str): workbook to write
+        notes (int): ReviewNoteAging rows
+        signoffs (int, optional): SignoffAging rows. Defaults to half the notes.
+        assignees (int): distinct people (both creators and assignees of notes and signoffs)
+        seed (int): random seed, the same arguments always give the same workbook contents
+        base_date (datetime): the 'as of' date in ReviewNoteAging!B4 and SignoffAging!B4
+        formulas (bool): write the VLOOKUP columns R-S (recalculated with the workbook)
+        debug (bool, optional): Debug print or not. Defaults to False.
+
+    Returns the path written
+    """
+    if signoffs is None:
+        signoffs = notes // 2
+
+    rnd = random.Random(seed)
+    people = person_names(assignees)
+    groups = assign_groups(people)
+
+    wb = Workbook(write_only=True)
+    write_review_notes(
+        wb.create_sheet(C.DF1_SHEET), rnd, notes, people, groups, base_date, formulas
+    )
+    write_signoffs(wb.create_sheet(C.DF2_SHEET), rnd, signoffs, people, base_date)
+    write_prev_date(wb.create_sheet(C.PREV_DATE_SHEET), rnd, people)
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    wb.save(path)
+
+    if debug:
+        print(
+            "\n🐞 ====== DEBUG BLOCK START: generate_source_workbook (synthetic.py) ======"
+        )
+        print(f"[DEBUG] {path}: {notes} notes, {signoffs} signoffs, {assignees} people")
+        print(f"[DEBUG] Size on disk: {os.path.getsize(path) / 1e6:.1f} MB")
+        print(
+            "🐞 ====== DEBUG BLOCK END: generate_source_workbook (synthetic.py) ======\n"
+        )
+
+    print(f"✅ Synthetic workbook written to: {path}")
+    return path
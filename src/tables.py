@@ -1,10 +1,78 @@
 import json
 
+from openpyxl.utils import get_column_letter
+
 # Prepare tables to be written
+#   Formula versions of the report tables (VLOOKUP/IF into the pivots above them), written to
+#   Calculations in the "formula" table mode and by the auditable overlay. The computed
+#   versions come from the report specs, see src/report_engine.py
+
+
+def prev_date_range(first_col, last_col, last_row=None):
+    """PrevDate lookup range, e.g. PrevDate!$D$1:$E$40 (PrevDate!$D:$E without a last row)
+
+    Bounding the range to the rows in use keeps the lookup from scanning the whole column
+    """
+    if last_row is None:
+        return f"PrevDate!${first_col}:${last_col}"
+    return f"PrevDate!${first_col}$1:${last_col}${last_row}"
+
+
+def prev_block_range(prev_block):
+    """Lookup range of a block of previous values in Calculations (see build_prev_value_tables),
+    from its header to its last pair, e.g. $A$60:$B$75"""
+    first_col = get_column_letter(prev_block["start_col"])
+    last_col = get_column_letter(prev_block["end_col"])
+    first_row = prev_block["start_row"] + 1
+    return f"${first_col}${first_row}:${last_col}${prev_block['end_row']}"
+
+
+def build_prev_value_tables(prev_values, source_str):
+    """The 'As of [PREV DATE]' values a run used, one (label, value) table per summary table
+
+    Written to Calculations by the auditable overlay when the values come from a snapshot,
+    so the formula tables look them up there instead of in the PrevDate tab
+    """
+    return {
+        key: {
+            "title": f"As of [PREV DATE] values ({source_str})",
+            "header": ["Row Labels", "As of [PREV DATE]"],
+            "rows": [[label, value] for label, value in pairs],
+        }
+        for key, pairs in prev_values.items()
+    }
+
+
+def pivot_columns(pivot_range):
+    """Column letters of the label and value columns of a pivot"""
+    return (
+        get_column_letter(pivot_range["start_col"]),
+        get_column_letter(pivot_range["end_col"]),
+    )
+
 
+def pivot_lookup_range(pivot_range):
+    """VLOOKUP range over the rows of a pivot below its 'Row Labels' header, e.g. $A$4:$B$24"""
+    label_col, value_col = pivot_columns(pivot_range)
+    first_row = pivot_range["start_row"] + 1
+    return f"${label_col}${first_row}:${value_col}${pivot_range['end_row']}"
 
-def build_open_review_notes_table(base_date_str, pivot_ranges, start_row, debug=False):
-    """Prepare the first summary table to be written under the pivot tables"""
+
+def table_columns(table_range, header):
+    """Column letter of each header column of a table placed at table_range"""
+    return [get_column_letter(table_range["start_col"] + i) for i in range(len(header))]
+
+
+def build_open_review_notes_table(
+    base_date_str, pivot_ranges, table_range, prev_range=None, debug=False
+):
+    """Prepare the first summary table to be written under the pivot tables
+
+    Lookups use ranges bounded to the pivot rows. Grand Total comes from the row's own pivot3
+    row, so it is a direct reference when the pivot3 labels are unique
+    prev_range is where the previous values are looked up (PrevDate!$A$2:$B$36 if None)
+    Column letters come from the pivot ranges and the table range (see src/layout.py)
+    """
 
     # Initialize table data to return
     table = {}
@@ -32,17 +100,16 @@ def build_open_review_notes_table(base_date_str, pivot_ranges, start_row, debug=
     p2 = pivot_ranges["due_date"]
     p3 = pivot_ranges["count_of_content"]
 
-    p1_start_row = p1["start_row"] + 1  # Add 1 because start_row is "Row Labels"
-    p1_end_row = p1["end_row"]
-
-    p2_start_row = p2["start_row"] + 1  # Add 1 because start_row is "Row Labels"
-    p2_end_row = p2["end_row"]
-
     p3_start_row = p3["start_row"] + 1  # Add 1 because start_row is "Row Labels"
     p3_end_row = p3["end_row"]
     p3_num_rows = p3_end_row - p3_start_row + 1  # Number of rows of the table
+    p3_label, p3_value = pivot_columns(p3)
+
+    # Columns of this table: A-G when it starts in the first column
+    A, B, C, D, E, F, G = table_columns(table_range, header)
 
-    header_row = start_row + 1
+    prev_range = prev_range or "PrevDate!$A$2:$B$36"
+    header_row = table_range["start_row"] + 1
     rows = []
     for row_val in range(p3_num_rows):
         current_row = header_row + 1 + row_val  # row_val starts at 0
@@ -53,29 +120,34 @@ def build_open_review_notes_table(base_date_str, pivot_ranges, start_row, debug=
         # 1. 'Assigned To' column (column A)
         # 'Assigned To' column takes values from pivot3 (count_of_content)
         # Formula '=H2'
-        formula_str = f"=H{p3_row}"
+        formula_str = f"={p3_label}{p3_row}"
         row_content.append(formula_str)
 
         # 2. 'Overdue' column (column B)
         # Takes VLOOKUP values from pivot1
         # =IF(OR(A50="Audit",A50="TA"), "",VLOOKUP(A50,$A$4:$B$24,2,FALSE))
         # Add IFERROR to VLOOKUP to replace #N/A with 0
-        formula_str = f'=IF(OR(A{current_row}="Audit",A{current_row}="TA"), "", IFERROR(VLOOKUP(A{current_row},$A${p1_start_row}:$B${p1_end_row},2,FALSE), 0))'
+        formula_str = f'=IF(OR({A}{current_row}="Audit",{A}{current_row}="TA"), "", IFERROR(VLOOKUP({A}{current_row},{pivot_lookup_range(p1)},2,FALSE), 0))'
         row_content.append(formula_str)
 
         # 3. Due Soon, pivot2
         # =IF(OR(A50="Audit",A50="TA"),"",VLOOKUP(A50,$D$4:$E$24,2,FALSE))
-        formula_str = f'=IF(OR(A{current_row}="Audit",A{current_row}="TA"),"",IFERROR(VLOOKUP(A{current_row},$D${p2_start_row}:$E${p2_end_row},2,FALSE), 0))'
+        formula_str = f'=IF(OR({A}{current_row}="Audit",{A}{current_row}="TA"),"",IFERROR(VLOOKUP({A}{current_row},{pivot_lookup_range(p2)},2,FALSE), 0))'
         row_content.append(formula_str)
 
         # 4. Pending, diff
         # =IF(OR(A50="Audit", A50="TA"), "",E50-C50-B50)
-        formula_str = f'=IF(OR(A{current_row}="Audit", A{current_row}="TA"), "",E{current_row}-C{current_row}-B{current_row})'
+        formula_str = f'=IF(OR({A}{current_row}="Audit", {A}{current_row}="TA"), "",{E}{current_row}-{C}{current_row}-{B}{current_row})'
         row_content.append(formula_str)
 
         # 5. Grand Total, pivot3
         # =IF(OR(A50="Audit",A50="TA"),"",VLOOKUP(A50,$H$2:$I$28,2,FALSE))
-        formula_str = f'=IF(OR(A{current_row}="Audit",A{current_row}="TA"),"",IFERROR(VLOOKUP(A{current_row},$H${p3_start_row}:$I${p3_end_row},2,FALSE), 0))'
+        # The label in column A is this pivot3 row's label, so with unique labels the lookup
+        # always lands on this row: =IF(OR(A50="Audit",A50="TA"),"",I4)
+        if p3.get("unique_labels"):
+            formula_str = f'=IF(OR({A}{current_row}="Audit",{A}{current_row}="TA"),"",{p3_value}{p3_row})'
+        else:
+            formula_str = f'=IF(OR({A}{current_row}="Audit",{A}{current_row}="TA"),"",IFERROR(VLOOKUP({A}{current_row},{pivot_lookup_range(p3)},2,FALSE), 0))'
         row_content.append(formula_str)
 
         # 6. As of [Prev Date], blank
@@ -86,12 +158,12 @@ def build_open_review_notes_table(base_date_str, pivot_ranges, start_row, debug=
         # Temporarily hard-coding 'as of previous date' values, so we can generate the reports properly
         # [ ] TODO: Delete this block after deciding how to get prev date values. For now, getting the values from a temp tab called 'PrevDate' with the values
         # =VLOOKUP(A51,PrevDate!$A$1:$B$35,2,FALSE)
-        formula_str = f'=IF(OR(A{current_row}="Audit",A{current_row}="TA"),"",IFERROR(VLOOKUP(A{current_row},PrevDate!$A$2:$B$36,2,FALSE), 0))'
+        formula_str = f'=IF(OR({A}{current_row}="Audit",{A}{current_row}="TA"),"",IFERROR(VLOOKUP({A}{current_row},{prev_range},2,FALSE), 0))'
         row_content.append(formula_str)
 
         # 7. Difference, diff
         # =IF(OR(A50="Audit",A50="TA"),"",E50-F50)
-        formula_str = f'=IF(OR(A{current_row}="Audit",A{current_row}="TA"),"",E{current_row}-F{current_row})'
+        formula_str = f'=IF(OR({A}{current_row}="Audit",{A}{current_row}="TA"),"",{E}{current_row}-{F}{current_row})'
         row_content.append(formula_str)
 
         rows.append(row_content)
@@ -109,9 +181,19 @@ def build_open_review_notes_table(base_date_str, pivot_ranges, start_row, debug=
 
 
 def build_addressed_review_notes_table(
-    base_date_str, pivot_ranges, start_row, debug=False
+    base_date_str,
+    pivot_ranges,
+    table_range,
+    prev_date_rows=None,
+    prev_range=None,
+    debug=False,
 ):
-    """Prepare the second summary table under the pivot tables"""
+    """Prepare the second summary table under the pivot tables
+
+    prev_date_rows bounds the PrevDate lookup range to the rows in use (whole columns if None)
+    prev_range replaces the PrevDate lookup range if given
+    Column letters come from the pivot ranges and the table range (see src/layout.py)
+    """
 
     # Initialize table data to return
     table = {}
@@ -138,9 +220,15 @@ def build_addressed_review_notes_table(
     p4_start_row = p4["start_row"] + 1  # Add 1 because start_row is "Row Labels"
     p4_end_row = p4["end_row"]
     p4_num_rows = p4_end_row - p4_start_row + 1  # Number of rows of the table
+    p4_label, p4_value = pivot_columns(p4)
+
+    # Columns of this table: I-L in the default layout
+    I, J, K, L = table_columns(table_range, header)
 
-    header_row = start_row + 1  # start_row is the row where table starts (with title)
+    # The table starts with its title
+    header_row = table_range["start_row"] + 1
     first_data_row = header_row + 1
+    prev_range = prev_range or prev_date_range("D", "E", prev_date_rows)
     rows = []
     for row_val in range(p4_num_rows):
         current_row = header_row + 1 + row_val  # row_val starts at 0
@@ -150,14 +238,18 @@ def build_addressed_review_notes_table(
 
         # 1. 'Created By' - column I
         # Formula '=K4'
-        formula_str = f"=K{p4_row}"
+        formula_str = f"={p4_label}{p4_row}"
         row_content.append(formula_str)
 
         # 2. 'Addressed' column (column J)
         # Takes VLOOKUP values from pivot4
         # =IF(OR(I50="Audit",I50="TA"), "",VLOOKUP(I50,K$4:L$24,2,FALSE)
         # Add IFERROR to VLOOKUP to replace #N/A with 0
-        formula_str = f'=IF(OR(I{current_row}="Audit",I{current_row}="TA"), "", IFERROR(VLOOKUP(I{current_row},$K${p4_start_row}:$L${p4_end_row},2,FALSE), 0))'
+        # With unique pivot4 labels, the lookup of this row's own label is a direct reference
+        if p4.get("unique_labels"):
+            formula_str = f'=IF(OR({I}{current_row}="Audit",{I}{current_row}="TA"), "", {p4_value}{p4_row})'
+        else:
+            formula_str = f'=IF(OR({I}{current_row}="Audit",{I}{current_row}="TA"), "", IFERROR(VLOOKUP({I}{current_row},{pivot_lookup_range(p4)},2,FALSE), 0))'
         row_content.append(formula_str)
 
         # 3. As of [Prev Date], blank
@@ -170,14 +262,14 @@ def build_addressed_review_notes_table(
         # =VLOOKUP(A51,PrevDate!$D:$E,2,FALSE)
         # The very last row is Total, so check for last row and amend formula
         if current_row == (first_data_row + p4_num_rows - 1):
-            formula_str = f"=SUM(K{first_data_row}:K{current_row - 1})"
+            formula_str = f"=SUM({K}{first_data_row}:{K}{current_row - 1})"
         else:
-            formula_str = f'=IF(OR(I{current_row}="Audit",I{current_row}="TA"),"",IFERROR(VLOOKUP(I{current_row},PrevDate!$D:$E,2,FALSE), 0))'
+            formula_str = f'=IF(OR({I}{current_row}="Audit",{I}{current_row}="TA"),"",IFERROR(VLOOKUP({I}{current_row},{prev_range},2,FALSE), 0))'
         row_content.append(formula_str)
 
         # 4. Difference, diff
         # =IF(OR(I50="Audit",I50="TA"),"",J50-K50)
-        formula_str = f'=IF(OR(I{current_row}="Audit",I{current_row}="TA"),"",J{current_row}-K{current_row})'
+        formula_str = f'=IF(OR({I}{current_row}="Audit",{I}{current_row}="TA"),"",{J}{current_row}-{K}{current_row})'
         row_content.append(formula_str)
 
         rows.append(row_content)
@@ -194,8 +286,20 @@ def build_addressed_review_notes_table(
     return table
 
 
-def build_signoff_aging_table(sync_time_str, pivot_ranges, start_row, debug=False):
-    """Prepare the 3rd summary table under pivots"""
+def build_signoff_aging_table(
+    sync_time_str,
+    pivot_ranges,
+    table_range,
+    prev_date_rows=None,
+    prev_range=None,
+    debug=False,
+):
+    """Prepare the 3rd summary table under pivots
+
+    prev_date_rows bounds the PrevDate lookup range to the rows in use (whole columns if None)
+    prev_range replaces the PrevDate lookup range if given
+    Column letters come from the pivot ranges and the table range (see src/layout.py)
+    """
 
     # Initialize table data to return (keys: title, header, rows)
     table = {}
@@ -219,9 +323,15 @@ def build_signoff_aging_table(sync_time_str, pivot_ranges, start_row, debug=Fals
     p5_start_row = p5["start_row"] + 1  # Add 1 because start_row is "Row Labels"
     p5_end_row = p5["end_row"]
     p5_num_rows = p5_end_row - p5_start_row + 1  # number of rows of the table
+    p5_label, p5_value = pivot_columns(p5)
+
+    # Columns of this table: N-Q in the default layout
+    N, O, P, Q = table_columns(table_range, header)
 
-    header_row = start_row + 1  # start_row is the row where table starts (with title)
+    # The table starts with its title
+    header_row = table_range["start_row"] + 1
     first_data_row = header_row + 1
+    prev_range = prev_range or prev_date_range("G", "H", prev_date_rows)
     rows = []
     for row_val in range(p5_num_rows):
         current_row = first_data_row + row_val  # row_val starts at 0
@@ -231,12 +341,12 @@ def build_signoff_aging_table(sync_time_str, pivot_ranges, start_row, debug=Fals
 
         # 1. 'Row Labels' - Column N
         # Formula '=N4'
-        formula_str = f"=N{p5_row}"
+        formula_str = f"={p5_label}{p5_row}"
         row_content.append(formula_str)
 
         # 2. 'Count of Workflow' - Column O
         # Formula '=O4'
-        formula_str = f"=O{p5_row}"
+        formula_str = f"={p5_value}{p5_row}"
         row_content.append(formula_str)
 
         # 3. 'Previous Count', blank
@@ -249,14 +359,14 @@ def build_signoff_aging_table(sync_time_str, pivot_ranges, start_row, debug=Fals
         # =VLOOKUP(N51,PrevDate!$G:$H,2,FALSE) - reference whole column
         # The very last row is Total, so check for last row and amend formula
         if current_row == (first_data_row + p5_num_rows - 1):
-            formula_str = f"=SUM(P{first_data_row}:P{current_row - 1})"
+            formula_str = f"=SUM({P}{first_data_row}:{P}{current_row - 1})"
         else:
-            formula_str = f"=IFERROR(VLOOKUP(N{current_row},PrevDate!$G:$H,2,FALSE), 0)"
+            formula_str = f"=IFERROR(VLOOKUP({N}{current_row},{prev_range},2,FALSE), 0)"
         row_content.append(formula_str)
 
         # 4. 'Differences'
         # =(O51 - P51)
-        formula_str = f"=O{current_row}-P{current_row}"
+        formula_str = f"={O}{current_row}-{P}{current_row}"
         row_content.append(formula_str)
 
         rows.append(row_content)
@@ -273,23 +383,53 @@ def build_signoff_aging_table(sync_time_str, pivot_ranges, start_row, debug=Fals
     return table
 
 
-def get_all_tables(base_date_str, last_sync_str, pivot_ranges, start_row, debug=False):
+def get_all_tables(
+    base_date_str,
+    last_sync_str,
+    pivot_ranges,
+    table_ranges,
+    prev_date_rows=None,
+    prev_blocks=None,
+    debug=False,
+):
     # -----------------------------------------------------
     # Prepare the tables to write
+    #   pivot_ranges and table_ranges come from allocate_layout (src/layout.py), so the
+    #   formulas can be built before the pivots are written
+    #   With prev_blocks (the blocks of build_prev_value_tables), the previous values are
+    #   looked up there instead of in the PrevDate tab
     # -----------------------------------------------------
+    prev_ranges = {
+        key: prev_block_range(block) for key, block in (prev_blocks or {}).items()
+    }
+
     # Table 1: Open Review Notes Table
     open_notes_table = build_open_review_notes_table(
-        base_date_str, pivot_ranges, start_row, debug=debug
+        base_date_str,
+        pivot_ranges,
+        table_ranges["open_notes"],
+        prev_ranges.get("open_notes"),
+        debug=debug,
     )
 
     # Table 2: Addressed Review Notes Table
     addressed_notes_table = build_addressed_review_notes_table(
-        base_date_str, pivot_ranges, start_row, debug=debug
+        base_date_str,
+        pivot_ranges,
+        table_ranges["addressed_notes"],
+        prev_date_rows,
+        prev_ranges.get("addressed_notes"),
+        debug=debug,
     )
 
     # Table 3: Signoff Aging table
     signoff_aging_table = build_signoff_aging_table(
-        last_sync_str, pivot_ranges, start_row, debug=debug
+        last_sync_str,
+        pivot_ranges,
+        table_ranges["signoff_aging"],
+        prev_date_rows,
+        prev_ranges.get("signoff_aging"),
+        debug=debug,
     )
 
     tables = {
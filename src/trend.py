@@ -0,0 +1,305 @@
+# ======================================
+# IMPORTS
+# ======================================
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+import src.constants as C
+from src.formatting import apply_column_widths
+from src.layout import pack_band, band_end_row, PIVOT_HEADER_ROWS, TABLE_HEADER_ROWS
+from src.pivots import (
+    DATE_FILTER_OPS,
+    build_pivots,
+    check_pivot_columns,
+    due_day_offsets,
+    bucket_numbers,
+    factorize_group_keys,
+    filter_mask,
+    layout_pivot,
+    layout_wide_pivot,
+)
+from src.report_engine import compute_report_table, write_reports, format_reports
+from src.report_specs import PIVOTS, TREND, AGING_BUCKETS
+from src.writers import write_wide_pivot
+
+# ==================================================================
+# TREND OVER SEVERAL BASE DATES
+#   The series pivots (TREND in src/report_specs.py) are counted for every base date from
+#   base date - (days - 1) to the base date, from one load of the source:
+#   1. each condition of a pivot filter gives, per row, the window of day offsets from the
+#      base date on which the row meets it (due dates come closer, 'Aged' grows by a day)
+#   2. the rows add +1 at the start and -1 past the end of their window in a
+#      (group x date) difference array, and a running sum over the dates gives the counts
+#   So all the dates cost one pass over the rows, instead of one run per date.
+#   On the last date the counts are the same as build_pivots on the base date.
+# ==================================================================
+
+# Window bound of the conditions that hold on every date
+NO_LIMIT = np.iinfo(np.int64).max // 4
+
+
+def trend_dates(base_date, days: int) -> list:
+    """The days base dates of the trend, oldest first, ending on the base date"""
+    return [base_date - timedelta(days=n) for n in range(days - 1, -1, -1)]
+
+
+def bucket_window(labels: list) -> tuple:
+    """(first, last) days from the base date covered by some AGING_BUCKETS, which must follow
+    each other. Open ends are -NO_LIMIT / NO_LIMIT"""
+    numbers = sorted(bucket_numbers(labels))
+    if numbers != list(range(numbers[0], numbers[-1] + 1)):
+        raise ValueError(f"Trend buckets must follow each other: {labels}")
+
+    first = AGING_BUCKETS[numbers[0]][1]
+    after = numbers[-1] + 1
+    last = AGING_BUCKETS[after][1] - 1 if after < len(AGING_BUCKETS) else NO_LIMIT
+    return (-NO_LIMIT if first is None else first), last
+
+
+def condition_window(df: pd.DataFrame, condition, base_date, day_columns: list):
+    """Day offsets from the base date (lo, hi as int arrays, both inclusive) on which each row
+    meets a filter condition. None if the condition does not depend on the date
+
+    Rows with a missing date or day count get an empty window (lo > hi)
+    """
+    column, op, value = condition
+
+    if op in DATE_FILTER_OPS:
+        first, last = value if op == "due_within_days" else bucket_window(value)
+        days, valid = due_day_offsets(df[column], base_date)
+        # Due in first..last days on base date + k: first <= days - k <= last
+        lo = np.where(valid, days - last, NO_LIMIT)
+        hi = np.where(valid, days - first, -NO_LIMIT)
+        return lo, hi
+
+    if column in day_columns:
+        if op != ">":
+            raise ValueError(f"Trend of {op!r} on the day column {column!r}")
+        counts = pd.to_numeric(df[column], errors="coerce").to_numpy(
+            dtype=float, na_value=np.nan
+        )
+        valid = ~np.isnan(counts)
+        # The day count on base date + k is count + k: count + k > value
+        lo = np.full(len(df), NO_LIMIT, dtype=np.int64)
+        lo[valid] = np.floor(value - counts[valid]).astype(np.int64) + 1
+        hi = np.where(valid, NO_LIMIT, -NO_LIMIT)
+        return lo, hi
+
+    return None
+
+
+def interval_counts(codes, starts, ends, n_groups: int, n_dates: int) -> np.ndarray:
+    """Rows per (group, date) when each row counts on the dates [start, end):
+    +1 at its start and -1 at its end in a difference array, then a running sum over the dates
+    """
+    width = n_dates + 1
+    size = n_groups * width
+    diff = np.bincount(codes * width + starts, minlength=size) - np.bincount(
+        codes * width + ends, minlength=size
+    )
+    return np.cumsum(diff.reshape(n_groups, width), axis=1)[:, :n_dates]
+
+
+def series_counts(df, base_date, spec: dict, n_dates: int, day_columns: list) -> dict:
+    """Counts of one pivot on each of the last n_dates base dates
+
+    Returns {"index": groups, "rows": array, "values": array}, arrays of (groups x dates):
+    the rows selected by the filter and the non-empty counted values among them
+    """
+    codes, index = factorize_group_keys(df, spec["group_keys"])
+
+    lo = np.full(len(df), -NO_LIMIT, dtype=np.int64)
+    hi = np.full(len(df), NO_LIMIT, dtype=np.int64)
+    static = []
+    for condition in spec["filter"]:
+        window = condition_window(df, condition, base_date, day_columns)
+        if window is None:
+            static.append(condition)
+            continue
+        lo = np.maximum(lo, window[0])
+        hi = np.minimum(hi, window[1])
+
+    # Date k days after the base date is column k + n_dates - 1 (the base date is the last)
+    shift = n_dates - 1
+    starts = np.clip(lo + shift, 0, n_dates)
+    ends = np.clip(hi + shift + 1, 0, n_dates)
+
+    selected = (codes >= 0) & filter_mask(df, static, base_date) & (starts < ends)
+    counted = selected & df[spec["count"]].notna().to_numpy()
+
+    return {
+        "index": index,
+        "rows": interval_counts(
+            codes[selected], starts[selected], ends[selected], len(index), n_dates
+        ),
+        "values": interval_counts(
+            codes[counted], starts[counted], ends[counted], len(index), n_dates
+        ),
+    }
+
+
+def build_trend(
+    dfs: dict, base_date, days: int = TREND["days"], trend=TREND, debug=False
+) -> dict:
+    """Counts of the trend series on each of the last days base dates
+
+    Returns {"dates": [datetime, ...], "series": {pivot key: series_counts}}
+    """
+    if not base_date:
+        raise ValueError("⚠️ The trend needs the base date of the source")
+
+    specs = {key: PIVOTS[key] for key in trend["series"]}
+    dates = trend_dates(base_date, days)
+    series = {}
+    for key, spec in specs.items():
+        df = dfs[spec["source"]]
+        check_pivot_columns(df, base_date, {key: spec})
+        series[key] = series_counts(
+            df, base_date, spec, len(dates), trend["day_columns"]
+        )
+
+    if debug:
+        print("\n🐞 ====== DEBUG BLOCK START: build_trend (trend.py) ======")
+        print(f"[DEBUG] {len(dates)} dates: {dates[0]:%m/%d/%Y} - {dates[-1]:%m/%d/%Y}")
+        # The last date is the base date: same counts as the pivots of a normal run
+        pivots = build_pivots(dfs, base_date, specs)
+        for key, counts in series.items():
+            same = trend_pivot(counts, -1, specs[key]["value_name"]).equals(pivots[key])
+            print(
+                f"[DEBUG] {key}: {counts['values'].shape} (groups x dates),",
+                f"base date same as build_pivots: {same}",
+            )
+        print("🐞 ====== DEBUG BLOCK END: build_trend (trend.py) ======\n")
+
+    return {"dates": dates, "series": series}
+
+
+def trend_pivot(counts: dict, date_number: int, value_name: str) -> pd.DataFrame:
+    """Pivot of a series on one of the dates (same as build_pivots on that base date)"""
+    present = counts["rows"][:, date_number] > 0
+    return pd.DataFrame(
+        {value_name: counts["values"][present, date_number].astype(np.int64)},
+        index=counts["index"][present],
+    )
+
+
+def trend_table(counts: dict, dates: list) -> pd.DataFrame:
+    """Values of a series, one column per date (groups with rows on any of the dates)"""
+    present = (counts["rows"] > 0).any(axis=1)
+    return pd.DataFrame(
+        counts["values"][present].astype(np.int64),
+        index=counts["index"][present],
+        columns=[date.strftime("%m/%d/%Y") for date in dates],
+    )
+
+
+# ==================================================================
+# TREND WORKBOOK
+# ==================================================================
+
+
+def stacked_blocks(sizes: dict, gap_rows: int) -> dict:
+    """Blocks of {key: (height, width)} one below the other, gap_rows apart"""
+    blocks = {}
+    top_row = C.LAYOUT_FIRST_ROW
+    for key, size in sizes.items():
+        blocks.update(pack_band({key: size}, top_row=top_row))
+        top_row = band_end_row(blocks) + gap_rows + 1
+    return blocks
+
+
+def write_trend_sheet(ws, trend: dict, trend_spec=TREND) -> dict:
+    """One block per series on the Trend sheet: groups down, dates across"""
+    layouts = {
+        key: layout_wide_pivot(trend_table(counts, trend["dates"]))
+        for key, counts in trend["series"].items()
+    }
+    blocks = stacked_blocks(
+        {
+            key: (PIVOT_HEADER_ROWS + len(layout), len(layout.columns) - 1)
+            for key, layout in layouts.items()
+        },
+        gap_rows=C.BUFFER_LINES,
+    )
+    ranges = {}
+    for key, layout in layouts.items():
+        title = f"{trend_spec['name']}: {PIVOTS[key]['value_name']}"
+        ranges[key] = write_wide_pivot(ws, layout, blocks[key], title)
+    return ranges
+
+
+def trend_report_tables(
+    trend: dict, pivots: dict, last_sync_str: str, trend_spec=TREND
+) -> dict:
+    """The trend report of every date, newest first: {date key: computed table}
+
+    pivots are the pivots of the base date (see get_all_pivot_tables), the series pivots are
+    replaced with the ones of each date
+    """
+    spec = trend_spec["report"]
+    base_layouts = {key: layout_pivot(pivot) for key, pivot in pivots.items()}
+    tables = {}
+    for date_number in range(len(trend["dates"]) - 1, -1, -1):
+        date = trend["dates"][date_number]
+        layouts = dict(base_layouts)
+        for key, counts in trend["series"].items():
+            layouts[key] = layout_pivot(
+                trend_pivot(counts, date_number, PIVOTS[key]["value_name"])
+            )
+        title = spec["title"].format(
+            base_date=date.strftime("%m/%d/%Y"), last_sync=last_sync_str
+        )
+        tables[date.strftime("%Y-%m-%d")] = compute_report_table(
+            spec, layouts, [], title
+        )
+    return tables
+
+
+def write_trend_workbook(
+    trend: dict,
+    output_file: str,
+    pivots: dict = None,
+    last_sync_str: str = "",
+    trend_spec=TREND,
+    debug=False,
+):
+    """Write the Trend sheet, and with pivots the Trend Reports sheet (the trend report of
+    every date, stacked newest first), to a new workbook"""
+    wb = Workbook()
+    ws_trend = wb.active
+    ws_trend.title = C.TREND_SHEET
+    trend_ranges = write_trend_sheet(ws_trend, trend, trend_spec)
+    apply_column_widths(ws_trend)
+
+    report_ranges = {}
+    if pivots is not None:
+        ws_reports = wb.create_sheet(C.TREND_REPORTS_SHEET)
+        tables = trend_report_tables(trend, pivots, last_sync_str, trend_spec)
+        blocks = stacked_blocks(
+            {
+                key: (TABLE_HEADER_ROWS + len(table["rows"]), len(table["header"]))
+                for key, table in tables.items()
+            },
+            gap_rows=C.TREND_GAP_ROWS,
+        )
+        report_ranges = write_reports(ws_reports, tables, blocks, debug=debug)
+        format_reports(
+            ws_reports,
+            report_ranges,
+            reports={key: trend_spec["report"] for key in report_ranges},
+        )
+        apply_column_widths(ws_reports)
+
+    wb.save(output_file)
+
+    if debug:
+        print("\n🐞 ====== DEBUG BLOCK START: write_trend_workbook (trend.py) ======")
+        print("[DEBUG] Trend ranges:", trend_ranges)
+        print("[DEBUG] Trend reports written:", len(report_ranges))
+        print("🐞 ====== DEBUG BLOCK END: write_trend_workbook (trend.py) ======\n")
+
+    print("\n✅ Trend written to:", output_file)
+    return output_file
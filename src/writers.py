@@ -2,22 +2,125 @@
 # IMPORTS
 # ======================================
 import pandas as pd
-from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
+from openpyxl.styles import Alignment, Font, PatternFill, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
-from openpyxl import load_workbook
+from openpyxl import load_workbook, Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.formatting import ConditionalFormattingList
 
 import src.constants as C
-from src.formatting import autofit_colums
-from src.excel_io import force_excel_recalc, load_values_only_workbook
+from src.formatting import (
+    autofit_colums,
+    apply_column_widths,
+    track_column_text,
+    track_grid_text,
+)
+from src.pivots import layout_pivot, layout_aging_pivot, has_unique_labels
+from src.report_specs import PIVOTS, REPORTS, AGING_PIVOT
+from src.excel_io import (
+    force_excel_recalc,
+    load_values_only_workbook,
+    save_working_copy,
+)
 
+# ======================================
+# PIVOT STYLES
+#   Registered once per workbook as named styles, and shared by every pivot cell
+# ======================================
+PIVOT_STYLES = {
+    "pivot_title": {"font": Font(bold=True), "fill": C.HEADER_FILL},
+    "pivot_title_fill": {"fill": C.HEADER_FILL},
+    "pivot_header": {"font": Font(bold=True), "fill": C.SECTION_FILL},
+    "pivot_group": {"font": Font(bold=True), "border": C.THIN_BOTTOM},
+    "pivot_child": {"alignment": Alignment(indent=1)},
+    "pivot_total": {
+        "font": Font(bold=True),
+        "fill": C.SECTION_FILL,
+        "border": C.THIN_TOP,
+    },
+}
+
+# Layout row_type -> (label cell style, value cell style). None leaves the default style
+PIVOT_ROW_STYLES = {
+    "group": ("pivot_group", "pivot_group"),
+    "child": ("pivot_child", None),
+    "grand_total": ("pivot_total", "pivot_total"),
+    "item": (None, None),
+    "total": ("pivot_total", "pivot_total"),
+}
+
+
+def register_named_styles(wb, styles):
+    """Add the named styles to the workbook, if they are not registered yet"""
+    for name, attrs in styles.items():
+        if name not in wb.named_styles:
+            wb.add_named_style(NamedStyle(name=name, **attrs))
+
+
+def write_pivot_header(ws, start_row, start_col, value_col_name, title=None):
+    """Write the optional title row and the 'Row Labels' header of a pivot
+
+    Returns the row of the 'Row Labels' header
+    """
+    register_named_styles(ws.parent, PIVOT_STYLES)
+
+    # Title header
+    if title:
+        ws.cell(row=start_row, column=start_col, value=title).style = "pivot_title"
+        ws.cell(row=start_row, column=start_col + 1, value="").style = (
+            "pivot_title_fill"
+        )
+
+        track_column_text(ws, start_col, [title])
+        start_row = start_row + 2  # Leave one row below before pivot data header
 
-def write_simple_pivot(ws, pivot_df, start_row, start_col, title=None, debug=False):
+    # Pivot data header
+    ws.cell(row=start_row, column=start_col, value="Row Labels").style = "pivot_header"
+    ws.cell(row=start_row, column=start_col + 1, value=value_col_name).style = (
+        "pivot_header"
+    )
+    track_grid_text(ws, start_col, [["Row Labels", value_col_name]])
+
+    return start_row
+
+
+def write_pivot_rows(ws, layout, start_row, start_col):
+    """Bulk write the rows of a pivot layout (see pivots.layout_pivot) with their shared styles
+
+    Returns the last row written
+    """
+    labels = layout["label"].tolist()
+    values = layout["value"].tolist()
+    track_column_text(ws, start_col, labels)
+    track_column_text(ws, start_col + 1, values)
+
+    current_row = start_row
+    for label, value, row_type in zip(labels, values, layout["row_type"].tolist()):
+        label_style, value_style = PIVOT_ROW_STYLES[row_type]
+
+        label_cell = ws.cell(row=current_row, column=start_col, value=label)
+        if label_style:
+            label_cell.style = label_style
+
+        value_cell = ws.cell(row=current_row, column=start_col + 1, value=value)
+        if value_style:
+            value_cell.style = value_style
+
+        current_row += 1
+
+    return current_row - 1
+
+
+def write_simple_pivot(
+    ws, pivot_df, start_row, start_col, title=None, layout=None, debug=False
+):
     """
     Write a pivot table to an Excel sheet
     at a specific location. Writes a simple flat table with 2 columns.
+    layout is the layout_pivot of pivot_df, if already computed (see allocate_layout)
 
-    Returns a dict of start and end row and column values
-    {"start_row": 3, "end_row": 10, "start_col": 1, "end_col": 2}
+    Returns a dict of start and end row and column values, and whether the labels are unique
+    {"start_row": 3, "end_row": 10, "start_col": 1, "end_col": 2, "unique_labels": True}
     """
 
     # Initialize address to return
@@ -26,44 +129,15 @@ def write_simple_pivot(ws, pivot_df, start_row, start_col, title=None, debug=Fal
     # ----------------------------------------------------------------
     # 1. Write the header row(s)
     # ----------------------------------------------------------------
-    # Title header
-    if title:
-        header_cell = ws.cell(row=start_row, column=start_col, value=title)
-        header_cell.font = Font(bold=True)
-        header_cell.fill = C.HEADER_FILL
-        header_cell = ws.cell(row=start_row, column=start_col + 1, value="")
-        header_cell.fill = C.HEADER_FILL
-
-        start_row = start_row + 2  # Leave one row below before pivot data header
-
-    # Write header
     value_col_name = pivot_df.columns.to_list()[0]
-    header_cell = ws.cell(row=start_row, column=start_col, value="Row Labels")
-    header_cell.font = Font(bold=True)
-    header_cell.fill = C.SECTION_FILL
-    header_cell = ws.cell(row=start_row, column=start_col + 1, value=value_col_name)
-    header_cell.font = Font(bold=True)
-    header_cell.fill = C.SECTION_FILL
-
-    # Write data
-    current_row = start_row + 1  # Row after header
-    for index, row_val in pivot_df.iterrows():
-        for j, col_name in enumerate(pivot_df.columns, start=start_col):
-            ws.cell(row=current_row, column=j, value=index)
-            ws.cell(row=current_row, column=j + 1, value=row_val[col_name])
-            current_row += 1
-
-    # Calculate grand_total and write to last row
-    grand_total = pivot_df[value_col_name].sum()
-    grand_cell = ws.cell(row=current_row, column=start_col, value="Total")
-    grand_cell.font = Font(bold=True)
-    grand_cell.fill = C.SECTION_FILL
-    grand_cell.border = C.THIN_TOP
-
-    grand_cell = ws.cell(row=current_row, column=start_col + 1, value=grand_total)
-    grand_cell.font = Font(bold=True)
-    grand_cell.fill = C.SECTION_FILL
-    grand_cell.border = C.THIN_TOP
+    start_row = write_pivot_header(ws, start_row, start_col, value_col_name, title)
+
+    # ----------------------------------------------------------------
+    # 2. Write the data rows and the total row, laid out up front
+    # ----------------------------------------------------------------
+    if layout is None:
+        layout = layout_pivot(pivot_df)
+    end_row = write_pivot_rows(ws, layout, start_row + 1, start_col)
 
     # Set column width
     autofit_colums(ws, start_col=start_col, end_col=start_col + 1, limit_width=True)
@@ -71,29 +145,31 @@ def write_simple_pivot(ws, pivot_df, start_row, start_col, title=None, debug=Fal
     # Range occupied by the pivot table
     pivot_address["start_row"] = start_row
     pivot_address["start_col"] = start_col
-    pivot_address["end_row"] = current_row
+    pivot_address["end_row"] = end_row
     pivot_address["end_col"] = start_col + 1  # this is our second header_cell
+    # Lookups of a row's own label can be direct references (see src/tables.py)
+    pivot_address["unique_labels"] = has_unique_labels(layout["label"])
 
     return pivot_address
 
 
 def write_multi_index_pivot(
-    ws, pivot_df, start_row, start_col, title=None, debug=False
+    ws, pivot_df, start_row, start_col, title=None, layout=None, debug=False
 ):
     """Writes a multi-index pivot to the worksheet
     - First index (main group) is written bold
     - Second index (items under main group) is indented under corresponding main group
     - Only one Values column
+    layout is the layout_pivot of pivot_df, if already computed (see allocate_layout)
 
-    Returns a dict of start and end row and column values
-    {"start_row": 3, "end_row": 10, "start_col": 1, "end_col": 2}
+    Returns a dict of start and end row and column values, and whether the labels are unique
+    {"start_row": 3, "end_row": 10, "start_col": 1, "end_col": 2, "unique_labels": True}
     """
 
     # Check if dataframe is actually multi-index
     if not isinstance(pivot_df.index, pd.MultiIndex):
         raise ValueError("⚠️ Error: Pivot dataframe must have 2-level MultiIndex")
 
-    level0_name, level1_name = pivot_df.index.names
     value_col_name = pivot_df.columns.to_list()[0]
 
     # Initialize address to return
@@ -102,85 +178,20 @@ def write_multi_index_pivot(
     # ----------------------------------------------------------------
     # 1. Write the header row(s)
     # ----------------------------------------------------------------
-    # Title header
-    if title:
-        header_cell = ws.cell(row=start_row, column=start_col, value=title)
-        header_cell.font = Font(bold=True)
-        header_cell.fill = C.HEADER_FILL
-        header_cell = ws.cell(row=start_row, column=start_col + 1, value="")
-        header_cell.fill = C.HEADER_FILL
-
-        start_row = start_row + 2  # Leave one row below before pivot data header
-
-    # Pivot data header
-    header_cell = ws.cell(row=start_row, column=start_col, value="Row Labels")
-    header_cell.font = Font(bold=True)
-    header_cell.fill = C.SECTION_FILL
-    header_cell = ws.cell(row=start_row, column=start_col + 1, value=value_col_name)
-    header_cell.font = Font(bold=True)
-    header_cell.fill = C.SECTION_FILL
+    start_row = write_pivot_header(ws, start_row, start_col, value_col_name, title)
 
     pivot_address["start_row"] = start_row
     pivot_address["start_col"] = start_col
     pivot_address["end_col"] = start_col + 1  # this is our second header_cell
 
     # ----------------------------------------------------------------
-    # 2. Walk through the MultiIndex and write the rows
+    # 2. Write the rows: group header rows (with group totals), the indented
+    #    items under each group, and the grand total. The whole grid is laid out
+    #    up front, then written in one pass
     # ----------------------------------------------------------------
-
-    # Calculate the totals for the level0 groups ('Audit', 'TA').
-    totals = pivot_df.groupby(level=0)[value_col_name].sum()
-    grand_total = 0
-
-    current_row = start_row + 1  # We start writing the row data from here
-    current_group = None  # Track the main group, or level0 index ('Audit' or 'TA')
-
-    for (assigned_group, allocated_to), row_value in pivot_df.iterrows():
-        # 🤓 df.iterrows() lets you iterate over DataFrame rows as (index, Series) pairs.
-        # index: label or tuple of labels; Series: data of the row as a series. Example below
-        #   Index: ('TA', 'Anika Parkar')
-        #   Row: Overdue    3
-
-        # If assigned group changes, write bold group header
-        if assigned_group != current_group:
-            group_cell = ws.cell(
-                row=current_row, column=start_col, value=assigned_group
-            )
-            group_cell.font = Font(bold=True)
-            group_cell.border = C.THIN_BOTTOM
-
-            # Write total for the group
-            total = totals[assigned_group]
-            total_cell = ws.cell(row=current_row, column=start_col + 1, value=total)
-            total_cell.font = Font(bold=True)
-            total_cell.border = C.THIN_BOTTOM
-
-            grand_total += total
-
-            current_group = assigned_group
-            current_row += 1
-
-        # Write second-level rows of allocated_to, indented below assigned_group
-        allocated_to_cell = ws.cell(
-            row=current_row, column=start_col, value=allocated_to
-        )
-        allocated_to_cell.alignment = Alignment(indent=1)
-        # Write value for the allocated_to person, retrieved using name of the value column as key
-        # e.g. row_value["Overdue"] = 3  -- row_value is a variable from the for loop
-        ws.cell(row=current_row, column=start_col + 1, value=row_value[value_col_name])
-
-        current_row += 1
-
-    # Write the grand total at the very end
-    grand_cell = ws.cell(row=current_row, column=start_col, value="Grand Total")
-    grand_cell.font = Font(bold=True)
-    grand_cell.fill = C.SECTION_FILL
-    grand_cell.border = C.THIN_TOP
-
-    grand_cell = ws.cell(row=current_row, column=start_col + 1, value=grand_total)
-    grand_cell.font = Font(bold=True)
-    grand_cell.fill = C.SECTION_FILL
-    grand_cell.border = C.THIN_TOP
+    if layout is None:
+        layout = layout_pivot(pivot_df)
+    end_row = write_pivot_rows(ws, layout, start_row + 1, start_col)
 
     # Set column width
     autofit_colums(ws, start_col=start_col, end_col=start_col + 1, limit_width=True)
@@ -190,119 +201,112 @@ def write_multi_index_pivot(
             "\n🐞 ====== DEBUG BLOCK START: write_multi_index_pivot (writers.py) ======"
         )
         print("[DEBUG] Pivot title:", title)
-        print("[DEBUG] Groups written:", pivot_df.index.levels[0].to_list())
-        print("[DEBUG] Total rows:", current_row - start_row)
+        print(
+            "[DEBUG] Groups written:",
+            layout.loc[layout["row_type"] == "group", "label"].to_list(),
+        )
+        print("[DEBUG] Total rows:", end_row - start_row)
         print(
             "🐞 ====== DEBUG BLOCK END: write_multi_index_pivot (writers.py) ======\n"
         )
 
-    pivot_address["end_row"] = current_row
+    pivot_address["end_row"] = end_row
+    # Lookups of a row's own label can be direct references (see src/tables.py)
+    pivot_address["unique_labels"] = has_unique_labels(layout["label"])
 
     return pivot_address
 
 
-def write_pivot_tables_to_sheet(pivots, ws, debug=False):
+def write_pivot_tables_to_sheet(
+    pivots, ws, pivot_blocks, pivot_layouts=None, debug=False
+):
     # -----------------------------------------------------
-    # Write the pivot tables to Calculations tab
+    # Write the pivot tables to Calculations tab, at the blocks allocated for them
+    # (see src/layout.py). Pivots with one group key are simple pivots, the others
+    # multi-index pivots. pivot_layouts are the layouts allocate_layout computed
     # -----------------------------------------------------
-    ws_calc = ws
-    overdue_pivot = pivots["overdue"]
-    due_date_pivot = pivots["due_date"]
-    count_of_content_pivot = pivots["count_of_content"]
-    addressed_status_pivot = pivots["addressed_status"]
-    signoff_aging_pivot = pivots["signoff_aging"]
-
-    pivots_ranges = {
-        "overdue": {},
-        "due_date": {},
-        "count_of_content": {},
-        "addressed_status": {},
-        "signoff_aging": {},
-    }
+    pivot_layouts = pivot_layouts or {}
+    pivots_ranges = {}
+    for i, (key, spec) in enumerate(PIVOTS.items(), start=1):
+        block = pivot_blocks[key]
+        write = (
+            write_simple_pivot
+            if len(spec["group_keys"]) == 1
+            else write_multi_index_pivot
+        )
+        address = write(
+            ws=ws,
+            pivot_df=pivots[key],
+            start_row=block["start_row"],
+            start_col=block["start_col"],
+            title=spec["title"],
+            layout=pivot_layouts.get(key),
+            debug=debug,
+        )
+        pivots_ranges[key] = address
+        print(
+            f"\n✅ {i}. {spec['name']} pivot written to Calculations tab up to row",
+            address["end_row"],
+        )
 
-    # Pivot1: Write Overdue pivot
-    title = "Filter: 'Aged' > 0"
-    address = write_multi_index_pivot(
-        ws=ws_calc,
-        pivot_df=overdue_pivot,
-        start_row=C.PIVOT1_START_ROW,
-        start_col=C.PIVOT1_START_COL,
-        title=title,
-        debug=debug,
-    )
-    pivots_ranges["overdue"] = address
-    print(
-        "\n✅ 1. Overdue pivot written to Calculations tab up to row",
-        address["end_row"],
-    )
+    return pivots_ranges
 
-    # Pivot2: Write Due within 1-14 days pivot
-    title = "Filter Applied: 'Due Date' 1-14 days (inclusive of start date)"
-    address = write_multi_index_pivot(
-        ws=ws_calc,
-        pivot_df=due_date_pivot,
-        start_row=C.PIVOT2_START_ROW,
-        start_col=C.PIVOT2_START_COL,
-        title=title,
-        debug=debug,
-    )
-    pivots_ranges["due_date"] = address
-    print(
-        "\n✅ 2. Due Date pivot written to Calculations tab up to row",
-        address["end_row"],
-    )
 
-    # Pivot3: Write Count of Content
-    title = "Filter: None Applied"
-    address = write_multi_index_pivot(
-        ws=ws_calc,
-        pivot_df=count_of_content_pivot,
-        start_row=C.PIVOT3_START_ROW,
-        start_col=C.PIVOT3_START_COL,
-        title=title,
-        debug=debug,
-    )
-    pivots_ranges["count_of_content"] = address
-    print(
-        "\n✅ 3. Count of Content pivot written to Calculations tab up to row",
-        address["end_row"],
-    )
+def write_wide_pivot(ws, layout, block, title):
+    """Write a pivot with several value columns (see pivots.layout_wide_pivot) at its block:
+    title, blank row, 'Row Labels' header, then the rows, styled like the other pivots
 
-    # Pivot4: Write Status is Addressed
-    title = "Filter: 'Status' == 'Addressed'"
-    address = write_multi_index_pivot(
-        ws=ws_calc,
-        pivot_df=addressed_status_pivot,
-        start_row=C.PIVOT4_START_ROW,
-        start_col=C.PIVOT4_START_COL,
-        title=title,
-        debug=debug,
-    )
-    pivots_ranges["addressed_status"] = address
-    print(
-        "\n✅ 4. Addressed Status pivot written to Calculations tab up to row",
-        address["end_row"],
-    )
+    Returns the range written, from the 'Row Labels' header to the grand total row
+    """
+    register_named_styles(ws.parent, PIVOT_STYLES)
+    header = ["Row Labels"] + layout.columns.to_list()[1:-1]
+    start_row, start_col = block["start_row"], block["start_col"]
+
+    # Title, blank row, then the 'Row Labels' header
+    ws.cell(row=start_row, column=start_col, value=title).style = "pivot_title"
+    for j in range(1, len(header)):
+        ws.cell(row=start_row, column=start_col + j, value="").style = (
+            "pivot_title_fill"
+        )
+    track_column_text(ws, start_col, [title])
+
+    header_row = start_row + 2
+    for j, name in enumerate(header):
+        ws.cell(row=header_row, column=start_col + j, value=name).style = "pivot_header"
+
+    rows = layout[layout.columns[:-1]].astype(object).values.tolist()
+    track_grid_text(ws, start_col, [header] + rows)
+
+    row = header_row
+    for row, values, row_type in zip(
+        range(header_row + 1, header_row + 1 + len(rows)),
+        rows,
+        layout["row_type"].tolist(),
+    ):
+        label_style, value_style = PIVOT_ROW_STYLES[row_type]
+        for j, value in enumerate(values):
+            cell = ws.cell(row=row, column=start_col + j, value=value)
+            style = label_style if j == 0 else value_style
+            if style:
+                cell.style = style
+
+    return {
+        "start_row": header_row,
+        "start_col": start_col,
+        "end_row": row,
+        "end_col": start_col + len(header) - 1,
+    }
 
-    # Pivot5: Signoff Aging [with Signoff Role != ('In-Charge' or 'Senior')]
-    #   Note: This is a simple pivot with just one index, not a multi-index pivot
-    #   So call the write_simple_pivot method
-    title = "Signoff Role != ('In-Charge' or 'Senior')"
-    address = write_simple_pivot(
-        ws=ws_calc,
-        pivot_df=signoff_aging_pivot,
-        start_row=C.PIVOT4_START_ROW,
-        start_col=C.PIVOT5_START_COL,
-        title=title,
-        debug=debug,
-    )
-    pivots_ranges["signoff_aging"] = address
+
+def write_aging_pivot_to_sheet(aging_pivot, ws, block, title=AGING_PIVOT["title"]):
+    """Write the aging pivot (one value column per bucket, and the row total) to the
+    Calculations tab at its block (see src/layout.py)"""
+    address = write_wide_pivot(ws, layout_aging_pivot(aging_pivot), block, title)
     print(
-        "\n✅ 5. Signoff aging pivot written to Calculations tab up to row",
+        f"\n✅ {AGING_PIVOT['name']} pivot written to Calculations tab up to row",
         address["end_row"],
     )
-
-    return pivots_ranges
+    return address
 
 
 def write_table(ws, start_row, start_col, title, header, rows, row_border=False):
@@ -334,6 +338,9 @@ def write_table(ws, start_row, start_col, title, header, rows, row_border=False)
         cell.font = Font(bold=True)
         cell.border = C.THIN_ALL_SIDES
 
+    track_column_text(ws, start_col, [title])
+    track_grid_text(ws, start_col, [header] + rows)
+
     last_row = 0
     last_col = 0
     # Write table contents
@@ -354,61 +361,24 @@ def write_table(ws, start_row, start_col, title, header, rows, row_border=False)
     return table_address
 
 
-def write_summary_tables_to_sheet(tables, ws, start_row, debug=False):
+def write_summary_tables_to_sheet(tables, ws, table_blocks, debug=False):
     # -----------------------------------------------------
-    # Write the summary tables to Calculations tab
+    # Write the summary tables to Calculations tab, at the blocks allocated for them
+    # below the pivots (see src/layout.py)
     # -----------------------------------------------------
-    ws_calc = ws
-    open_notes_table = tables["open_notes"]
-    addressed_notes_table = tables["addressed_notes"]
-    signoff_aging_table = tables["signoff_aging"]
-
-    table_ranges = {
-        "open_notes": {},
-        "addressed_notes": {},
-    }
-
-    # Table1: Write Open Notes Summary table
-    title = open_notes_table["title"]
-    header = open_notes_table["header"]
-    rows = open_notes_table["rows"]
-    address = write_table(
-        ws=ws_calc,
-        start_row=start_row,
-        start_col=C.TABLE1_START_COL,  # Starts at first column
-        title=title,
-        header=header,
-        rows=rows,
-    )
-    table_ranges["open_notes"] = address
-
-    # Table2: Write Addressed Notes Summary table
-    title = addressed_notes_table["title"]
-    header = addressed_notes_table["header"]
-    rows = addressed_notes_table["rows"]
-    address = write_table(
-        ws=ws_calc,
-        start_row=start_row,
-        start_col=C.TABLE2_START_COL,  # starts at 9th column
-        title=title,
-        header=header,
-        rows=rows,
-    )
-    table_ranges["addressed_notes"] = address
-
-    # Table3: Write Signoff Aging Table
-    title = signoff_aging_table["title"]
-    header = signoff_aging_table["header"]
-    rows = signoff_aging_table["rows"]
-    address = write_table(
-        ws=ws_calc,
-        start_row=start_row,
-        start_col=C.TABLE3_START_COL,
-        title=title,
-        header=header,
-        rows=rows,
-    )
-    table_ranges["signoff_aging"] = address
+    table_ranges = {}
+    for key in REPORTS:
+        if key not in tables:
+            continue
+        table = tables[key]
+        table_ranges[key] = write_table(
+            ws=ws,
+            start_row=table_blocks[key]["start_row"],
+            start_col=table_blocks[key]["start_col"],
+            title=table["title"],
+            header=table["header"],
+            rows=table["rows"],
+        )
 
     return table_ranges
 
@@ -441,12 +411,15 @@ def copy_range_values_only(
     dst_range = {"start_row": dst_start_row, "start_col": dst_start_col}
 
     for r in range(height):
+        row_values = []
         for c in range(width):
             src_cell = ws_src.cell(row=src_start_row + r, column=src_start_col + c)
             dst_cell = ws_dst.cell(row=dst_start_row + r, column=dst_start_col + c)
 
             # Copy 'Values Only'
             dst_cell.value = src_cell.value
+            row_values.append(src_cell.value)
+        track_grid_text(ws_dst, dst_start_col, [row_values])
 
         dst_range["end_col"] = dst_start_col + c
     dst_range["end_row"] = dst_start_row + r
@@ -454,33 +427,27 @@ def copy_range_values_only(
     return dst_range
 
 
-def copy_table_to_report(
-    src_path, wb_src, table_range, report_start_row, report_start_col, debug=False
+def copy_table_from_values_workbook(
+    wb_values, wb_dst, table_range, report_start_row, report_start_col
 ):
-    """Copy the calculated table range from source sheet (Calculations) to destination sheet (Report), given the table range
+    """Copy one calculated table range from an already opened data_only workbook to the Report sheet
 
     Args:
-        ws_calc (Worksheet): worksheet
-        ws_report (Worksheet): worksheet
+        wb_values (Openpyxl Workbook): data_only workbook with the recalculated values
+        wb_dst (Openpyxl Workbook): Main workbook that the report is written into
         table_range (dict): Dict of table range {start_row, start_col, end_row, end_col}
-        dst_start_row (int): destination sheet start row
-        dst_start_col (int): destination sheet start column
+        report_start_row (int): destination sheet start row
+        report_start_col (int): destination sheet start column
     """
 
-    # Open a data_only mode spreadsheet to read the values (not formulas)
-    wb_src.save(src_path)
-    force_excel_recalc(src_path)
-
-    wb_values = load_values_only_workbook(src_path)
-
     table_height = table_range["end_row"] - table_range["start_row"] + 1
     table_width = table_range["end_col"] - table_range["start_col"] + 1
 
-    # The values are read from a new data_only worksheet, and written to the ws_report (passed via argument)
+    # The values are read from the data_only worksheet, and written to the Report sheet of the main workbook
     # ⚠️ Don't save the data_only sheet (it will remove all formulas)
     report_range = copy_range_values_only(
         ws_src=wb_values[C.CALC_SHEET],
-        ws_dst=wb_src[C.REPORT_SHEET],
+        ws_dst=wb_dst[C.REPORT_SHEET],
         src_start_row=table_range["start_row"],
         src_start_col=table_range["start_col"],
         height=table_height,
@@ -492,67 +459,173 @@ def copy_table_to_report(
     return report_range
 
 
-def copy_all_tables_to_report(file_path, wb_src, table_ranges, debug=False):
+def copy_all_tables_to_report(
+    file_path, wb_src, table_ranges, report_blocks, debug=False
+):
     """Copy all tables created in Calculations sheet to the Report sheet for formatting
 
+    The workbook is saved and recalculated once, and every table is copied from the same
+    data_only workbook (instead of one save/recalc/reload cycle per table).
+
         Returns a dict of report ranges
 
     Args:
-        src_path (str): full path of sourcefile with extension
+        file_path (str): full path of sourcefile with extension
         wb_src (Openpyxl Workbook): Main workbook that the reports are written into
         table_ranges (dict): Table co-ordinates
+        report_blocks (dict): Where each table goes in the Report sheet (see src/layout.py)
         debug (bool, optional): Debug print or not. Defaults to False.
     """
 
-    # Unpack table dict
-    open_notes_table = table_ranges["open_notes"]  # Table 1
-    addressed_notes_table = table_ranges["addressed_notes"]  # Table 2
-    signoff_aging_table = table_ranges["signoff_aging"]  # Table 3
+    # Only the tables that were actually written get copied
+    tables_to_copy = {
+        key: table_ranges[key] for key in REPORTS if table_ranges.get(key)
+    }
 
     # Initialize report range dict to return
     report_ranges = {}
-
-    # Write each table
-    # Table 1: Open Review Notes table
-    open_notes_start_row = C.REPORT1_START_ROW
-    open_notes_start_col = C.REPORT1_START_COL
-
-    if open_notes_table:
-        r1_range = copy_table_to_report(
-            src_path=file_path,
-            wb_src=wb_src,
-            table_range=open_notes_table,
-            report_start_row=open_notes_start_row,
-            report_start_col=open_notes_start_col,
+    if not tables_to_copy:
+        # Nothing to copy, so don't pay for a save and recalc
+        return report_ranges
+
+    # Save and recalculate once, then read all tables from a single data_only workbook.
+    # Only Calculations feeds the Report, the source sheets keep their cached values
+    save_working_copy(wb_src, file_path)
+    force_excel_recalc(file_path, sheets=[C.CALC_SHEET])
+    wb_values = load_values_only_workbook(file_path)
+
+    for key, table_range in tables_to_copy.items():
+        report_ranges[key] = copy_table_from_values_workbook(
+            wb_values=wb_values,
+            wb_dst=wb_src,
+            table_range=table_range,
+            report_start_row=report_blocks[key]["start_row"],
+            report_start_col=report_blocks[key]["start_col"],
         )
-        report_ranges["open_notes"] = r1_range
-
-    # Table 2: Addressed Review Notes table
-    addressed_notes_start_row = C.REPORT2_START_ROW
-    addressed_notes_start_col = C.REPORT2_START_COL
-
-    if addressed_notes_table:
-        r2_range = copy_table_to_report(
-            src_path=file_path,
-            wb_src=wb_src,
-            table_range=addressed_notes_table,
-            report_start_row=addressed_notes_start_row,
-            report_start_col=addressed_notes_start_col,
+
+    wb_values.close()
+
+    if debug:
+        print(
+            "\n🐞 ====== DEBUG BLOCK START: copy_all_tables_to_report (writers.py) ======"
         )
-        report_ranges["addressed_notes"] = r2_range
-
-    # Table 1: Signoff Aging table
-    signoff_aging_start_row = C.REPORT3_START_ROW
-    signoff_aging_start_col = C.REPORT3_START_COL
-
-    if signoff_aging_table:
-        r3_range = copy_table_to_report(
-            src_path=file_path,
-            wb_src=wb_src,
-            table_range=signoff_aging_table,
-            report_start_row=signoff_aging_start_row,
-            report_start_col=signoff_aging_start_col,
+        print("[DEBUG] Tables copied with one recalc:", list(tables_to_copy))
+        print("[DEBUG] Report ranges:", report_ranges)
+        print(
+            "🐞 ====== DEBUG BLOCK END: copy_all_tables_to_report (writers.py) ======\n"
         )
-        report_ranges["signoff_aging_notes"] = r3_range
 
     return report_ranges
+
+
+# ======================================
+# STREAMED REPORT OUTPUT
+#   The reports are assembled in a small buffer (values and final styles), then streamed
+#   row by row into a fresh write-only workbook. The pipeline does not load or save the
+#   working copy in this mode (see run_pipeline), so nothing from the source workbook is held
+# ======================================
+class BufferedCell:
+    """Value and style of one report cell, before it is streamed"""
+
+    __slots__ = ("row", "column", "value", "font", "fill", "border", "alignment")
+
+    def __init__(self, row, column):
+        self.row = row
+        self.column = column
+        self.value = None
+        self.font = None
+        self.fill = None
+        self.border = None
+        self.alignment = None
+
+
+class ColumnWidth:
+    __slots__ = ("width",)
+
+    def __init__(self):
+        self.width = None
+
+
+class ColumnWidths(dict):
+    """column_dimensions of the buffer - ws.column_dimensions["A"].width = 12"""
+
+    def __missing__(self, col_letter):
+        dim = self[col_letter] = ColumnWidth()
+        return dim
+
+
+class ReportBuffer:
+    """Stands in for the Report worksheet while the reports are written and formatted
+
+    Supports the parts of the worksheet API used by write_reports and format_reports (src/report_engine.py)
+    (cell(), column_dimensions, conditional_formatting). Only the report cells are kept
+    """
+
+    def __init__(self, title=C.REPORT_SHEET):
+        self.title = title
+        self.cells = {}
+        self.column_dimensions = ColumnWidths()
+        self.conditional_formatting = ConditionalFormattingList()
+
+    def cell(self, row, column, value=None):
+        cell = self.cells.get((row, column))
+        if cell is None:
+            cell = self.cells[(row, column)] = BufferedCell(row, column)
+        if value is not None:
+            cell.value = value
+        return cell
+
+    def iter_rows(self):
+        """Yield a list of cells (None for gaps) for every row from 1 to the last row"""
+        by_row = {}
+        for (row, col), cell in self.cells.items():
+            by_row.setdefault(row, {})[col] = cell
+
+        for row in range(1, max(by_row, default=0) + 1):
+            cols = by_row.get(row, {})
+            yield [cols.get(col) for col in range(1, max(cols, default=0) + 1)]
+
+
+def stream_report_workbook(report, output_file, debug=False):
+    """Write the buffered report to a new workbook through a write-only worksheet
+
+    Column widths and conditional formatting are set first, then each row is appended once
+    with its final values and styles
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(report.title)
+
+    apply_column_widths(report)
+
+    for col_letter, dim in report.column_dimensions.items():
+        if dim.width is not None:
+            ws.column_dimensions[col_letter].width = dim.width
+    ws.conditional_formatting = report.conditional_formatting
+
+    row_count = 0
+    for buffered_row in report.iter_rows():
+        row = []
+        for cell in buffered_row:
+            if cell is None:
+                row.append(None)
+                continue
+            out = WriteOnlyCell(ws, value=cell.value)
+            for attr in ("font", "fill", "border", "alignment"):
+                style = getattr(cell, attr)
+                if style is not None:
+                    setattr(out, attr, style)
+            row.append(out)
+        ws.append(row)
+        row_count += 1
+
+    wb.save(output_file)
+
+    if debug:
+        print(
+            "\n🐞 ====== DEBUG BLOCK START: stream_report_workbook (writers.py) ======"
+        )
+        print(f"[DEBUG] Rows streamed: {row_count}, cells: {len(report.cells)}")
+        print("🐞 ====== DEBUG BLOCK END: stream_report_workbook (writers.py) ======\n")
+
+    print("\n✅ Streamed reports to:", output_file)
+    return output_file
@@ -0,0 +1,408 @@
+# ======================================
+# IMPORTS
+# ======================================
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime, timezone
+import xml.etree.ElementTree as ET
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.packaging.relationship import RelationshipList
+from openpyxl.utils import column_index_from_string
+from openpyxl.writer.excel import ExcelWriter
+from openpyxl.xml.constants import (
+    ARC_SHARED_STRINGS,
+    ARC_WORKBOOK_RELS,
+    SHARED_STRINGS,
+)
+
+# Helpers to read and patch the raw parts of an .xlsx package (a zip of XML files)
+# without loading the whole workbook into openpyxl.
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+# One <c> element: attributes, and the inner xml (<f>, <v>, <is>) if the cell is not self-closing
+CELL_RE = re.compile(rb"<c\b([^>]*?)(?:/>|>(.*?)</c>)", re.DOTALL)
+ATTR_RE = re.compile(rb'(\w+)="([^"]*)"')
+FORMULA_RE = re.compile(rb"<f\b([^>]*?)(?:/>|>(.*?)</f>)", re.DOTALL)
+VALUE_RE = re.compile(rb"<v\b[^>]*?(?:/>|>(.*?)</v>)", re.DOTALL)
+INLINE_TEXT_RE = re.compile(rb"<t\b[^>]*?(?:/>|>(.*?)</t>)", re.DOTALL)
+CELL_REF_RE = re.compile(r"([A-Z]{1,3})(\d+)")
+
+
+def split_cell_ref(ref: str):
+    """Split an 'A1' style reference into (row, col) numbers"""
+    match = CELL_REF_RE.fullmatch(ref.replace("$", ""))
+    if not match:
+        raise ValueError(f"⚠️ Not a cell reference: {ref}")
+    return int(match.group(2)), column_index_from_string(match.group(1))
+
+
+def xml_unescape(raw: bytes) -> str:
+    """Decode the text content of an xml element"""
+    text = raw.decode("utf-8")
+    if "&" in text:
+        text = (
+            text.replace("&lt;", "<")
+            .replace("&gt;", ">")
+            .replace("&quot;", '"')
+            .replace("&apos;", "'")
+            .replace("&amp;", "&")
+        )
+    return text
+
+
+def xml_escape(text: str) -> str:
+    """Escape text to be placed inside an xml element"""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _resolve_target(target: str, base_dir: str = "xl") -> str:
+    """Relationship targets are either absolute ('/xl/worksheets/sheet1.xml') or relative to the xl folder"""
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def sheet_part_paths(zf: zipfile.ZipFile) -> dict:
+    """Map sheet names to their worksheet part inside the zip, in workbook tab order
+
+    e.g. {"ReviewNoteAging": "xl/worksheets/sheet1.xml", ...}
+    """
+    rels_root = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {
+        rel.get("Id"): _resolve_target(rel.get("Target"))
+        for rel in rels_root.iter(f"{{{PKG_REL_NS}}}Relationship")
+    }
+
+    wb_root = ET.fromstring(zf.read("xl/workbook.xml"))
+    parts = {}
+    for sheet in wb_root.iter(f"{{{MAIN_NS}}}sheet"):
+        rel_id = sheet.get(f"{{{REL_NS}}}id")
+        parts[sheet.get("name")] = targets[rel_id]
+
+    return parts
+
+
+def _iter_shared_strings(f):
+    """Yield the shared strings one by one from an open sharedStrings.xml (rich text runs are joined)"""
+    for _, elem in ET.iterparse(f):
+        if elem.tag == f"{{{MAIN_NS}}}si":
+            # Plain text is a direct <t>, rich text is a list of runs <r><t>.
+            # Phonetic runs (<rPh>) are skipped, only the visible text counts
+            parts = []
+            for child in elem:
+                if child.tag == f"{{{MAIN_NS}}}t":
+                    parts.append(child.text or "")
+                elif child.tag == f"{{{MAIN_NS}}}r":
+                    t = child.find(f"{{{MAIN_NS}}}t")
+                    parts.append(t.text or "" if t is not None else "")
+            yield "".join(parts)
+            elem.clear()
+
+
+def read_shared_strings(zf: zipfile.ZipFile) -> list:
+    """Read the shared strings table as a list of plain strings (rich text runs are joined)"""
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+
+    with zf.open("xl/sharedStrings.xml") as f:
+        return list(_iter_shared_strings(f))
+
+
+class LazySharedStrings:
+    """Shared strings that are only parsed up to the highest index asked for
+
+    Pass as shared_strings to parse_cell_value. Use while the zip file is open, and close() after
+    """
+
+    def __init__(self, zf: zipfile.ZipFile):
+        self.strings = []
+        self._file = None
+        self._iter = iter(())
+        if "xl/sharedStrings.xml" in zf.namelist():
+            self._file = zf.open("xl/sharedStrings.xml")
+            self._iter = _iter_shared_strings(self._file)
+
+    def __call__(self, index: int) -> str:
+        while len(self.strings) <= index:
+            self.strings.append(next(self._iter))
+        return self.strings[index]
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def cell_attrs(raw_attrs: bytes) -> dict:
+    """Attributes of a <c> element as a dict of str"""
+    return {k.decode(): v.decode() for k, v in ATTR_RE.findall(raw_attrs)}
+
+
+def parse_cell_value(cell_type, inner: bytes, shared_strings):
+    """Cached value of a cell from its type attribute and inner xml
+
+    shared_strings is the list from read_shared_strings, or a callable that takes the index
+    """
+    if cell_type == "inlineStr":
+        if not inner:
+            return ""
+        return "".join(xml_unescape(t or b"") for t in INLINE_TEXT_RE.findall(inner))
+
+    if not inner:
+        return None
+    match = VALUE_RE.search(inner)
+    if not match or match.group(1) is None:
+        return None
+    raw = match.group(1)
+
+    if cell_type == "s":
+        index = int(raw)
+        return (
+            shared_strings(index) if callable(shared_strings) else shared_strings[index]
+        )
+    if cell_type in ("str", "e"):
+        return xml_unescape(raw)
+    if cell_type == "b":
+        return raw.strip() == b"1"
+
+    # Numbers (t="n" or no type). Dates are stored as serial numbers as well
+    if raw.lstrip(b"-").isdigit():
+        return int(raw)
+    return float(raw)
+
+
+ROW_NUM_RE = re.compile(rb'<row\b[^>]*?\br="(\d+)"')
+PROBE_CHUNK_BYTES = 64 * 1024
+
+
+def _read_top_rows(zf: zipfile.ZipFile, part: str, max_row: int) -> bytes:
+    """Read a sheet part only until the first row after max_row (or the end of sheetData)"""
+    buffer = b""
+    with zf.open(part) as f:
+        while True:
+            chunk = f.read(PROBE_CHUNK_BYTES)
+            if not chunk:
+                return buffer
+            # Look back a little, in case a row tag was split over two chunks
+            search_from = max(0, len(buffer) - 256)
+            buffer += chunk
+
+            for match in ROW_NUM_RE.finditer(buffer, search_from):
+                if int(match.group(1)) > max_row:
+                    return buffer[: match.start()]
+            end = buffer.find(b"</sheetData>", search_from)
+            if end >= 0:
+                return buffer[:end]
+
+
+def read_cells(filename: str, cells: dict) -> dict:
+    """Read a few cells (cached values) straight from the xlsx package, without loading the workbook
+
+    Only the rows up to the lowest requested cell are read, and shared strings are parsed lazily
+        cells:  {sheet name: ["B4", ...]}
+        returns {sheet name: {"B4": value, ...}}, None for empty cells
+    """
+    values = {}
+    with zipfile.ZipFile(filename) as zf:
+        parts = sheet_part_paths(zf)
+        shared_strings = LazySharedStrings(zf)
+        try:
+            for sheet_name, refs in cells.items():
+                if sheet_name not in parts:
+                    raise KeyError(f"⚠️ Sheet not found: {sheet_name}")
+
+                wanted = {ref.replace("$", "").upper() for ref in refs}
+                max_row = max(split_cell_ref(ref)[0] for ref in wanted)
+                xml = _read_top_rows(zf, parts[sheet_name], max_row)
+
+                sheet_values = dict.fromkeys(wanted)
+                for raw_attrs, inner in CELL_RE.findall(xml):
+                    attrs = cell_attrs(raw_attrs)
+                    if attrs.get("r") in wanted:
+                        sheet_values[attrs["r"]] = parse_cell_value(
+                            attrs.get("t"), inner, shared_strings
+                        )
+                values[sheet_name] = sheet_values
+        finally:
+            shared_strings.close()
+
+    return values
+
+
+def rewrite_zip_parts(filename: str, new_parts: dict):
+    """Replace some parts of the zip package, copying all other parts unchanged
+
+    new_parts is a dict of {part path: bytes}
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(suffix=".xlsx", dir=directory)
+    os.close(fd)
+
+    try:
+        with zipfile.ZipFile(filename) as src, zipfile.ZipFile(
+            tmp_path, "w", compression=zipfile.ZIP_DEFLATED
+        ) as dst:
+            for info in src.infolist():
+                if info.filename in new_parts:
+                    dst.writestr(info, new_parts[info.filename])
+                else:
+                    dst.writestr(info, src.read(info.filename))
+        shutil.move(tmp_path, filename)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# ========================================================
+# Partial save
+#   openpyxl re-serializes every sheet on save. Sheets the pipeline never writes to (the raw
+#   data exports) are copied from the file on disk instead, and only the other sheets,
+#   workbook.xml, styles.xml, rels and content types are generated by openpyxl.
+#
+#   This works because:
+#     - openpyxl keeps the loaded cellXfs (and dxfs) in their original order, and only appends
+#       new styles, so the s="N" style indices in the copied parts stay valid
+#     - openpyxl writes its own strings inline, so the original sharedStrings.xml is added
+#       back unchanged for the copied parts
+#   Sheets with their own rels (comments, drawings, hyperlinks, tables) are always re-serialized
+# ========================================================
+SHARED_STRINGS_REL = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"
+)
+REL_ID_RE = re.compile(rb'\bId="([^"]*)"')
+TAB_SELECTED_RE = re.compile(rb'\stabSelected="(?:1|true)"')
+
+
+def _rels_path(part: str) -> str:
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, "_rels", f"{name}.rels")
+
+
+def _deselect_tab(part: bytes) -> bytes:
+    """Remove tabSelected from the sheet view (only the active sheet may keep it)"""
+    head_end = part.find(b"<sheetData")
+    if head_end < 0:
+        return part
+    return TAB_SELECTED_RE.sub(b"", part[:head_end], count=1) + part[head_end:]
+
+
+class _SharedStringsPart:
+    """Content type entry for the copied shared strings part"""
+
+    path = "/" + ARC_SHARED_STRINGS
+    mime_type = SHARED_STRINGS
+
+
+class _ArchiveWithSharedStrings:
+    """Zip archive that adds the sharedStrings relationship to the workbook rels when they are written"""
+
+    def __init__(self, archive):
+        self._archive = archive
+
+    def writestr(self, name, data, *args, **kwargs):
+        if name == ARC_WORKBOOK_RELS:
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            ids = set(REL_ID_RE.findall(data))
+            n = len(ids) + 1
+            while f"rId{n}".encode() in ids:
+                n += 1
+            rel = (
+                f'<Relationship Type="{SHARED_STRINGS_REL}" '
+                f'Target="sharedStrings.xml" Id="rId{n}" />'
+            )
+            data = data.replace(b"</Relationships>", rel.encode() + b"</Relationships>")
+        return self._archive.writestr(name, data, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._archive, name)
+
+
+class _PartialExcelWriter(ExcelWriter):
+    """ExcelWriter that copies the parts of unchanged sheets from the source package"""
+
+    def __init__(self, workbook, archive, source, copied_parts):
+        super().__init__(workbook, archive)
+        self.source = source
+        self.copied_parts = copied_parts  # sheet title -> part path in the source zip
+
+    def write_worksheet(self, ws):
+        source_part = self.copied_parts.get(ws.title)
+        if source_part is None:
+            return super().write_worksheet(ws)
+
+        part = self.source.read(source_part)
+        if ws is not self.workbook.active:
+            part = _deselect_tab(part)
+
+        # Nothing else is written for the sheet (no drawing, no rels)
+        ws._drawing = SpreadsheetDrawing()
+        ws._rels = RelationshipList()
+        self._archive.writestr(ws.path[1:], part)
+        self.manifest.append(ws)
+
+
+def save_workbook_partial(wb, filename: str, rewrite_sheets, debug: bool = False):
+    """Save an (already saved once, or loaded from filename) workbook back to filename,
+    re-serializing only the sheets in rewrite_sheets. All other sheets that exist in the file
+    are copied byte for byte
+
+    Returns the list of copied sheet titles
+    """
+    if not os.path.exists(filename):
+        wb.save(filename)
+        return []
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(suffix=".xlsx", dir=directory)
+    os.close(fd)
+
+    try:
+        with zipfile.ZipFile(filename) as source:
+            names = set(source.namelist())
+            source_parts = sheet_part_paths(source)
+            copied_parts = {
+                ws.title: source_parts[ws.title]
+                for ws in wb.worksheets
+                if ws.title not in rewrite_sheets
+                and ws.title in source_parts
+                and source_parts[ws.title] in names
+                and _rels_path(source_parts[ws.title]) not in names
+            }
+
+            with zipfile.ZipFile(
+                tmp_path, "w", zipfile.ZIP_DEFLATED, allowZip64=True
+            ) as archive:
+                wb.properties.modified = datetime.now(tz=timezone.utc).replace(
+                    tzinfo=None
+                )
+                writer = _PartialExcelWriter(wb, archive, source, copied_parts)
+                if copied_parts and ARC_SHARED_STRINGS in names:
+                    archive.writestr(
+                        ARC_SHARED_STRINGS, source.read(ARC_SHARED_STRINGS)
+                    )
+                    writer.manifest.append(_SharedStringsPart())
+                    writer._archive = _ArchiveWithSharedStrings(archive)
+                writer.write_data()
+
+        shutil.move(tmp_path, filename)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    if debug:
+        print(
+            "\n🐞 ====== DEBUG BLOCK START: save_workbook_partial (xlsx_package.py) ======"
+        )
+        print("[DEBUG] Sheets copied unchanged:", list(copied_parts))
+        print(
+            "🐞 ====== DEBUG BLOCK END: save_workbook_partial (xlsx_package.py) ======\n"
+        )
+
+    return list(copied_parts)
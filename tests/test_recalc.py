@@ -0,0 +1,185 @@
+import re
+import zipfile
+
+from openpyxl import Workbook, load_workbook
+
+from src.recalc import recalculate_workbook, shift_formula
+from src.xlsx_package import rewrite_zip_parts
+
+
+def recalc(tmp_path, sheets, recalc_sheets=None):
+    """Write {sheet: {cell: value}} to a workbook, recalculate it, and return the
+    data_only values as {sheet: {cell: value}} plus the recalculation counts"""
+    path = str(tmp_path / "book.xlsx")
+    wb = Workbook()
+    wb.remove(wb.active)
+    for name, cells in sheets.items():
+        ws = wb.create_sheet(name)
+        for ref, value in cells.items():
+            ws[ref] = value
+    wb.save(path)
+
+    stats = recalculate_workbook(path, sheets=recalc_sheets)
+
+    wb = load_workbook(path, data_only=True)
+    values = {
+        name: {ref: wb[name][ref].value for ref in cells}
+        for name, cells in sheets.items()
+    }
+    return values, stats
+
+
+def value_of(tmp_path, formula, cells=None):
+    values, _ = recalc(tmp_path, {"S": {**(cells or {}), "Z1": formula}})
+    return values["S"]["Z1"]
+
+
+# ======================================
+# VLOOKUP
+# ======================================
+TABLE = {"A1": "a", "B1": 1, "A2": "x", "B2": 7, "A3": "y", "B3": 9}
+
+
+def test_vlookup_exact_match(tmp_path):
+    assert value_of(tmp_path, '=VLOOKUP("x",A1:B3,2,FALSE)', TABLE) == 7
+
+
+def test_vlookup_exact_match_ignores_case(tmp_path):
+    assert value_of(tmp_path, '=VLOOKUP("X",A1:B3,2,FALSE)', TABLE) == 7
+
+
+def test_vlookup_exact_match_first_row_wins(tmp_path):
+    cells = {**TABLE, "A3": "X"}
+    assert value_of(tmp_path, '=VLOOKUP("x",A1:B3,2,FALSE)', cells) == 7
+
+
+def test_vlookup_not_found(tmp_path):
+    assert value_of(tmp_path, '=VLOOKUP("q",A1:B3,2,FALSE)', TABLE) == "#N/A"
+
+
+def test_vlookup_blank_result_is_zero(tmp_path):
+    cells = {"A1": "x"}
+    assert value_of(tmp_path, '=VLOOKUP("x",A1:B3,2,FALSE)', cells) == 0
+
+
+def test_vlookup_skips_blank_keys(tmp_path):
+    cells = {"A2": "x", "B2": 7}
+    assert value_of(tmp_path, '=VLOOKUP("x",A1:B3,2,FALSE)', cells) == 7
+
+
+def test_vlookup_exact_match_skips_error_formula_keys(tmp_path):
+    cells = {"A1": "=1/0", "A2": "x", "B2": 7}
+    assert value_of(tmp_path, '=VLOOKUP("x",A1:B3,2,FALSE)', cells) == 7
+
+
+def test_vlookup_exact_match_skips_cached_error_keys(tmp_path):
+    # Lookup sheet not recalculated: the key column is read through the hashed index
+    sheets = {
+        "Data": {"A1": "#DIV/0!", "A2": "x", "B2": 7},
+        "S": {"A1": '=VLOOKUP("x",Data!A1:B3,2,FALSE)'},
+    }
+    values, _ = recalc(tmp_path, sheets, recalc_sheets=["S"])
+    assert values["S"]["A1"] == 7
+
+
+def test_vlookup_column_out_of_range(tmp_path):
+    assert value_of(tmp_path, '=VLOOKUP("x",A1:B3,3,FALSE)', TABLE) == "#REF!"
+
+
+def test_vlookup_approximate_match(tmp_path):
+    cells = {"A1": 10, "B1": "ten", "A2": 20, "B2": "twenty", "A3": 30, "B3": "thirty"}
+    assert value_of(tmp_path, "=VLOOKUP(25,A1:B3,2)", cells) == "twenty"
+    assert value_of(tmp_path, "=VLOOKUP(30,A1:B3,2,TRUE)", cells) == "thirty"
+    assert value_of(tmp_path, "=VLOOKUP(5,A1:B3,2,TRUE)", cells) == "#N/A"
+
+
+def test_vlookup_whole_columns_of_another_sheet(tmp_path):
+    sheets = {
+        "PrevDate": {"G1": "Label", "H1": "Count", "G2": "b", "H2": 4},
+        "S": {"A1": '=IFERROR(VLOOKUP("b",PrevDate!$G:$H,2,FALSE), 0)'},
+    }
+    values, _ = recalc(tmp_path, sheets)
+    assert values["S"]["A1"] == 4
+
+
+# ======================================
+# IFERROR, IF, SUM
+# ======================================
+def test_iferror(tmp_path):
+    assert value_of(tmp_path, "=IFERROR(1/0, -1)") == -1
+    assert value_of(tmp_path, '=IFERROR(VLOOKUP("q",A1:B3,2,FALSE), -1)', TABLE) == -1
+    assert value_of(tmp_path, "=IFERROR(2*3, -1)") == 6
+
+
+def test_if_with_or(tmp_path):
+    formula = '=IF(OR(A1="Audit",A1="TA"),"",B1-C1)'
+    assert value_of(tmp_path, formula, {"A1": "TA", "B1": 5, "C1": 2}) is None
+    assert value_of(tmp_path, formula, {"A1": "Ann", "B1": 5, "C1": 2}) == 3
+
+
+def test_sum_over_whole_column(tmp_path):
+    cells = {"A1": 1, "A2": 2.5, "A3": "text", "A5": True, "A9": 10}
+    assert value_of(tmp_path, "=SUM(A:A)", cells) == 13.5
+
+
+def test_sum_of_formula_cells(tmp_path):
+    cells = {"A1": 1, "A2": "=A1*2", "A3": "=A2*2"}
+    assert value_of(tmp_path, "=SUM(A1:A3)", cells) == 7
+
+
+# ======================================
+# Shared formulas, cycles, unsupported formulas
+# ======================================
+def test_shift_formula():
+    assert (
+        shift_formula("VLOOKUP(A2,PrevDate!$G:$H,2,FALSE)+B$2*'My s'!C3", 3, 1)
+        == "VLOOKUP(B5,PrevDate!$G:$H,2,FALSE)+C$2*'My s'!D6"
+    )
+    assert shift_formula("A1+1", -1, 0) == "#REF!+1"
+
+
+def test_shared_formula_children_are_recalculated(tmp_path):
+    path = str(tmp_path / "shared.xlsx")
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "S"
+    for row in range(1, 6):
+        ws.cell(row, 1, row * 10)
+        ws.cell(row, 2, f"=A{row}*2")
+    wb.save(path)
+
+    # B1:B5 as one shared formula on B1, with stale cached values
+    part = "xl/worksheets/sheet1.xml"
+    with zipfile.ZipFile(path) as zf:
+        xml = zf.read(part)
+
+    def shared(match):
+        row = int(match.group(1))
+        if row == 1:
+            formula = b'<f t="shared" ref="B1:B5" si="0">A1*2</f>'
+        else:
+            formula = b'<f t="shared" si="0"/>'
+        return b'<c r="B%d">' % row + formula + b"<v>0</v></c>"
+
+    rewrite_zip_parts(path, {part: re.sub(rb'<c r="B(\d)"[^>]*>.*?</c>', shared, xml)})
+
+    stats = recalculate_workbook(path)
+    assert stats == {"evaluated": 5, "errors": 0, "unsupported": 0}
+    ws = load_workbook(path, data_only=True)["S"]
+    assert [ws.cell(row, 2).value for row in range(1, 6)] == [20, 40, 60, 80, 100]
+
+
+def test_circular_reference_is_an_error(tmp_path):
+    values, stats = recalc(
+        tmp_path, {"S": {"A1": "=B1+1", "B1": "=A1+1", "C1": "=2+3"}}
+    )
+    assert values["S"]["A1"] == "#REF!"
+    assert values["S"]["C1"] == 5
+    assert stats["errors"] == 2
+
+
+def test_unsupported_function_keeps_cached_value(tmp_path):
+    values, stats = recalc(tmp_path, {"S": {"A1": "=NOW()", "B1": "=1+1"}})
+    assert values["S"]["A1"] is None
+    assert values["S"]["B1"] == 2
+    assert stats["unsupported"] == 1